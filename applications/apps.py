@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class ApplicationsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'applications'
+
+    def ready(self):
+        # 注册信号处理器（申请计数）
+        from . import signals  # noqa: F401
+        # 注册启动检查（幂等键缓存必须多进程共享）
+        from . import checks  # noqa: F401
@@ -0,0 +1,122 @@
+"""打包导出某个职位收到的全部简历（ZIP，内含清单 CSV），边查询边读取边输出
+
+清单和简历来自同一次遍历：每条申请只读取一次，先写入它的简历，清单行同时写入缓冲，最后写入清单，
+两者不会因为遍历期间新增/删除的申请而不一致；打不开的简历在清单中标记为 missing。
+"""
+import logging
+import os
+import re
+import tempfile
+import zipfile
+from collections import deque
+
+from django.db.models import F
+from django.utils import timezone
+
+from web.exporting import iter_csv
+from web.storage import get_media_storage
+from web.zipstream import iter_file, iter_zip
+from .models import Application
+
+
+logger = logging.getLogger(__name__)
+
+# 每批读取的申请数
+ARCHIVE_CHUNK_SIZE = 500
+
+MANIFEST_NAME = 'manifest.csv'
+
+CV_DIR = 'cvs'
+
+MANIFEST_FIELDS = [
+    'id', 'applicant_nickname', 'applicant_email', 'status', 'created_at', 'message', 'cv_name', 'file', 'file_status',
+]
+
+# 清单 file_status 列：简历已写入归档 / 简历文件缺失（file 列为空）
+FILE_INCLUDED = 'included'
+FILE_MISSING = 'missing'
+
+# 清单缓冲在内存中的上限，超过后转存临时文件
+MANIFEST_SPOOL_SIZE = 4 * 1024 * 1024
+
+# 归档内文件名中不允许出现的字符
+_UNSAFE_NAME = re.compile(r'[\x00-\x1f\\/:*?"<>|]+')
+
+
+def iter_application_chunks(job_id, chunk_size=ARCHIVE_CHUNK_SIZE):
+    """按申请 ID 键集分批产出职位的申请记录（dict 列表），每批一条查询，申请人信息随 JOIN 取出"""
+    applications = (
+        Application.objects
+        .filter(job_id=job_id)
+        .order_by('id')
+        .values(
+            'id', 'status', 'created_at', 'message', 'cv_name', 'cv_file',
+            applicant_nickname=F('applicant__nickname'),
+            applicant_email=F('applicant__email'),
+        )
+    )
+    last_id = 0
+    while True:
+        chunk = list(applications.filter(id__gt=last_id)[:chunk_size])
+        if not chunk:
+            return
+        for record in chunk:
+            record['file'] = archive_path(record)
+        yield chunk
+        last_id = chunk[-1]['id']
+
+
+def archive_path(record):
+    """简历在归档中的路径：cvs/<申请ID>-<申请人昵称><扩展名>，申请 ID 保证不重名"""
+    if not record['cv_file']:
+        return ''
+    nickname = _UNSAFE_NAME.sub('_', record['applicant_nickname'] or '').strip(' .')
+    extension = os.path.splitext(record['cv_name'] or record['cv_file'])[1].lower()
+    return f"{CV_DIR}/{record['id']}-{nickname}{extension}"
+
+
+def _date_time(value):
+    return timezone.localtime(value).timetuple()[:6] if timezone.is_aware(value) else value.timetuple()[:6]
+
+
+def _open_cv(storage, record):
+    """打开申请的简历文件，并在记录中填写 file_status；没有简历或文件缺失时返回 None"""
+    if not record['file']:
+        record['file_status'] = ''
+        return None
+    try:
+        fileobj = storage.open(record['cv_file'], 'rb')
+    except OSError:
+        logger.warning('简历文件缺失，跳过：申请 %s（%s）', record['id'], record['cv_file'])
+        record['file'] = ''
+        record['file_status'] = FILE_MISSING
+        return None
+    record['file_status'] = FILE_INCLUDED
+    return fileobj
+
+
+def _iter_entries(job_id):
+    """逐批写入简历，每批处理完后把这批的清单行写入缓冲，最后写入清单；同一时间只打开一个简历文件"""
+    storage = get_media_storage()
+    done = deque()
+    # iter_csv 每取到一批记录就产出这批的 CSV 文本；None 表示没有更多批次
+    manifest_text = iter_csv(MANIFEST_FIELDS, iter(done.popleft, None))
+    with tempfile.SpooledTemporaryFile(max_size=MANIFEST_SPOOL_SIZE) as manifest:
+        for chunk in iter_application_chunks(job_id):
+            for record in chunk:
+                fileobj = _open_cv(storage, record)
+                if fileobj is not None:
+                    # PDF/DOCX 本身已压缩，直接存储
+                    yield record['file'], _date_time(record['created_at']), iter_file(fileobj), zipfile.ZIP_STORED
+            done.append(chunk)
+            manifest.write(next(manifest_text).encode('utf-8'))
+        done.append(None)
+        for text in manifest_text:
+            manifest.write(text.encode('utf-8'))
+        manifest.seek(0)
+        yield MANIFEST_NAME, timezone.localtime().timetuple()[:6], iter_file(manifest), zipfile.ZIP_DEFLATED
+
+
+def iter_cv_archive(job_id):
+    """产出职位简历 ZIP 的字节块"""
+    return iter_zip(_iter_entries(job_id))
@@ -0,0 +1,10 @@
+from django.core.checks import register
+
+from web.checks import check_shared_cache
+from . import idempotency
+
+
+@register()
+def check_idempotency_cache(app_configs, **kwargs):
+    """幂等键要在所有进程间共享，否则落到其他进程的重复提交拦不住"""
+    return check_shared_cache(idempotency.cache_alias(), '申请幂等键', 'applications')
@@ -1,13 +1,18 @@
 from django.urls import path
+from jobs import views as job_views
 from . import views
 
 # 使用不同的 namespace 避免冲突
 app_name = 'company'
 
 urlpatterns = [
-    # 以下路由将在后续实现
+    # 导出本公司职位（/company/jobs/export/?format=csv|jsonl）
+    path('jobs/export/', job_views.job_export_view, name='job_export'),
+    # 下载简历（/company/applications/<id>/download-cv/）
+    path('applications/<int:app_id>/download-cv/', views.download_cv_view, name='download_cv'),
+    # 打包下载职位的全部简历（/company/jobs/<id>/cvs/）
+    path('jobs/<int:job_id>/cvs/', views.download_job_cvs_view, name='download_job_cvs'),
     # 公司端申请相关路由（通过 /company/ 前缀访问，实际路径为 /company/applications/）
-    # path('applications/', views.company_application_list_view, name='application_list'),
-    # path('applications/<int:app_id>/', views.company_application_detail_view, name='application_detail'),
-    # path('applications/<int:app_id>/download-cv/', views.download_cv_view, name='download_cv'),
+    path('applications/', views.company_application_list_view, name='application_list'),
+    path('applications/<int:app_id>/', views.company_application_detail_view, name='application_detail'),
 ]
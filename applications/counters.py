@@ -0,0 +1,65 @@
+"""申请计数的增量维护
+
+职位上的 application_count / unread_application_count 和公司用户上的同名总数，
+在申请创建、被公司查看（submitted -> reviewed）、删除时用 F() 原子增减，列表页直接读取，不做 COUNT(*)。
+未读 = 状态为 submitted。计数偏差（如后台直接改状态）由 ``python manage.py reconcile_application_counters`` 修复。
+"""
+from django.db.models import Case, Exists, F, Q, Subquery, Sum, When
+
+from jobs.models import Job
+from users.auth import invalidate_user_cache
+from users.models import User
+
+
+UNREAD_STATUS = 'submitted'
+READ_STATUS = 'reviewed'
+
+
+def _delta(field, delta):
+    """F() 增量表达式；减少时不低于 0（无符号列上直接相减会报错）"""
+    if delta >= 0:
+        return F(field) + delta
+    return Case(When(**{f'{field}__gte': -delta}, then=F(field) + delta), default=0)
+
+
+def adjust_counters(job_id, company_user_id, total=0, unread=0):
+    """增减某职位及其公司的申请数/未读数"""
+    values = {}
+    if total:
+        values['application_count'] = _delta('application_count', total)
+    if unread:
+        values['unread_application_count'] = _delta('unread_application_count', unread)
+    if not values:
+        return
+    if job_id is not None:
+        Job.objects.filter(id=job_id).update(**values)
+    User.objects.filter(id=company_user_id).update(**values)
+    # 导航栏显示未读数，清除公司用户的缓存
+    invalidate_user_cache(company_user_id)
+
+
+def discount_jobs(company_user_id, jobs):
+    """从公司的申请数/未读数中扣除 jobs（职位查询集）中该公司职位的计数
+
+    合计由子查询在同一条 UPDATE 里求出，不先读回；这些职位都没有申请（或 jobs 为空）时不更新任何行。
+    """
+    jobs = jobs.filter(company_user_id=company_user_id).order_by()
+    values = {}
+    for field in ('application_count', 'unread_application_count'):
+        amount = Subquery(jobs.values('company_user_id').annotate(total=Sum(field)).values('total'))
+        values[field] = Case(When(**{f'{field}__gte': amount}, then=F(field) - amount), default=0)
+    counted = jobs.filter(Q(application_count__gt=0) | Q(unread_application_count__gt=0))
+    if User.objects.filter(Exists(counted), id=company_user_id).update(**values):
+        invalidate_user_cache(company_user_id)
+
+
+def mark_read(application, company_user_id):
+    """公司查看申请：submitted -> reviewed，只有真正发生状态变化的那次请求扣减未读数"""
+    if application.status != UNREAD_STATUS:
+        return False
+    from .models import Application
+    changed = Application.objects.filter(id=application.id, status=UNREAD_STATUS).update(status=READ_STATUS)
+    if changed:
+        application.status = READ_STATUS
+        adjust_counters(application.job_id, company_user_id, unread=-1)
+    return bool(changed)
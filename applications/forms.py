@@ -0,0 +1,60 @@
+from django import forms
+from django.http import QueryDict
+from .models import Application
+from .uploads import CV_FIELD_NAME, CV_SIGNATURES, cv_extension, get_cv_max_size
+
+
+class ApplicationForm(forms.ModelForm):
+    """职位申请表单
+
+    简历的类型/大小在上传处理器接收时已检查（见 applications.uploads），
+    被拒绝的文件不会出现在 FILES 中，处理器记录的错误通过 upload_errors 传入并显示在对应字段上。
+    """
+    
+    class Meta:
+        model = Application
+        fields = ['message', 'cv_file']
+        widgets = {
+            'message': forms.Textarea(attrs={
+                'class': 'form-control',
+                'rows': 5,
+                'placeholder': '请输入申请留言'
+            }),
+            'cv_file': forms.ClearableFileInput(attrs={
+                'class': 'form-control',
+                'accept': ','.join(CV_SIGNATURES),
+            }),
+        }
+        labels = {
+            'message': '申请留言',
+            'cv_file': '简历（PDF/DOC/DOCX）',
+        }
+    
+    def __init__(self, *args, upload_errors=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.upload_errors = upload_errors or {}
+        # 必填检查放到 clean_cv_file 中，以便优先显示上传处理器的错误
+        self.fields['cv_file'].required = False
+    
+    @classmethod
+    def rejected(cls, upload_errors):
+        """请求体未被读取（如总长度超限）时返回的表单：只显示上传错误，不校验其他字段"""
+        form = cls(QueryDict(), upload_errors=upload_errors)
+        for name, field in form.fields.items():
+            if name != CV_FIELD_NAME:
+                field.required = False
+        form.is_valid()
+        return form
+    
+    def clean_cv_file(self):
+        """优先使用上传处理器的错误；未经处理器时（如测试、其他入口）在这里兜底检查"""
+        if CV_FIELD_NAME in self.upload_errors:
+            raise forms.ValidationError(self.upload_errors[CV_FIELD_NAME])
+        cv_file = self.cleaned_data.get('cv_file')
+        if not cv_file:
+            raise forms.ValidationError('请上传简历文件！')
+        if cv_extension(cv_file.name) not in CV_SIGNATURES:
+            raise forms.ValidationError('简历只支持 PDF、DOC、DOCX 格式！')
+        if cv_file.size > get_cv_max_size():
+            raise forms.ValidationError('简历文件过大！')
+        return cv_file
@@ -0,0 +1,78 @@
+"""申请提交的幂等键
+
+表单每次渲染生成一个随机键，放在提交地址的查询参数 ``idempotency_key`` 中（API 客户端也可以用
+``Idempotency-Key`` 请求头）。视图在读取请求体之前按 (用户, 键) 在缓存中占位：
+- 占位成功：正常处理，完成后把结果（职位 ID、申请 ID、提示信息）写回同一个键；未完成则释放占位，允许用同一个键重试
+- 键已完成：直接返回原结果，不再接收和保存上传文件
+- 键处理中（双击、超时重试）：不等待（不占用工作进程），返回 409 和同一个键的表单，稍后重新提交即得到原结果
+
+缓存只负责尽早拦截重复请求，(job, applicant) 唯一约束是最终保证。
+缓存别名必须多进程共享（默认 'shared'），进程内缓存会触发启动检查警告（见 applications.checks）。
+"""
+import re
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+QUERY_PARAM = 'idempotency_key'
+HEADER = 'HTTP_IDEMPOTENCY_KEY'
+
+KEY_RE = re.compile(r'[A-Za-z0-9_-]{8,64}')
+
+CACHE_KEY = 'applications:idempotency:{}:{}'
+
+PENDING = 'pending'
+
+DEFAULTS = {
+    'CACHE_ALIAS': 'shared',
+    'TTL': 24 * 3600,
+    'PENDING_TTL': 300,
+}
+
+
+def _config(name):
+    return getattr(settings, 'APPLICATION_IDEMPOTENCY', {}).get(name, DEFAULTS[name])
+
+
+def cache_alias():
+    return _config('CACHE_ALIAS')
+
+
+def _cache():
+    return caches[cache_alias()]
+
+
+def get_key(request):
+    """取出请求携带的幂等键；没有时返回空字符串，格式不合法时返回 None"""
+    key = request.GET.get(QUERY_PARAM) or request.META.get(HEADER, '')
+    if key and not KEY_RE.fullmatch(key):
+        return None
+    return key
+
+
+def claim(user_id, key):
+    """占位；成功返回 None，否则返回已有的状态（PENDING 或已完成的结果）"""
+    cache_key = CACHE_KEY.format(user_id, key)
+    cache = _cache()
+    for _ in range(2):
+        if cache.add(cache_key, PENDING, _config('PENDING_TTL')):
+            return None
+        state = cache.get(cache_key)
+        if state is not None:
+            return state
+        # 恰好过期或被释放，重新占位一次
+    return PENDING
+
+
+def complete(user_id, key, result):
+    """记录完成结果"""
+    _cache().set(CACHE_KEY.format(user_id, key), result, _config('TTL'))
+
+
+def release_pending(user_id, key):
+    """处理未完成时释放占位；已记录结果的键保留"""
+    cache_key = CACHE_KEY.format(user_id, key)
+    cache = _cache()
+    if cache.get(cache_key) == PENDING:
+        cache.delete(cache_key)
@@ -0,0 +1,91 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+from applications.counters import UNREAD_STATUS
+from applications.models import Application
+from jobs.models import Job
+from users.auth import invalidate_user_cache
+from users.models import User
+
+
+def _actual_counts(group, **outer):
+    """按 group 分组统计实际申请数/未读数的相关子查询（没有申请时为 0），键为计数列名"""
+    applications = Application.objects.filter(**outer).order_by().values(group)
+    total = applications.annotate(n=Count('id')).values('n')
+    unread = applications.filter(status=UNREAD_STATUS).annotate(n=Count('id')).values('n')
+    return {
+        'application_count': Coalesce(Subquery(total), 0),
+        'unread_application_count': Coalesce(Subquery(unread), 0),
+    }
+
+
+def _drifted(counts):
+    """计数列与实际数量不一致的条件"""
+    return ~Q(application_count=counts['application_count']) | ~Q(unread_application_count=counts['unread_application_count'])
+
+
+# 职位：统计该职位的申请；公司：统计其所有职位的申请（不依赖职位计数是否已校正）
+JOB_COUNTS = _actual_counts('job_id', job_id=OuterRef('pk'))
+COMPANY_COUNTS = _actual_counts('job__company_user_id', job__company_user_id=OuterRef('pk'))
+
+
+class Command(BaseCommand):
+    help = '按实际申请记录校正职位和公司用户上的申请数/未读数（每个有偏差的公司一条 UPDATE 校正其职位，一条校正公司总数）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000, help='每批检查的公司用户数')
+        parser.add_argument('--dry-run', action='store_true', help='只输出偏差，不写入')
+
+    def _chunks(self, queryset, chunk_size):
+        """按主键键集分批读取 ID"""
+        last_id = 0
+        while True:
+            ids = list(queryset.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:chunk_size])
+            if not ids:
+                return
+            last_id = ids[-1]
+            yield ids
+
+    def _report(self, label, queryset, counts, company_field):
+        """输出有偏差的行，返回 {行 ID: 所属公司 ID}"""
+        rows = (
+            queryset.filter(_drifted(counts))
+            .annotate(
+                company_id=F(company_field),
+                total=counts['application_count'],
+                unread=counts['unread_application_count'],
+            )
+            .values_list('id', 'company_id', 'application_count', 'unread_application_count', 'total', 'unread')
+        )
+        drifted = {}
+        for row_id, company_id, total, unread, expected_total, expected_unread in rows:
+            self.stdout.write(f'{label} {row_id}：{total}/{unread} -> {expected_total}/{expected_unread}')
+            drifted[row_id] = company_id
+        return drifted
+
+    def reconcile(self, company_id):
+        """校正一个公司：计数在 UPDATE 中由子查询求出，不写回读到的值，期间并发的增减不会被覆盖"""
+        jobs_fixed = Job.objects.filter(_drifted(JOB_COUNTS), company_user_id=company_id).update(**JOB_COUNTS)
+        company_fixed = User.objects.filter(_drifted(COMPANY_COUNTS), id=company_id).update(**COMPANY_COUNTS)
+        if company_fixed:
+            invalidate_user_cache(company_id)
+        return jobs_fixed, company_fixed
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        jobs_fixed = companies_fixed = 0
+        for company_ids in self._chunks(User.objects.filter(type='company'), options['chunk_size']):
+            # 先各用一条查询找出这批中有偏差的职位和公司，只校正涉及的公司
+            jobs = self._report('职位', Job.objects.filter(company_user_id__in=company_ids), JOB_COUNTS, 'company_user_id')
+            companies = self._report('公司用户', User.objects.filter(id__in=company_ids), COMPANY_COUNTS, 'id')
+            if dry_run:
+                jobs_fixed += len(jobs)
+                companies_fixed += len(companies)
+                continue
+            for company_id in sorted({*jobs.values(), *companies}):
+                fixed_jobs, fixed_company = self.reconcile(company_id)
+                jobs_fixed += fixed_jobs
+                companies_fixed += fixed_company
+        action = '发现' if dry_run else '已校正'
+        self.stdout.write(self.style.SUCCESS(f'{action} {jobs_fixed} 个职位、{companies_fixed} 个公司用户的计数偏差'))
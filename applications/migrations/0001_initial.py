@@ -0,0 +1,37 @@
+# Generated by Django 5.0.3 on 2026-10-18 10:26
+
+import django.db.models.deletion
+import web.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('jobs', '0007_job_version'),
+        ('users', '0003_user_profile_image_storage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Application',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('message', models.TextField(verbose_name='申请留言')),
+                ('cv_file', models.FileField(max_length=255, storage=web.storage.get_media_storage, upload_to='applications/cvs/', verbose_name='简历文件')),
+                ('cv_name', models.CharField(blank=True, help_text='下载时使用的文件名', max_length=255, verbose_name='简历原文件名')),
+                ('status', models.CharField(choices=[('submitted', '已提交'), ('reviewed', '已查看'), ('accepted', '已通过'), ('rejected', '未通过')], default='submitted', max_length=20, verbose_name='状态')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='申请时间')),
+                ('applicant', models.ForeignKey(help_text='提交申请的个人用户', on_delete=django.db.models.deletion.CASCADE, related_name='applications', to='users.user', verbose_name='申请人')),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='applications', to='jobs.job', verbose_name='职位')),
+            ],
+            options={
+                'verbose_name': '职位申请',
+                'verbose_name_plural': '职位申请',
+                'db_table': 'applications',
+                'ordering': ['-created_at', '-id'],
+            },
+        ),
+    ]
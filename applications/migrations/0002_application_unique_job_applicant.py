@@ -0,0 +1,61 @@
+# Generated by Django 5.0.3 on 2026-10-18 10:33
+
+from django.db import migrations, models
+from django.db.models import Count, Min, Q, Sum
+
+
+def remove_duplicates(apps, schema_editor):
+    """每个 (职位, 申请人) 只保留最早的一条申请，并重新计算受影响职位及其公司的申请数/未读数
+
+    历史模型上的删除不会触发计数信号，所以计数在这里直接按剩余申请重算。
+    """
+    Application = apps.get_model('applications', 'Application')
+    Job = apps.get_model('jobs', 'Job')
+    User = apps.get_model('users', 'User')
+    duplicates = (
+        Application.objects.values('job_id', 'applicant_id')
+        .annotate(first_id=Min('id'), total=Count('id'))
+        .filter(total__gt=1)
+    )
+    job_ids = set()
+    for row in list(duplicates):
+        Application.objects.filter(job_id=row['job_id'], applicant_id=row['applicant_id']).exclude(id=row['first_id']).delete()
+        job_ids.add(row['job_id'])
+    if not job_ids:
+        return
+
+    # 未读 = 状态为 submitted（与 applications.counters.UNREAD_STATUS 一致）
+    counts = {
+        row['job_id']: row
+        for row in Application.objects.filter(job_id__in=job_ids).values('job_id').annotate(
+            total=Count('id'), unread=Count('id', filter=Q(status='submitted')),
+        )
+    }
+    for job_id in job_ids:
+        row = counts.get(job_id, {'total': 0, 'unread': 0})
+        Job.objects.filter(id=job_id).update(application_count=row['total'], unread_application_count=row['unread'])
+
+    company_ids = set(Job.objects.filter(id__in=job_ids).values_list('company_user_id', flat=True))
+    for row in Job.objects.filter(company_user_id__in=company_ids).values('company_user_id').annotate(
+        total=Sum('application_count'), unread=Sum('unread_application_count'),
+    ):
+        User.objects.filter(id=row['company_user_id']).update(
+            application_count=row['total'], unread_application_count=row['unread'],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0001_initial'),
+        ('jobs', '0008_job_application_counters'),
+        ('users', '0004_user_application_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='application',
+            constraint=models.UniqueConstraint(fields=('job', 'applicant'), name='uniq_application_job_applicant'),
+        ),
+    ]
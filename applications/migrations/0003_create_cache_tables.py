@@ -0,0 +1,24 @@
+# Generated by Django 5.0.3 on 2026-10-18 14:20
+
+from django.core.management import call_command
+from django.db import migrations
+
+
+def create_cache_tables(apps, schema_editor):
+    """为 settings.CACHES 中的数据库缓存建表（默认的 'shared' 别名：申请幂等键、登录限流统计）
+
+    缓存表不由模型管理，只执行 migrate 的新库会缺表，访问时报 no such table。
+    createcachetable 会跳过已存在的表；之后新增的数据库缓存别名仍需手动执行 `python manage.py createcachetable`。
+    """
+    call_command('createcachetable', database=schema_editor.connection.alias, verbosity=0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0002_application_unique_job_applicant'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_cache_tables, migrations.RunPython.noop),
+    ]
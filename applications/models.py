@@ -1,3 +1,74 @@
 from django.db import models
+from jobs.models import Job
+from users.models import User
+from web.storage import get_media_storage
 
-# Create your models here.
+
+class Application(models.Model):
+    """职位申请模型"""
+    
+    STATUS_CHOICES = [
+        ('submitted', '已提交'),
+        ('reviewed', '已查看'),
+        ('accepted', '已通过'),
+        ('rejected', '未通过'),
+    ]
+    
+    job = models.ForeignKey(
+        Job,
+        on_delete=models.CASCADE,
+        related_name='applications',
+        verbose_name='职位'
+    )
+    
+    applicant = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='applications',
+        verbose_name='申请人',
+        help_text='提交申请的个人用户'
+    )
+    
+    message = models.TextField(
+        verbose_name='申请留言'
+    )
+    
+    # 内容寻址存储：applications/cvs/<哈希>.<扩展名>，文件名不可猜测且相同内容只存一份
+    cv_file = models.FileField(
+        upload_to='applications/cvs/',
+        storage=get_media_storage,
+        max_length=255,
+        verbose_name='简历文件'
+    )
+    
+    cv_name = models.CharField(
+        max_length=255,
+        blank=True,
+        verbose_name='简历原文件名',
+        help_text='下载时使用的文件名'
+    )
+    
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='submitted',
+        verbose_name='状态'
+    )
+    
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='申请时间'
+    )
+    
+    class Meta:
+        db_table = 'applications'
+        verbose_name = '职位申请'
+        verbose_name_plural = '职位申请'
+        ordering = ['-created_at', '-id']
+        constraints = [
+            # 每个用户对同一职位只能申请一次（重复/并发提交的最终保证）
+            models.UniqueConstraint(fields=['job', 'applicant'], name='uniq_application_job_applicant'),
+        ]
+    
+    def __str__(self):
+        return f'{self.applicant_id} -> {self.job_id}'
@@ -0,0 +1,28 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from jobs.models import Job
+from jobs.signals import jobs_deleting
+from .counters import UNREAD_STATUS, adjust_counters, discount_jobs
+from .models import Application
+
+
+@receiver(post_save, sender=Application)
+def count_created_application(sender, instance, created, **kwargs):
+    """新申请：职位和公司的申请数、未读数各加 1"""
+    if created:
+        adjust_counters(instance.job_id, instance.job.company_user_id, total=1, unread=1)
+
+
+@receiver(post_delete, sender=Application)
+def count_deleted_application(sender, instance, **kwargs):
+    """删除申请：扣减申请数（未读时同时扣减未读数）"""
+    company_user_id = Job.objects.filter(id=instance.job_id).values_list('company_user_id', flat=True).first()
+    if company_user_id is not None:
+        unread = -1 if instance.status == UNREAD_STATUS else 0
+        adjust_counters(instance.job_id, company_user_id, total=-1, unread=unread)
+
+
+@receiver(jobs_deleting)
+def discount_deleted_jobs(sender, company_user_id, jobs, **kwargs):
+    """职位被集合删除（申请随之删除）前，从公司总数中扣除这些职位的申请数"""
+    discount_jobs(company_user_id, jobs)
@@ -1,3 +1,370 @@
-from django.test import TestCase
+import csv
+import io
+import tempfile
+import zipfile
+from unittest import mock
 
-# Create your tests here.
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import IntegrityError, connection, transaction
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from jobs.models import Job
+from users.models import User
+from web.storage import get_media_storage
+from . import idempotency
+from .models import Application
+from .uploads import CVUploadHandler
+
+
+PDF = b'%PDF-1.4\n' + b'x' * 4096
+
+
+class ApplicationTestCase(TestCase):
+    """创建公司、职位和个人用户，个人用户的客户端强制 CSRF 校验"""
+
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        settings_override = override_settings(MEDIA_ROOT=media_root.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.company = User.objects.create(
+            login_id='acme', password='!', nickname='Acme', email='hr@acme.test', type='company',
+        )
+        self.job = Job.objects.create(
+            company_user=self.company, title='后端开发', requirement='Python', duty='写代码', salary='10-15k',
+        )
+        self.applicant = User.objects.create(
+            login_id='bob', password='!', nickname='Bob', email='bob@example.test', type='individual',
+        )
+        self.client = self.login(self.applicant)
+
+    def login(self, user):
+        client = Client(enforce_csrf_checks=True)
+        session = client.session
+        session['user_id'] = user.id
+        session.save()
+        return client
+
+    def csrf_token(self, client=None):
+        client = client or self.client
+        client.get(f'/applications/create/?job={self.job.id}')
+        return client.cookies['csrftoken'].value
+
+    def apply(self, client=None, query='', content=PDF, **extra):
+        client = client or self.client
+        return client.post(
+            f'/applications/create/?job={self.job.id}{query}',
+            {
+                'csrfmiddlewaretoken': self.csrf_token(client),
+                'message': '你好',
+                'cv_file': SimpleUploadedFile('简历.pdf', content),
+            },
+            **extra,
+        )
+
+
+class ApplicationCreateTests(ApplicationTestCase):
+
+    def test_apply(self):
+        response = self.apply()
+        self.assertRedirects(response, f'/jobs/{self.job.id}/', fetch_redirect_response=False)
+        application = Application.objects.get()
+        self.assertEqual(application.cv_name, '简历.pdf')
+        self.assertEqual(application.cv_file.read(), PDF)
+
+    def test_csrf_required(self):
+        response = self.client.post(
+            f'/applications/create/?job={self.job.id}',
+            {'message': '你好', 'cv_file': SimpleUploadedFile('简历.pdf', PDF)},
+        )
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(Application.objects.exists())
+
+    @override_settings(CV_UPLOAD_MAX_SIZE=1024 * 1024)
+    def test_oversized_body_shows_size_error(self):
+        response = self.apply(content=b'%PDF-1.4\n' + b'x' * (1024 * 1024 + 100 * 1024))
+        self.assertEqual(response.status_code, 400)
+        self.assertContains(response, '简历文件不能超过 1MB', status_code=400)
+        self.assertNotIn('message', response.context['form'].errors)
+        self.assertFalse(Application.objects.exists())
+
+    @override_settings(CV_UPLOAD_MAX_SIZE=1024 * 1024)
+    def test_oversized_file_within_body_limit(self):
+        # 请求体未超过余量，文件在接收过程中超限被跳过
+        response = self.apply(content=b'%PDF-1.4\n' + b'x' * (1024 * 1024 + 1024))
+        self.assertContains(response, '简历文件不能超过 1MB', status_code=400)
+        self.assertFalse(Application.objects.exists())
+
+    def test_signature_mismatch(self):
+        response = self.apply(content=b'MZ' + b'x' * 100)
+        self.assertContains(response, '简历文件内容与扩展名不符', status_code=400)
+        self.assertFalse(Application.objects.exists())
+
+
+class IdempotentApplyTests(ApplicationTestCase):
+    KEY = 'a1b2c3d4e5f6a7b8'
+
+    def test_form_carries_idempotency_key(self):
+        response = self.client.get(f'/applications/create/?job={self.job.id}')
+        self.assertRegex(response.content.decode(), r'idempotency_key=[0-9a-f]{32}')
+
+    def test_replay_returns_original_result(self):
+        first = self.apply(query=f'&idempotency_key={self.KEY}')
+        self.assertEqual(first.status_code, 302)
+        with mock.patch.object(CVUploadHandler, 'receive_data_chunk', side_effect=AssertionError('body read')):
+            second = self.apply(query=f'&idempotency_key={self.KEY}')
+        self.assertEqual(second.status_code, 302)
+        self.assertEqual(second.url, first.url)
+        self.assertEqual(Application.objects.count(), 1)
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.application_count, 1)
+
+    def test_in_flight_duplicate_is_not_processed(self):
+        self.assertIsNone(idempotency.claim(self.applicant.id, self.KEY))
+        with mock.patch.object(CVUploadHandler, 'receive_data_chunk', side_effect=AssertionError('body read')):
+            response = self.apply(query=f'&idempotency_key={self.KEY}')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response['Retry-After'], '1')
+        self.assertEqual(response.context['idempotency_key'], self.KEY)
+        self.assertFalse(Application.objects.exists())
+        # 处理中的占位不能被重复请求释放
+        self.assertEqual(idempotency.claim(self.applicant.id, self.KEY), idempotency.PENDING)
+
+    def test_failed_submission_releases_key(self):
+        response = self.apply(query=f'&idempotency_key={self.KEY}', content=b'not a pdf')
+        self.assertEqual(response.status_code, 400)
+        response = self.apply(query=f'&idempotency_key={self.KEY}')
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Application.objects.count(), 1)
+
+    def test_invalid_key(self):
+        response = self.apply(query='&idempotency_key=bad key')
+        self.assertEqual(response.status_code, 400)
+
+    def test_already_applied_without_key(self):
+        self.apply()
+        with mock.patch.object(CVUploadHandler, 'receive_data_chunk', side_effect=AssertionError('body read')):
+            response = self.apply()
+        self.assertRedirects(response, f'/jobs/{self.job.id}/', fetch_redirect_response=False)
+        self.assertEqual(Application.objects.count(), 1)
+
+    def test_concurrent_insert_hits_unique_constraint(self):
+        # 另一个请求在本请求的预检查之后插入了申请
+        self.apply()
+        token = self.csrf_token()
+        with mock.patch('applications.views.Application.objects.filter') as precheck:
+            precheck.return_value.exists.return_value = False
+            response = self.client.post(f'/applications/create/?job={self.job.id}', {
+                'csrfmiddlewaretoken': token,
+                'message': '你好',
+                'cv_file': SimpleUploadedFile('简历.pdf', PDF),
+            }, follow=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('您已申请过该职位。', [str(message) for message in response.context['messages']])
+        self.assertEqual(Application.objects.count(), 1)
+        self.job.refresh_from_db()
+        self.company.refresh_from_db()
+        self.assertEqual((self.job.application_count, self.company.application_count), (1, 1))
+
+    def test_unique_constraint(self):
+        Application.objects.create(job=self.job, applicant=self.applicant, message='1', cv_file='applications/cvs/a.pdf')
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Application.objects.create(job=self.job, applicant=self.applicant, message='2', cv_file='applications/cvs/b.pdf')
+
+
+@override_settings(SENDFILE_BACKEND=None)
+class DownloadCVTests(ApplicationTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.apply()
+        self.application = Application.objects.get()
+        self.url = f'/company/applications/{self.application.id}/download-cv/'
+        self.company_client = self.login(self.company)
+
+    def test_download(self):
+        response = self.company_client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), PDF)
+        self.assertEqual(response['Content-Disposition'], "attachment; filename*=utf-8''%E7%AE%80%E5%8E%86.pdf")
+
+    def test_other_company(self):
+        other = User.objects.create(
+            login_id='globex', password='!', nickname='Globex', email='hr@globex.test', type='company',
+        )
+        self.assertEqual(self.login(other).get(self.url).status_code, 404)
+        # 不存在的申请同样是 404，不泄露申请是否存在
+        self.assertEqual(self.company_client.get('/company/applications/999999/download-cv/').status_code, 404)
+
+    def test_range(self):
+        response = self.company_client.get(self.url, HTTP_RANGE='bytes=0-3')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b''.join(response.streaming_content), b'%PDF')
+        self.assertEqual(response['Content-Range'], f'bytes 0-3/{len(PDF)}')
+        self.assertEqual(response['Content-Length'], '4')
+        self.assertIn('%E7%AE%80%E5%8E%86.pdf', response['Content-Disposition'])
+        response = self.company_client.get(self.url, HTTP_RANGE='bytes=-5')
+        self.assertEqual(response['Content-Range'], f'bytes {len(PDF) - 5}-{len(PDF) - 1}/{len(PDF)}')
+
+    def test_unsatisfiable_range(self):
+        response = self.company_client.get(self.url, HTTP_RANGE=f'bytes={len(PDF)}-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], f'bytes */{len(PDF)}')
+
+    def test_no_direct_media_access(self):
+        for client in (Client(), self.company_client, self.client):
+            with self.subTest(client=client):
+                self.assertEqual(client.get(f'/media/{self.application.cv_file.name}').status_code, 404)
+
+
+class CVArchiveTests(ApplicationTestCase):
+
+    def setUp(self):
+        super().setUp()
+        storage = get_media_storage()
+        self.contents = {}
+        for index in range(3):
+            applicant = User.objects.create(
+                login_id=f'user{index}', password='!', nickname=f'用户{index}', email=f'u{index}@example.test',
+                type='individual',
+            )
+            content = f'%PDF-{index}'.encode()
+            name = storage.save(f'applications/cvs/{index}.pdf', ContentFile(content))
+            application = Application.objects.create(
+                job=self.job, applicant=applicant, message='你好', cv_file=name, cv_name=f'{index}.pdf',
+            )
+            self.contents[application.id] = content
+        # 文件已被删除的申请
+        self.missing = Application.objects.create(
+            job=self.job, applicant=self.applicant, message='你好', cv_file='applications/cvs/gone.pdf', cv_name='gone.pdf',
+        )
+
+    def download(self):
+        client = self.login(self.company)
+        with self.assertLogs('applications.archive', 'WARNING'):
+            response = client.get(f'/company/jobs/{self.job.id}/cvs/')
+            self.assertEqual(response.status_code, 200)
+            return zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+
+    def test_manifest_matches_entries(self):
+        with self.download() as archive:
+            rows = list(csv.DictReader(io.StringIO(archive.read('manifest.csv').decode('utf-8-sig'))))
+            entries = set(archive.namelist()) - {'manifest.csv'}
+            self.assertEqual({row['file'] for row in rows if row['file']}, entries)
+            self.assertEqual(len(rows), len(self.contents) + 1)
+            for row in rows:
+                application_id = int(row['id'])
+                with self.subTest(application_id=application_id):
+                    if application_id == self.missing.id:
+                        self.assertEqual((row['file'], row['file_status']), ('', 'missing'))
+                    else:
+                        self.assertEqual(row['file_status'], 'included')
+                        self.assertEqual(archive.read(row['file']), self.contents[application_id])
+
+    def test_single_pass(self):
+        # 清单和简历来自同一次遍历：一批数据加一次确认没有更多数据的查询
+        with CaptureQueriesContext(connection) as queries:
+            self.download().close()
+        self.assertEqual(sum('FROM "applications"' in query['sql'] for query in queries), 2)
+
+
+class CounterTests(ApplicationTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.company_client = self.login(self.company)
+
+    def assertCounts(self, expected):
+        self.job.refresh_from_db()
+        self.company.refresh_from_db()
+        self.assertEqual((self.job.application_count, self.job.unread_application_count), expected)
+        self.assertEqual((self.company.application_count, self.company.unread_application_count), expected)
+
+    def test_create_mark_read_delete(self):
+        self.apply()
+        self.assertCounts((1, 1))
+        application = Application.objects.get()
+        url = f'/company/applications/{application.id}/'
+        self.assertEqual(self.company_client.get(url).status_code, 200)
+        self.assertCounts((1, 0))
+        # 再次查看不重复扣减
+        self.company_client.get(url)
+        self.assertCounts((1, 0))
+        application.delete()
+        self.assertCounts((0, 0))
+
+    def test_delete_unread(self):
+        self.apply()
+        Application.objects.get().delete()
+        self.assertCounts((0, 0))
+
+    def test_inbox_query_count_independent_of_size(self):
+        def inbox_queries():
+            with CaptureQueriesContext(connection) as queries:
+                response = self.company_client.get('/company/applications/')
+            self.assertEqual(response.status_code, 200)
+            return len(queries)
+
+        self.apply()
+        baseline = inbox_queries()
+        for index in range(5):
+            job = Job.objects.create(
+                company_user=self.company, title=f'职位{index}', requirement='Python', duty='写代码', salary='10k',
+            )
+            Application.objects.create(job=job, applicant=self.applicant, message='你好', cv_file='applications/cvs/a.pdf')
+        self.assertEqual(inbox_queries(), baseline)
+        # 不做 COUNT(*)
+        with CaptureQueriesContext(connection) as queries:
+            self.company_client.get(f'/company/applications/?job_id={self.job.id}')
+        self.assertFalse([query['sql'] for query in queries if 'COUNT(' in query['sql']])
+
+
+class ReconcileCountersTests(ApplicationTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.apply()
+        Application.objects.update(status='reviewed')
+        Job.objects.filter(id=self.job.id).update(application_count=5, unread_application_count=5)
+        User.objects.filter(id=self.company.id).update(application_count=0, unread_application_count=3)
+
+    def reconcile(self, *args):
+        output = io.StringIO()
+        call_command('reconcile_application_counters', *args, stdout=output)
+        return output.getvalue()
+
+    def counts(self):
+        self.job.refresh_from_db()
+        self.company.refresh_from_db()
+        return [
+            (self.job.application_count, self.job.unread_application_count),
+            (self.company.application_count, self.company.unread_application_count),
+        ]
+
+    def test_dry_run(self):
+        output = self.reconcile('--dry-run')
+        self.assertIn(f'职位 {self.job.id}：5/5 -> 1/0', output)
+        self.assertIn(f'公司用户 {self.company.id}：0/3 -> 1/0', output)
+        self.assertIn('发现 1 个职位、1 个公司用户的计数偏差', output)
+        self.assertEqual(self.counts(), [(5, 5), (0, 3)])
+
+    def test_one_update_per_table_per_company(self):
+        with CaptureQueriesContext(connection) as queries:
+            output = self.reconcile()
+        self.assertIn('已校正 1 个职位、1 个公司用户的计数偏差', output)
+        self.assertEqual(self.counts(), [(1, 0), (1, 0)])
+        updates = [query['sql'] for query in queries if query['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 2)
+        # 计数由子查询在 UPDATE 中求出，而不是写回读到的常量
+        self.assertTrue(all('COUNT(' in sql for sql in updates))
+
+    def test_no_writes_when_consistent(self):
+        self.reconcile()
+        with CaptureQueriesContext(connection) as queries:
+            self.assertIn('已校正 0 个职位、0 个公司用户', self.reconcile())
+        self.assertFalse([query['sql'] for query in queries if query['sql'].startswith('UPDATE')])
@@ -0,0 +1,96 @@
+"""简历上传处理器
+
+替换默认的上传处理器（需在读取 request.POST/FILES 之前安装）：
+- 请求体总长度超限的请求由视图在读取请求体之前拒绝（见 ``body_too_large``）
+- 扩展名不允许时在文件开始时跳过；文件头（魔数）不匹配时在第一个分块跳过；
+  累计大小超限时在超出的那个分块跳过。被跳过的文件只读取丢弃，不写入磁盘
+- 边接收边写入临时文件并计算 SHA-256，结果挂在上传文件的 ``content_sha256`` 上，
+  内容寻址存储保存时不再重新读取计算
+"""
+import hashlib
+import os
+
+from django.conf import settings
+from django.core.files.uploadhandler import SkipFile, TemporaryFileUploadHandler
+
+
+CV_FIELD_NAME = 'cv_file'
+
+# 允许的简历类型：扩展名 -> 文件头
+CV_SIGNATURES = {
+    '.pdf': (b'%PDF-',),
+    '.doc': (b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1',),
+    '.docx': (b'PK\x03\x04',),
+}
+
+# 除简历外表单其他字段（留言等）允许的最大字节数
+FORM_OVERHEAD = 64 * 1024
+
+
+def get_cv_max_size():
+    return getattr(settings, 'CV_UPLOAD_MAX_SIZE', 10 * 1024 * 1024)
+
+
+def cv_extension(file_name):
+    return os.path.splitext(file_name or '')[1].lower()
+
+
+def cv_size_error(max_size=None):
+    return f'简历文件不能超过 {(max_size or get_cv_max_size()) // (1024 * 1024)}MB！'
+
+
+def body_too_large(request):
+    """请求体声明的长度是否超过简历上限加表单其他字段的余量（只看请求头，不读取请求体）"""
+    try:
+        content_length = int(request.META.get('CONTENT_LENGTH') or 0)
+    except ValueError:
+        return False
+    return content_length > get_cv_max_size() + FORM_OVERHEAD
+
+
+class CVUploadHandler(TemporaryFileUploadHandler):
+    """流式接收简历：尽早拒绝超限/类型不符的文件，边写磁盘边计算哈希"""
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.max_size = get_cv_max_size()
+        self.errors = {}
+        self.digest = None
+        self.received = 0
+
+    def size_error(self):
+        return cv_size_error(self.max_size)
+
+    def reject(self, message):
+        self.errors[CV_FIELD_NAME] = message
+        raise SkipFile()
+
+    def new_file(self, field_name, file_name, content_type, content_length, charset=None, content_type_extra=None):
+        if field_name != CV_FIELD_NAME:
+            raise SkipFile()
+        if cv_extension(file_name) not in CV_SIGNATURES:
+            self.reject('简历只支持 PDF、DOC、DOCX 格式！')
+        if content_length is not None and content_length > self.max_size:
+            self.reject(self.size_error())
+        self.digest = hashlib.sha256()
+        self.received = 0
+        super().new_file(field_name, file_name, content_type, content_length, charset, content_type_extra)
+
+    def receive_data_chunk(self, raw_data, start):
+        if start == 0 and not raw_data.startswith(CV_SIGNATURES[cv_extension(self.file_name)]):
+            self.reject('简历文件内容与扩展名不符！')
+        self.received += len(raw_data)
+        if self.received > self.max_size:
+            self.reject(self.size_error())
+        self.digest.update(raw_data)
+        self.file.write(raw_data)
+
+    def file_complete(self, file_size):
+        uploaded = super().file_complete(file_size)
+        if file_size == 0:
+            # 空文件没有经过文件头检查，不作为上传文件返回
+            uploaded.close()
+            self.errors[CV_FIELD_NAME] = '简历文件不能为空！'
+            return None
+        uploaded.content_sha256 = self.digest.hexdigest()
+        return uploaded
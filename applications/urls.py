@@ -4,8 +4,9 @@ from . import views
 app_name = 'applications'
 
 urlpatterns = [
+    # 申请职位：/applications/create/?job=<id>
+    path('create/', views.application_create_view, name='create'),
     # 以下路由将在后续实现
-    # path('create/', views.application_create_view, name='create'),
     # 公司端申请相关路由（通过 /company/ 前缀访问）
     # path('applications/', views.company_application_list_view, name='company_list'),
     # path('applications/<int:app_id>/', views.company_application_detail_view, name='company_detail'),
@@ -1,3 +1,266 @@
-from django.shortcuts import render
+import os
+import uuid
 
-# Create your views here.
+from django.contrib import messages
+from django.db import IntegrityError, transaction
+from django.http import Http404, HttpResponseBadRequest, StreamingHttpResponse
+from django.shortcuts import render, redirect, get_object_or_404
+from django.utils import timezone
+from django.utils.http import content_disposition_header
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+from django.views.decorators.http import require_http_methods, require_safe
+from jobs.models import Job
+from jobs.pagination import KnownCountPaginator
+from web.sendfile import serve_file
+from web.storage import get_media_storage
+from . import idempotency
+from .archive import iter_cv_archive
+from .models import Application
+from .counters import mark_read
+from .forms import ApplicationForm
+from .uploads import CV_FIELD_NAME, CVUploadHandler, body_too_large, cv_size_error
+
+
+@csrf_exempt
+@require_http_methods(["GET", "POST"])
+def application_create_view(request):
+    """申请职位视图（仅个人用户，中间件已检查）
+
+    上传处理器必须在读取 request.POST 之前替换，而 CsrfViewMiddleware 会读取 POST，
+    因此外层免除中间件的 CSRF 检查，安装处理器后再由 csrf_protect 做同样的检查。
+    请求体超限时也在这里直接返回大小错误：不读取请求体就拿不到表单中的 CSRF 令牌，
+    而这个响应不改变任何状态，无需 CSRF 校验。
+    重复提交也在读取请求体之前拦截（不接收上传文件）：幂等键已完成时返回原请求的结果，处理中时返回 409，
+    已申请过该职位时直接提示，见 applications.idempotency。
+    """
+    current_user = getattr(request, 'user_obj', None)
+    job_id = request.GET.get('job')
+    
+    if request.method == 'POST' and body_too_large(request):
+        return _oversized_response(request, job_id)
+    
+    key = ''
+    if request.method == 'POST':
+        key = idempotency.get_key(request)
+        if key is None:
+            return HttpResponseBadRequest('无效的幂等键')
+        if key:
+            state = idempotency.claim(current_user.id, key)
+            if state == idempotency.PENDING:
+                # 同一提交仍在处理中：不等待，返回同一个键的表单，稍后重新提交即得到原结果
+                return _in_flight_response(request, job_id, key)
+            if state is not None:
+                # 与原请求相同的结果
+                messages.success(request, state['message'])
+                return redirect('jobs:detail', job_id=state['job_id'])
+    
+    try:
+        if str(job_id or '').isdigit() and Application.objects.filter(job_id=job_id, applicant_id=current_user.id).exists():
+            messages.info(request, '您已申请过该职位。')
+            return redirect('jobs:detail', job_id=job_id)
+        
+        handler = None
+        if request.method == 'POST':
+            handler = CVUploadHandler(request)
+            request.upload_handlers = [handler]
+        return _application_create(request, handler, key)
+    finally:
+        if key:
+            # 未成功完成（表单错误、CSRF 失败、异常）时释放占位，允许用同一个键重试
+            idempotency.release_pending(current_user.id, key)
+
+
+def _unread_body_response(request, job_id, form, key, status):
+    """未读取请求体时返回申请表单"""
+    if not str(job_id or '').isdigit():
+        messages.warning(request, '请选择要申请的职位。')
+        return redirect('jobs:list')
+    job = get_object_or_404(Job.objects.only('id', 'title'), id=job_id)
+    return render(request, 'applications/create.html', {
+        'form': form,
+        'job': job,
+        'idempotency_key': key,
+    }, status=status)
+
+
+def _oversized_response(request, job_id):
+    """请求体超限：不读取请求体，返回带简历大小错误的表单（400）"""
+    form = ApplicationForm.rejected({CV_FIELD_NAME: cv_size_error()})
+    return _unread_body_response(request, job_id, form, uuid.uuid4().hex, 400)
+
+
+def _in_flight_response(request, job_id, key):
+    """同一幂等键的请求处理中：不读取请求体，返回沿用该键的表单（409）"""
+    messages.info(request, '该申请正在提交中，请稍后再次提交以查看结果。')
+    response = _unread_body_response(request, job_id, ApplicationForm(), key, 409)
+    response['Retry-After'] = '1'
+    return response
+
+
+@csrf_protect
+def _application_create(request, handler, key):
+    current_user = getattr(request, 'user_obj', None)
+    # 职位 ID 优先从查询参数获取（表单提交到 ?job=<id>），不存在时不读取请求体
+    job_id = request.GET.get('job') or request.POST.get('job_id')
+    if not str(job_id or '').isdigit():
+        messages.warning(request, '请选择要申请的职位。')
+        return redirect('jobs:list')
+    job = get_object_or_404(Job.objects.only('id', 'title', 'company_user_id'), id=job_id)
+    
+    if request.method == 'POST':
+        form = ApplicationForm(request.POST, request.FILES, upload_errors=handler.errors)
+        if form.is_valid():
+            application = form.save(commit=False)
+            application.job = job
+            application.applicant = current_user
+            application.cv_name = form.cleaned_data['cv_file'].name
+            try:
+                with transaction.atomic():
+                    application.save()
+            except IntegrityError:
+                # 并发的另一个请求（不同或没有幂等键）已创建申请；已保存的简历文件由 gc_media_blobs 回收
+                messages.info(request, '您已申请过该职位。')
+                return redirect('jobs:detail', job_id=job.id)
+            message = f'已成功申请职位"{job.title}"！'
+            if key:
+                idempotency.complete(current_user.id, key, {
+                    'job_id': job.id,
+                    'application_id': application.id,
+                    'message': message,
+                })
+            messages.success(request, message)
+            return redirect('jobs:detail', job_id=job.id)
+        status = 400
+    else:
+        form = ApplicationForm()
+        status = 200
+    
+    return render(request, 'applications/create.html', {
+        'form': form,
+        'job': job,
+        'idempotency_key': uuid.uuid4().hex,
+    }, status=status)
+
+
+# 简历只允许下载者自己的浏览器缓存；内容寻址文件内容不变，可长期缓存
+CV_CACHE_CONTROL = 'private, max-age=31536000, immutable'
+
+
+@require_safe
+def download_cv_view(request, app_id):
+    """下载简历（仅职位所属公司，中间件已检查公司用户）
+
+    授权与取文件名在一条关联查询中完成：申请不存在或不属于本公司的职位时一律 404，不泄露申请是否存在。
+    文件发送见 web.sendfile（X-Accel-Redirect/X-Sendfile 或 FileResponse，支持 Range）。
+    """
+    current_user = getattr(request, 'user_obj', None)
+    row = (
+        Application.objects
+        .filter(id=app_id, job__company_user_id=current_user.id)
+        .values_list('cv_file', 'cv_name')
+        .first()
+    )
+    if row is None or not row[0]:
+        raise Http404('简历不存在')
+    
+    name, cv_name = row
+    return serve_file(
+        request, name, get_media_storage().path(name),
+        cache_control=CV_CACHE_CONTROL,
+        download_name=cv_name or os.path.basename(name),
+    )
+
+
+@require_safe
+def download_job_cvs_view(request, job_id):
+    """打包下载职位收到的全部简历（ZIP，内含 manifest.csv 清单）
+
+    归档边查询边读取边输出（见 applications.archive），首字节时间与申请数量无关；清单在最后写入。
+    """
+    current_user = getattr(request, 'user_obj', None)
+    title = (
+        Job.objects
+        .filter(id=job_id, company_user_id=current_user.id)
+        .values_list('title', flat=True)
+        .first()
+    )
+    if title is None:
+        raise Http404('职位不存在')
+    
+    response = StreamingHttpResponse(iter_cv_archive(job_id), content_type='application/zip')
+    response['Content-Disposition'] = content_disposition_header(True, f'{title}-简历-{timezone.localdate():%Y%m%d}.zip')
+    return response
+
+
+# 申请列表每页条数
+APPLICATION_LIST_PAGE_SIZE = 20
+
+# 申请列表侧栏最多显示的职位数（按未读数排序）
+INBOX_JOB_LIMIT = 50
+
+
+@require_safe
+def company_application_list_view(request):
+    """公司收到的申请列表（可按 ?job_id= 过滤）
+
+    总数和各职位的申请数/未读数直接读计数列，不做 COUNT(*)；
+    申请、职位、申请人在一条关联查询中取出，整页查询次数固定。
+    """
+    current_user = getattr(request, 'user_obj', None)
+    applications = (
+        Application.objects
+        .filter(job__company_user_id=current_user.id)
+        .select_related('job', 'applicant')
+        .only(
+            'id', 'status', 'cv_name', 'created_at',
+            'job__id', 'job__title',
+            'applicant__id', 'applicant__nickname', 'applicant__email',
+        )
+    )
+    total = current_user.application_count
+    
+    selected_job = None
+    job_id = request.GET.get('job_id', '')
+    if job_id:
+        selected_job = (
+            Job.objects
+            .filter(id=job_id if job_id.isdigit() else 0, company_user_id=current_user.id)
+            .only('id', 'title', 'application_count', 'unread_application_count')
+            .first()
+        )
+        if selected_job is None:
+            raise Http404('职位不存在')
+        applications = applications.filter(job_id=selected_job.id)
+        total = selected_job.application_count
+    
+    # 用计数列代替 COUNT(*)
+    paginator = KnownCountPaginator(applications, APPLICATION_LIST_PAGE_SIZE, total)
+    page_obj = paginator.get_page(request.GET.get('page'))
+    
+    jobs = (
+        Job.objects
+        .filter(company_user_id=current_user.id, application_count__gt=0)
+        .only('id', 'title', 'application_count', 'unread_application_count')
+        .order_by('-unread_application_count', '-created_at', '-id')[:INBOX_JOB_LIMIT]
+    )
+    
+    return render(request, 'applications/company_list.html', {
+        'page_obj': page_obj,
+        'jobs': jobs,
+        'selected_job': selected_job,
+        'total': total,
+        'unread': selected_job.unread_application_count if selected_job else current_user.unread_application_count,
+    })
+
+
+@require_safe
+def company_application_detail_view(request, app_id):
+    """申请详情（仅职位所属公司），首次查看时标记为已读"""
+    current_user = getattr(request, 'user_obj', None)
+    application = get_object_or_404(
+        Application.objects.select_related('job', 'applicant'),
+        id=app_id,
+        job__company_user_id=current_user.id,
+    )
+    mark_read(application, current_user.id)
+    return render(request, 'applications/company_detail.html', {'application': application})
@@ -0,0 +1,158 @@
+"""公司职位的批量导入、导出与批量删除
+
+导入：流式读取 CSV/JSONL，逐行用 JobForm 校验，校验通过的行分批 bulk_create，
+某一行出错只记录错误，不影响其他行。
+导出：按 (created_at, id) 键集分批读取，每批一次查询，内存占用与职位总数无关。
+删除：限定在公司自己的职位范围内，先删申请再删职位，每批 ID 各一条集合 DELETE；
+删除单个职位时不预先读取，直接按 (id, company_user_id) 删除并以受影响行数判断。
+两者都绕过了逐条的 post_save/post_delete，由 jobs_written / jobs_deleted 信号统一处理缓存与索引。
+"""
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection, connections, models, transaction
+from django.db.models import Q
+
+from web.importing import batched, iter_records
+
+from .forms import JobForm
+from .models import Job
+from .signals import jobs_deleted, jobs_deleting, jobs_written
+
+
+# 每批插入的职位数
+IMPORT_BATCH_SIZE = 500
+
+# 集合删除时每条 DELETE 的职位 ID 数（IN 列表长度）
+DELETE_BATCH_SIZE = 500
+
+# 导出时每批读取的职位数
+EXPORT_CHUNK_SIZE = 2000
+
+# 导出的字段
+EXPORT_FIELDS = (
+    'id', 'title', 'requirement', 'duty', 'salary', 'salary_min', 'salary_max',
+    'views', 'created_at', 'updated_at',
+)
+
+
+def _validated_jobs(stream, fmt, company_user, errors):
+    """逐行校验，产出未保存的 Job；错误追加到 errors: [(行号, {字段: [错误信息]})]"""
+    for line_num, record, error in iter_records(stream, fmt):
+        if error is not None:
+            errors.append((line_num, {'__all__': [error]}))
+            continue
+        form = JobForm(data=record)
+        if not form.is_valid():
+            errors.append((line_num, {field: list(messages) for field, messages in form.errors.items()}))
+            continue
+        job = form.save(commit=False)
+        job.company_user = company_user
+        # bulk_create 不调用 save()，派生字段需手动填充
+        job.fill_derived_fields()
+        yield job
+
+
+def import_jobs(stream, fmt, company_user, batch_size=IMPORT_BATCH_SIZE, on_batch=None):
+    """导入职位，返回 (成功条数, 错误列表)"""
+    created = 0
+    errors = []
+    for batch in batched(_validated_jobs(stream, fmt, company_user, errors), batch_size):
+        with transaction.atomic():
+            Job.objects.bulk_create(batch)
+        created += len(batch)
+        jobs_written.send(sender=Job, company_user_id=company_user.id, jobs=batch)
+        if on_batch is not None:
+            on_batch(created)
+    return created, errors
+
+
+def _cascade_tables():
+    """返回引用 Job 且 on_delete=CASCADE 的子表 [(表名, 外键列名)]
+
+    集合删除只处理一层 CASCADE：子表若有其他删除行为或自身又被引用，说明需要 Collector 的完整语义，
+    此时直接报错，而不是静默跳过。
+    """
+    tables = []
+    for relation in Job._meta.related_objects:
+        child = relation.related_model
+        if relation.on_delete is not models.CASCADE or child._meta.related_objects:
+            raise ImproperlyConfigured(
+                f'{child._meta.label}.{relation.field.name} 无法用集合 DELETE 删除，请在 jobs.bulk 中显式处理'
+            )
+        tables.append((child._meta.db_table, relation.field.column))
+    return tables
+
+
+def bulk_delete_jobs(company_user_id, jobs):
+    """用集合 DELETE 删除 jobs 查询集中该公司的职位，返回删除的职位 ID 列表
+
+    不经过 Collector 逐条加载实例（也就不发送 post_delete），按显式的顺序删除：
+    1. 锁定并取出要删除的职位 ID；
+    2. 发送 jobs_deleting，其他 app 据此维护依赖职位的数据（如公司的申请计数）；
+    3. 每批 ID 先删除 CASCADE 子表（如申请）中引用它们的行，再删除职位本身。
+    调用方在事务提交后发送 jobs_deleted，统一处理缓存和搜索索引。
+    """
+    connection = connections[jobs.db]
+    quote = connection.ops.quote_name
+    with transaction.atomic(using=jobs.db):
+        job_ids = list(jobs.filter(company_user_id=company_user_id).select_for_update().values_list('id', flat=True))
+        if not job_ids:
+            return []
+        jobs_deleting.send(
+            sender=Job, company_user_id=company_user_id, jobs=Job.objects.using(jobs.db).filter(id__in=job_ids),
+        )
+        tables = [*_cascade_tables(), (Job._meta.db_table, Job._meta.pk.column)]
+        with connection.cursor() as cursor:
+            for batch in batched(job_ids, DELETE_BATCH_SIZE):
+                placeholders = ', '.join(['%s'] * len(batch))
+                for table, column in tables:
+                    cursor.execute(f'DELETE FROM {quote(table)} WHERE {quote(column)} IN ({placeholders})', batch)
+    return job_ids
+
+
+def delete_company_job(company_user_id, job_id):
+    """删除公司自己的一个职位，返回删除的职位行数（0 表示不存在或不属于该公司）
+
+    不预先读取职位：计数扣减（jobs_deleting）、子表 DELETE 和职位 DELETE 都以 (id, company_user_id) 为条件，
+    未命中时每条语句都不影响任何行，由最后一条 DELETE 的受影响行数判断结果。
+    """
+    quote = connection.ops.quote_name
+    scope = f'{quote(Job._meta.pk.column)} = %s AND {quote(Job.company_user.field.column)} = %s'
+    params = [job_id, company_user_id]
+    with transaction.atomic(), connection.cursor() as cursor:
+        jobs_deleting.send(
+            sender=Job, company_user_id=company_user_id, jobs=Job.objects.filter(id=job_id),
+        )
+        for table, column in _cascade_tables():
+            cursor.execute(
+                f'DELETE FROM {quote(table)} WHERE {quote(column)} IN '
+                f'(SELECT {quote(Job._meta.pk.column)} FROM {quote(Job._meta.db_table)} WHERE {scope})',
+                params,
+            )
+        cursor.execute(f'DELETE FROM {quote(Job._meta.db_table)} WHERE {scope}', params)
+        return cursor.rowcount
+
+
+def delete_jobs(company_user, job_ids):
+    """删除公司自己的若干职位（不属于该公司的 ID 会被忽略），返回实际删除的 ID 列表"""
+    deleted_ids = bulk_delete_jobs(company_user.id, Job.objects.filter(id__in=job_ids))
+    if deleted_ids:
+        jobs_deleted.send(sender=Job, company_user_id=company_user.id, job_ids=deleted_ids)
+    return deleted_ids
+
+
+def iter_export_chunks(company_user, chunk_size=EXPORT_CHUNK_SIZE):
+    """按列表顺序（最新在前）分批产出公司的职位记录（dict 列表）
+
+    使用键集分页而不是单条查询的服务端游标：MySQL 驱动会把整个结果集读入客户端内存，
+    分批查询则每批只占用 chunk_size 行，并且走 (company_user, -created_at, -id) 索引。
+    """
+    jobs = Job.objects.filter(company_user=company_user).order_by('-created_at', '-id')
+    chunk = list(jobs.values(*EXPORT_FIELDS)[:chunk_size])
+    while chunk:
+        yield chunk
+        last = chunk[-1]
+        chunk = list(
+            jobs.filter(
+                Q(created_at__lt=last['created_at']) | Q(created_at=last['created_at'], id__lt=last['id'])
+            ).values(*EXPORT_FIELDS)[:chunk_size]
+        )
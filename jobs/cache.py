@@ -0,0 +1,141 @@
+"""职位列表查询结果缓存（版本号失效）
+
+公开列表使用全局版本号，公司端列表使用各公司自己的版本号，职位详情片段使用各职位的版本号；缓存 key 中带版本号，
+职位保存/删除时（见 jobs.signals）只递增受影响的版本号，旧 key 不再被访问，由缓存自行淘汰。
+缓存内容放在 settings.CACHES 的 'jobs' 别名（进程内 LocMemCache 即 LRU 淘汰）；
+版本号放在数据库表 job_cache_versions（jobs.models.CacheVersion），任一进程写入后所有进程立即失效（列表 ETag 也依赖它）：
+读取是一次主键查询，递增是一条 UPDATE，不像数据库缓存那样每次写入都附带 COUNT(*)、保存点和先读后写。
+"""
+import hashlib
+import threading
+import time
+
+from django.core.cache import caches
+from django.db.models import F
+
+from .models import CacheVersion
+
+
+JOB_CACHE_ALIAS = 'jobs'
+
+GLOBAL_SCOPE = 'global'
+
+# 列表页缓存时间（秒）；版本号变化会立即失效，这里只是兜底
+LIST_CACHE_TIMEOUT = 600
+
+# 职位详情片段缓存时间（秒）；职位保存/删除时失效，这里兜底公司昵称等关联数据的变化
+DETAIL_CACHE_TIMEOUT = 600
+
+
+def get_cache():
+    return caches[JOB_CACHE_ALIAS]
+
+
+def company_scope(company_user_id):
+    return f'company:{company_user_id}'
+
+
+def job_scope(job_id):
+    return f'job:{job_id}'
+
+
+def get_versions(scopes):
+    """一次查询读取多个范围的版本号 {scope: version}；从未写入过的范围为 0（读取不建行，不存在的职位 ID 不会留下记录）"""
+    rows = dict(CacheVersion.objects.filter(scope__in=scopes).values_list('scope', 'version'))
+    return {scope: rows.get(scope, 0) for scope in scopes}
+
+
+def get_version(scope):
+    return get_versions([scope])[scope]
+
+
+def bump_versions(scopes):
+    """递增版本号，使这些范围的所有缓存失效（调用方有事务时随写入一起提交）
+
+    已有的行一条 UPDATE 递增；有范围首次写入时以当前时间（纳秒）建行，既不同于读取时的默认值 0，
+    也不会和数据库重建前用过的版本号重复。建行被 ignore_conflicts 跳过的（已存在或被并发建行）再递增一次，
+    保证每次写入都换版本号（已递增过的行多递增一次无妨）。
+    """
+    scopes = list(dict.fromkeys(scopes))
+    if not scopes:
+        return
+    if CacheVersion.objects.filter(scope__in=scopes).update(version=F('version') + 1) < len(scopes):
+        now = time.time_ns()
+        CacheVersion.objects.bulk_create([CacheVersion(scope=scope, version=now) for scope in scopes], ignore_conflicts=True)
+        CacheVersion.objects.filter(scope__in=scopes, version__lt=now).update(version=F('version') + 1)
+
+
+def bump_version(scope):
+    bump_versions([scope])
+
+
+def bump_job_versions(company_user_id, job_ids=()):
+    """某公司的职位变化：公开列表、该公司列表和这些职位的详情片段都失效（一条 UPDATE）"""
+    bump_versions([GLOBAL_SCOPE, company_scope(company_user_id), *(job_scope(job_id) for job_id in job_ids)])
+
+
+class CacheStats:
+    """命中/未命中计数（进程内）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def as_dict(self):
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+        }
+
+
+list_cache_stats = CacheStats()
+
+
+def list_cache_key(scope, version, *parts):
+    """列表页缓存 key：范围 + 版本号 + 查询参数"""
+    digest = hashlib.md5(repr(parts).encode('utf-8')).hexdigest()
+    return f'jobs:list:{scope}:{version}:{digest}'
+
+
+def get_or_set_list_page(scope, version, parts, loader):
+    """读取列表页缓存（version 由调用方读取，与 ETag 共用），未命中时调用 loader 生成并写入，返回 (结果, 是否命中)"""
+    cache = get_cache()
+    key = list_cache_key(scope, version, *parts)
+    value = cache.get(key)
+    hit = value is not None
+    if not hit:
+        value = loader()
+        cache.set(key, value, LIST_CACHE_TIMEOUT)
+    list_cache_stats.record(hit)
+    return value, hit
+
+
+def detail_cache_key(job_id):
+    return f'jobs:detail:{job_id}:{get_version(job_scope(job_id))}'
+
+
+def get_or_set_detail(job_id, loader):
+    """读取职位详情片段缓存，未命中时调用 loader 生成并写入，返回 (结果, 是否命中)"""
+    cache = get_cache()
+    key = detail_cache_key(job_id)
+    value = cache.get(key)
+    hit = value is not None
+    if not hit:
+        value = loader()
+        cache.set(key, value, DETAIL_CACHE_TIMEOUT)
+    return value, hit
+
+
+def invalidate_job_details(job_ids):
+    """职位保存/删除后使其详情片段缓存失效"""
+    bump_versions([job_scope(job_id) for job_id in job_ids])
@@ -0,0 +1,113 @@
+"""职位浏览计数（写缓冲）
+
+每次浏览只在进程内计数，不写数据库；距上次写回超过 FLUSH_INTERVAL 秒或累计次数达到
+FLUSH_THRESHOLD 时，由当次请求把计数按增量分组，批量执行 ``UPDATE ... SET views = views + n``。
+进程退出时写回剩余计数。多进程部署时各进程各自缓冲，计数最终一致（进程被强制杀死时会丢失未写回的部分）。
+浏览数只显示在公司端列表中，写回后递增这些职位所属公司的列表版本号，列表缓存和 ETag 随之失效。
+"""
+import atexit
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db.models import F
+
+from .cache import bump_versions, company_scope
+from .models import Job
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SETTINGS = {
+    'FLUSH_INTERVAL': 30,
+    'FLUSH_THRESHOLD': 1000,
+}
+
+
+class BufferedViewCounter:
+    """进程内浏览计数缓冲"""
+
+    def __init__(self, flush_interval, flush_threshold):
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending = Counter()
+        self._pending_total = 0
+        self._last_flush = time.monotonic()
+
+    def incr(self, job_id):
+        """记录一次浏览，达到写回条件时写回"""
+        with self._lock:
+            self._pending[job_id] += 1
+            self._pending_total += 1
+            due = (self._pending_total >= self.flush_threshold
+                   or time.monotonic() - self._last_flush >= self.flush_interval)
+        if due:
+            self.flush(blocking=False)
+
+    def pending(self, job_id):
+        """尚未写回的浏览次数"""
+        with self._lock:
+            return self._pending.get(job_id, 0)
+
+    def _take(self):
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+            self._pending_total = 0
+            self._last_flush = time.monotonic()
+        return pending
+
+    def flush(self, blocking=True):
+        """写回缓冲的计数，返回执行的 UPDATE 条数（已有其他线程在写回时，非阻塞调用直接返回 0）"""
+        if not self._flush_lock.acquire(blocking=blocking):
+            return 0
+        try:
+            pending = self._take()
+            # 增量相同的职位合并为一条 UPDATE
+            by_increment = defaultdict(list)
+            for job_id, count in pending.items():
+                by_increment[count].append(job_id)
+            flushed = []
+            for count, job_ids in by_increment.items():
+                try:
+                    Job.objects.filter(id__in=job_ids).update(views=F('views') + count)
+                    flushed.extend(job_ids)
+                except Exception:
+                    logger.exception('职位浏览计数写回失败，%d 个职位的计数放回缓冲', len(job_ids))
+                    with self._lock:
+                        for job_id in job_ids:
+                            self._pending[job_id] += count
+                            self._pending_total += count
+            if flushed:
+                self._invalidate_company_lists(flushed)
+            return len(by_increment)
+        finally:
+            self._flush_lock.release()
+
+
+    def _invalidate_company_lists(self, job_ids):
+        """使显示这些职位浏览数的公司端列表缓存失效（公开列表和详情片段不显示浏览数，不受影响）"""
+        try:
+            company_ids = set(Job.objects.filter(id__in=job_ids).values_list('company_user_id', flat=True))
+            bump_versions([company_scope(company_user_id) for company_user_id in company_ids])
+        except Exception:
+            logger.exception('职位浏览计数写回后使公司列表缓存失效失败')
+
+
+_counter = None
+_counter_lock = threading.Lock()
+
+
+def get_view_counter():
+    """返回进程内的浏览计数器（按 settings.JOB_VIEW_COUNTER 配置）"""
+    global _counter
+    if _counter is None:
+        with _counter_lock:
+            if _counter is None:
+                config = {**DEFAULT_SETTINGS, **getattr(settings, 'JOB_VIEW_COUNTER', {})}
+                _counter = BufferedViewCounter(config['FLUSH_INTERVAL'], config['FLUSH_THRESHOLD'])
+                atexit.register(_counter.flush)
+    return _counter
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+
+from jobs.cache import bump_job_versions
+from jobs.models import Job
+from jobs.salary import parse_salary
+
+
+class Command(BaseCommand):
+    help = '按主键分批解析已有职位的 salary，回填 salary_min / salary_max'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='重新解析所有职位（默认只处理尚未解析的职位）')
+        parser.add_argument('--chunk-size', type=int, default=1000, help='每批处理的职位数')
+
+    def handle(self, *args, **options):
+        jobs = Job.objects.order_by('id')
+        if not options['all']:
+            jobs = jobs.filter(salary_min__isnull=True, salary_max__isnull=True)
+
+        chunk_size = options['chunk_size']
+        last_id = 0
+        updated = 0
+        company_ids = set()
+        while True:
+            # 按主键做键集分页，每批一次 SELECT + 一次 UPDATE，不长时间占用锁
+            rows = list(jobs.filter(id__gt=last_id).values_list('id', 'company_user_id', 'salary')[:chunk_size])
+            if not rows:
+                break
+            last_id = rows[-1][0]
+
+            changed = []
+            for job_id, company_user_id, salary in rows:
+                salary_min, salary_max = parse_salary(salary)
+                if salary_min is None and salary_max is None and not options['all']:
+                    continue
+                changed.append(Job(id=job_id, salary_min=salary_min, salary_max=salary_max))
+                company_ids.add(company_user_id)
+            if changed:
+                Job.objects.bulk_update(changed, ['salary_min', 'salary_max'])
+                updated += len(changed)
+            self.stdout.write(f'已处理到 id={last_id}，累计更新 {updated} 条')
+
+        # bulk_update 不触发信号，手动使列表缓存失效
+        for company_user_id in company_ids:
+            bump_job_versions(company_user_id)
+        self.stdout.write(self.style.SUCCESS(f'共更新 {updated} 个职位'))
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs.bulk import IMPORT_BATCH_SIZE, import_jobs
+from users.models import User
+from web.importing import FORMATS, guess_format
+
+
+class Command(BaseCommand):
+    help = '从 CSV/JSONL 为公司批量导入职位（逐行 JobForm 校验，分批 bulk_create）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('file', help='CSV 或 JSONL 文件路径；字段：title, requirement, duty, salary')
+        parser.add_argument('--company', required=True, help='发布职位的公司用户登录ID')
+        parser.add_argument('--format', choices=FORMATS, help='文件格式（默认按扩展名判断）')
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE, help='每批插入的职位数')
+
+    def handle(self, *args, **options):
+        try:
+            company_user = User.objects.get(login_id=options['company'], type='company')
+        except User.DoesNotExist:
+            raise CommandError(f'公司用户不存在：{options["company"]}')
+
+        path = options['file']
+        fmt = options['format'] or guess_format(path)
+        try:
+            stream = open(path, 'rb')
+        except OSError as exc:
+            raise CommandError(f'无法打开文件：{exc}')
+
+        with stream:
+            created, errors = import_jobs(
+                stream, fmt, company_user, options['batch_size'],
+                on_batch=lambda count: self.stdout.write(f'已导入 {count} 个职位'),
+            )
+
+        for line_num, row_errors in errors:
+            messages = '；'.join(f'{field}: {" ".join(items)}' for field, items in row_errors.items())
+            self.stderr.write(f'第 {line_num} 行：{messages}')
+        self.stdout.write(self.style.SUCCESS(f'导入完成：成功 {created} 个，失败 {len(errors)} 个'))
@@ -0,0 +1,35 @@
+# Generated by Django 5.0.3 on 2026-10-18 10:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0001_initial'),
+        ('users', '0003_user_profile_image_storage'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='job',
+            options={'ordering': ['-created_at', '-id'], 'verbose_name': '职位', 'verbose_name_plural': '职位'},
+        ),
+        # 先创建新索引再删除旧索引（MySQL 外键列在任何时刻都需要有索引）
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['company_user', '-created_at', '-id'], name='jobs_company_17a9bf_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['-created_at', '-id'], name='jobs_created_6df83b_idx'),
+        ),
+        migrations.RemoveIndex(
+            model_name='job',
+            name='jobs_company_35fdfd_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='job',
+            name='jobs_created_91fc39_idx',
+        ),
+    ]
@@ -0,0 +1,67 @@
+import re
+
+from django.db import migrations, transaction
+from django.db.utils import OperationalError
+
+
+# 分词规则的副本（与编写本迁移时的 jobs.search.tokenize 一致），迁移不依赖之后可能修改的应用代码
+CJK_RANGE = '\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff'
+TOKEN_RE = re.compile(rf'[{CJK_RANGE}]+|[a-z0-9]+(?:[.+#][a-z0-9+#]*)*')
+CJK_RE = re.compile(rf'^[{CJK_RANGE}]+$')
+
+
+def tokenize(text):
+    tokens = []
+    for match in TOKEN_RE.finditer((text or '').lower()):
+        word = match.group()
+        if CJK_RE.match(word):
+            if len(word) == 1:
+                tokens.append(word)
+            else:
+                tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+        else:
+            tokens.append(word)
+    return tokens
+
+
+def create_search_index(apps, schema_editor):
+    """按数据库类型创建全文索引：MySQL FULLTEXT（ngram）/ SQLite FTS5"""
+    connection = schema_editor.connection
+    if connection.vendor == 'mysql':
+        schema_editor.execute(
+            'ALTER TABLE jobs ADD FULLTEXT INDEX jobs_fulltext_idx (title, requirement, duty) WITH PARSER ngram'
+        )
+    elif connection.vendor == 'sqlite':
+        try:
+            with transaction.atomic(using=connection.alias):
+                schema_editor.execute('CREATE VIRTUAL TABLE jobs_fts USING fts5(title, body)')
+        except OperationalError:
+            # SQLite 未编译 FTS5，运行时使用进程内索引
+            return
+        Job = apps.get_model('jobs', 'Job')
+        with connection.cursor() as cursor:
+            for row in Job.objects.values('id', 'title', 'requirement', 'duty').iterator(chunk_size=2000):
+                cursor.execute(
+                    'INSERT INTO jobs_fts (rowid, title, body) VALUES (%s, %s, %s)',
+                    [row['id'], ' '.join(tokenize(row['title'])),
+                     ' '.join(tokenize(f"{row['requirement']}\n{row['duty']}"))],
+                )
+
+
+def drop_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'mysql':
+        schema_editor.execute('ALTER TABLE jobs DROP INDEX jobs_fulltext_idx')
+    elif connection.vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS jobs_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0002_job_cursor_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
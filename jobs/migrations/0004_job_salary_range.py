@@ -0,0 +1,28 @@
+# Generated by Django 5.0.3 on 2026-10-18 10:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0003_job_search_index'),
+        ('users', '0003_user_profile_image_storage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='salary_max',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='最高月薪'),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='salary_min',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='最低月薪'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['salary_min', 'salary_max'], name='jobs_salary__0b1197_idx'),
+        ),
+    ]
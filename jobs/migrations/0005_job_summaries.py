@@ -0,0 +1,51 @@
+# Generated by Django 5.0.3 on 2026-10-18 10:18
+
+from django.db import migrations, models
+from django.utils.text import Truncator
+
+
+# 摘要规则的副本（与编写本迁移时的 jobs.models.summarize 一致），迁移不依赖之后可能修改的应用代码
+SUMMARY_WORDS = 10
+SUMMARY_MAX_LENGTH = 200
+
+
+def summarize(text):
+    return Truncator(Truncator(text).words(SUMMARY_WORDS)).chars(SUMMARY_MAX_LENGTH)
+
+
+def fill_summaries(apps, schema_editor):
+    """为已有职位生成列表摘要（按主键分批）"""
+    Job = apps.get_model('jobs', 'Job')
+    last_id = 0
+    while True:
+        rows = list(
+            Job.objects.filter(id__gt=last_id).order_by('id').values_list('id', 'requirement', 'duty')[:1000]
+        )
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        Job.objects.bulk_update(
+            [Job(id=job_id, requirement_summary=summarize(requirement), duty_summary=summarize(duty))
+             for job_id, requirement, duty in rows],
+            ['requirement_summary', 'duty_summary'],
+        )
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0004_job_salary_range'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='duty_summary',
+            field=models.CharField(blank=True, default='', editable=False, max_length=200, verbose_name='职位职责摘要'),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='requirement_summary',
+            field=models.CharField(blank=True, default='', editable=False, max_length=200, verbose_name='职位要求摘要'),
+        ),
+        migrations.RunPython(fill_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.3 on 2026-10-18 10:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0005_job_summaries'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='views',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='浏览次数'),
+        ),
+    ]
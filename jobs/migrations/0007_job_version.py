@@ -0,0 +1,18 @@
+# Generated by Django 5.0.3 on 2026-10-18 10:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0006_job_views'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False, verbose_name='版本号'),
+        ),
+    ]
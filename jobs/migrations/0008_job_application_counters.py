@@ -0,0 +1,23 @@
+# Generated by Django 5.0.3 on 2026-10-18 10:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0007_job_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='application_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='申请数'),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='unread_application_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='未读申请数'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.0.3 on 2026-10-18 11:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0008_job_application_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CacheVersion',
+            fields=[
+                ('scope', models.CharField(max_length=64, primary_key=True, serialize=False, verbose_name='缓存范围')),
+                ('version', models.BigIntegerField(verbose_name='版本号')),
+            ],
+            options={
+                'verbose_name': '缓存版本号',
+                'verbose_name_plural': '缓存版本号',
+                'db_table': 'job_cache_versions',
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.0.3 on 2026-10-18 11:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0009_cache_versions'),
+        ('users', '0004_user_application_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeletedJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job_id', models.BigIntegerField(verbose_name='职位ID')),
+                ('deleted_at', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='删除时间')),
+            ],
+            options={
+                'verbose_name': '已删除职位',
+                'verbose_name_plural': '已删除职位',
+                'db_table': 'job_deletions',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['updated_at'], name='jobs_updated_b8946f_idx'),
+        ),
+    ]
@@ -1,6 +1,19 @@
 from django.db import models
+from django.utils.text import Truncator
 from users.models import User
 
+from .salary import parse_salary
+
+
+# 列表摘要：与原模板的 truncatewords:10 一致，再按字符数兜底（中文没有空格分词）
+SUMMARY_WORDS = 10
+SUMMARY_MAX_LENGTH = 200
+
+
+def summarize(text):
+    """生成列表展示用的摘要"""
+    return Truncator(Truncator(text).words(SUMMARY_WORDS)).chars(SUMMARY_MAX_LENGTH)
+
 
 class Job(models.Model):
     """职位模型"""
@@ -26,12 +39,71 @@ class Job(models.Model):
         verbose_name='职位职责'
     )
     
+    # 列表展示用的摘要，保存时由 requirement / duty 生成
+    requirement_summary = models.CharField(
+        max_length=SUMMARY_MAX_LENGTH,
+        blank=True,
+        default='',
+        editable=False,
+        verbose_name='职位要求摘要'
+    )
+    
+    duty_summary = models.CharField(
+        max_length=SUMMARY_MAX_LENGTH,
+        blank=True,
+        default='',
+        editable=False,
+        verbose_name='职位职责摘要'
+    )
+    
     salary = models.CharField(
         max_length=100,
         verbose_name='薪资',
         help_text='薪资范围或金额'
     )
     
+    # 由 salary 解析得到的月薪范围（元），用于薪资筛选；保存时自动填充
+    salary_min = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name='最低月薪'
+    )
+    
+    salary_max = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name='最高月薪'
+    )
+    
+    # 浏览次数：请求中只在内存累加，由 jobs.counters 定期批量写回
+    views = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='浏览次数'
+    )
+    
+    # 申请计数（由 applications.counters 用 F() 增量维护，reconcile_application_counters 修复偏差）
+    application_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='申请数'
+    )
+    
+    unread_application_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='未读申请数'
+    )
+    
+    # 乐观锁版本号：每次更新加 1，编辑时带上读到的版本号，不一致说明已被他人修改
+    version = models.PositiveIntegerField(
+        default=1,
+        editable=False,
+        verbose_name='版本号'
+    )
+    
     created_at = models.DateTimeField(
         auto_now_add=True,
         verbose_name='创建时间'
@@ -46,11 +118,122 @@ class Job(models.Model):
         db_table = 'jobs'
         verbose_name = '职位'
         verbose_name_plural = '职位'
-        ordering = ['-created_at']  # 按创建时间倒序
+        ordering = ['-created_at', '-id']  # 按创建时间倒序（id 保证顺序稳定，供游标分页使用）
         indexes = [
-            models.Index(fields=['company_user']),
-            models.Index(fields=['-created_at']),
+            # 公司端列表：company_user 过滤 + 游标排序
+            models.Index(fields=['company_user', '-created_at', '-id']),
+            # 公开列表的游标排序
+            models.Index(fields=['-created_at', '-id']),
+            # 薪资范围筛选
+            models.Index(fields=['salary_min', 'salary_max']),
+            # 进程内搜索索引按更新时间增量同步
+            models.Index(fields=['updated_at']),
         ]
     
+    # 源字段 -> 由它派生、保存时重新计算的字段
+    DERIVED_FIELDS = {
+        'salary': ('salary_min', 'salary_max'),
+        'requirement': ('requirement_summary',),
+        'duty': ('duty_summary',),
+    }
+    
+    # 计数字段：只用 F() 增量更新，整行保存时不写回，避免用读到的旧值覆盖
+    COUNTER_FIELDS = ('views', 'application_count', 'unread_application_count')
+    
+    # 列表页只查询展示需要的列，不加载 requirement / duty 全文
+    LIST_FIELDS = (
+        'id', 'company_user_id', 'title', 'requirement_summary', 'duty_summary',
+        'salary', 'views', 'created_at',
+    )
+    
+    def save(self, *args, **kwargs):
+        deferred = self.get_deferred_fields()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None and not self._state.adding:
+            self.version += 1
+            if deferred:
+                # 延迟加载的实例 Django 本来就只更新已加载的字段，这里再去掉计数字段
+                update_fields = [
+                    field.name for field in self._meta.concrete_fields
+                    if not field.primary_key and field.attname not in deferred and field.name not in self.COUNTER_FIELDS
+                ]
+                kwargs['update_fields'] = update_fields
+        sources = [
+            name for name in self.DERIVED_FIELDS
+            if name not in deferred and (update_fields is None or name in update_fields)
+        ]
+        self.fill_derived_fields(sources)
+        if update_fields is not None:
+            derived = [field for name in sources for field in self.DERIVED_FIELDS[name]]
+            kwargs['update_fields'] = {*update_fields, *derived}
+        super().save(*args, **kwargs)
+    
+    def _do_update(self, base_qs, using, pk_val, values, update_fields, forced_update):
+        # 整行保存时 UPDATE 不写回计数字段；其余仍是常规语义（行已被删除时回退为 INSERT），
+        # 显式传入 update_fields 的调用方按其指定的字段更新
+        if update_fields is None:
+            values = [value for value in values if value[0].name not in self.COUNTER_FIELDS]
+        return super()._do_update(base_qs, using, pk_val, values, update_fields, forced_update)
+    
+    @classmethod
+    def derived_field_names(cls):
+        """所有派生字段名"""
+        return [field for fields in cls.DERIVED_FIELDS.values() for field in fields]
+    
+    def fill_derived_fields(self, sources=None):
+        """根据源字段重新计算派生字段（默认全部）"""
+        sources = self.DERIVED_FIELDS if sources is None else sources
+        if 'salary' in sources:
+            self.salary_min, self.salary_max = parse_salary(self.salary)
+        if 'requirement' in sources:
+            self.requirement_summary = summarize(self.requirement)
+        if 'duty' in sources:
+            self.duty_summary = summarize(self.duty)
+    
     def __str__(self):
         return f'{self.title} - {self.company_user.nickname}'
+
+
+class CacheVersion(models.Model):
+    """职位列表/详情缓存的版本号（每个缓存范围一行，见 jobs.cache）
+    
+    放在数据库而不是缓存中：职位写入后紧接着（调用方有事务时在同一事务中）用一条 UPDATE 递增，
+    所有进程立即可见；读取是一次主键查询。
+    """
+    
+    scope = models.CharField(
+        max_length=64,
+        primary_key=True,
+        verbose_name='缓存范围'
+    )
+    
+    version = models.BigIntegerField(
+        verbose_name='版本号'
+    )
+    
+    class Meta:
+        db_table = 'job_cache_versions'
+        verbose_name = '缓存版本号'
+        verbose_name_plural = '缓存版本号'
+
+
+class DeletedJob(models.Model):
+    """被删除的职位记录，供进程内搜索索引在其他进程中增量移除（见 jobs.search.InMemoryIndexBackend）
+    
+    只在使用进程内索引时写入，超过保留时间的记录在写入时清理。
+    """
+    
+    job_id = models.BigIntegerField(
+        verbose_name='职位ID'
+    )
+    
+    deleted_at = models.DateTimeField(
+        auto_now_add=True,
+        db_index=True,
+        verbose_name='删除时间'
+    )
+    
+    class Meta:
+        db_table = 'job_deletions'
+        verbose_name = '已删除职位'
+        verbose_name_plural = '已删除职位'
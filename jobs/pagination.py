@@ -0,0 +1,117 @@
+"""职位列表的游标（keyset）分页
+
+按 (-created_at, -id) 排序，翻页条件直接走 (created_at, id) 索引范围扫描：
+不执行 COUNT(*)，也没有 OFFSET，第 1000 页和第 1 页的查询代价相同。
+游标是对最后/第一条记录位置的不透明编码，前端只需原样回传。
+总数已知时的页码分页使用 KnownCountPaginator。
+"""
+import base64
+import json
+
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+
+class CursorPage:
+    """一页结果（接口与 Paginator 的 Page 类似，模板可直接迭代）"""
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """按 (-created_at, -id) 的游标分页器"""
+
+    NEXT = 'n'
+    PREVIOUS = 'p'
+
+    def __init__(self, queryset, per_page):
+        self.queryset = queryset
+        self.per_page = per_page
+
+    @staticmethod
+    def encode_cursor(created_at, pk, direction):
+        payload = json.dumps({'t': created_at.isoformat(), 'i': pk, 'd': direction}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    @staticmethod
+    def decode_cursor(token):
+        """解码游标，无效时返回 None"""
+        try:
+            padded = token + '=' * (-len(token) % 4)
+            data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            created_at = parse_datetime(data['t'])
+            pk = int(data['i'])
+            direction = data['d']
+        except (ValueError, TypeError, KeyError, AttributeError):
+            return None
+        if created_at is None or direction not in (CursorPaginator.NEXT, CursorPaginator.PREVIOUS):
+            return None
+        return created_at, pk, direction
+
+    def get_page(self, token=None):
+        """返回游标所指的一页；游标为空或无效时返回第一页"""
+        cursor = self.decode_cursor(token) if token else None
+        limit = self.per_page + 1  # 多取一条用于判断是否还有下一页
+
+        if cursor is None:
+            rows = list(self.queryset.order_by('-created_at', '-id')[:limit])
+            has_more, has_before = len(rows) > self.per_page, False
+            rows = rows[:self.per_page]
+        else:
+            created_at, pk, direction = cursor
+            if direction == self.NEXT:
+                rows = list(
+                    self.queryset
+                    .filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+                    .order_by('-created_at', '-id')[:limit]
+                )
+                has_more, has_before = len(rows) > self.per_page, True
+                rows = rows[:self.per_page]
+            else:
+                rows = list(
+                    self.queryset
+                    .filter(Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk))
+                    .order_by('created_at', 'id')[:limit]
+                )
+                has_before, has_more = len(rows) > self.per_page, True
+                rows = rows[:self.per_page][::-1]
+
+        next_cursor = previous_cursor = None
+        if rows and has_more:
+            last = rows[-1]
+            next_cursor = self.encode_cursor(last.created_at, last.pk, self.NEXT)
+        if rows and has_before:
+            first = rows[0]
+            previous_cursor = self.encode_cursor(first.created_at, first.pk, self.PREVIOUS)
+        return CursorPage(rows, next_cursor, previous_cursor)
+
+
+class KnownCountPaginator(Paginator):
+    """总数已知（来自缓存或计数列）的页码分页器，不再执行 COUNT(*)"""
+
+    def __init__(self, object_list, per_page, count, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self._known_count = count
+
+    @property
+    def count(self):
+        return self._known_count
@@ -0,0 +1,72 @@
+"""薪资文本解析
+
+把自由填写的薪资（如 ``10k-20k``、``1.5万-2万``、``15k以上``、``年薪30万``）解析为
+以“元/月”为单位的 (最低, 最高)，用于建立索引和范围筛选。无法解析（如“面议”、日薪/时薪）时返回 (None, None)。
+"""
+import re
+from decimal import Decimal, InvalidOperation
+
+
+NUMBER_RE = re.compile(r'(\d+(?:\.\d+)?)\s*([kK千万wW]|元)?')
+
+UNIT_MULTIPLIERS = {
+    'k': 1000, 'K': 1000, '千': 1000,
+    '万': 10000, 'w': 10000, 'W': 10000,
+    '元': 1,
+}
+
+# 年薪：只认紧挨数字/单位的标记（年薪30万、30万/年、每年30万），“年终奖”“年底双薪”等不算
+YEARLY_RE = re.compile(r'年薪|[\dkK千万wW元]\s*(?:/|每)\s*年(?![终底度])|每年\s*\d')
+UNSUPPORTED_MARKERS = ('/天', '每天', '日薪', '/时', '/小时', '时薪')
+OPEN_UPPER_MARKERS = ('以上', '起', '+')
+OPEN_LOWER_MARKERS = ('以下', '以内')
+
+# 无单位的数字小于该值时按“千”处理（如 10-20 表示 10k-20k）
+BARE_THOUSANDS_THRESHOLD = 1000
+
+
+def _to_int(value, unit):
+    try:
+        amount = Decimal(value)
+    except InvalidOperation:
+        return None
+    if unit:
+        amount *= UNIT_MULTIPLIERS[unit]
+    elif amount < BARE_THOUSANDS_THRESHOLD:
+        amount *= 1000
+    return int(amount)
+
+
+def parse_salary(text):
+    """解析薪资文本，返回 (salary_min, salary_max)，单位：元/月"""
+    text = (text or '').strip()
+    if not text or any(marker in text for marker in UNSUPPORTED_MARKERS):
+        return None, None
+
+    # “·14薪”之类的年终月数不参与解析
+    text = re.sub(r'[·xX*]\s*\d+\s*薪', '', text)
+    matches = NUMBER_RE.findall(text)[:2]
+    if not matches:
+        return None, None
+
+    # 只在后一个数字上写单位时（如 10-20k、1-1.5万），前一个数字沿用该单位
+    if len(matches) == 2 and not matches[0][1] and matches[1][1]:
+        matches[0] = (matches[0][0], matches[1][1])
+
+    values = [_to_int(number, unit) for number, unit in matches]
+    if any(value is None for value in values):
+        return None, None
+
+    if YEARLY_RE.search(text):
+        values = [value // 12 for value in values]
+
+    if len(values) == 2:
+        low, high = sorted(values)
+        return low, high
+
+    value = values[0]
+    if any(marker in text for marker in OPEN_UPPER_MARKERS):
+        return value, None
+    if any(marker in text for marker in OPEN_LOWER_MARKERS):
+        return None, value
+    return value, value
@@ -0,0 +1,341 @@
+"""职位全文搜索
+
+按标题/要求/职责做关键词搜索并按相关度排序，支持中文：
+- MySQL：FULLTEXT 索引（ngram 分词器，二元切分中文），写入时由数据库自动维护
+- SQLite：FTS5 虚拟表 jobs_fts，存放本模块分词后的文本，职位保存/删除时增量更新
+- 其他数据库或未建索引时：进程内倒排索引（开发/兜底用），本进程写入时增量更新，其他进程的写入在搜索时按差量同步
+分词规则：中文按二元组（bigram）切分，英文/数字按单词切分并转为小写。
+公司范围和薪资筛选在各后端的查询内完成，结果上限作用于筛选之后，不会因其他职位排名更高而漏掉。
+"""
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from .cache import GLOBAL_SCOPE, get_version
+from .models import DeletedJob, Job
+
+
+# 搜索结果最多返回的条数
+SEARCH_RESULT_LIMIT = 200
+
+# 字段权重：标题命中比正文更相关
+TITLE_WEIGHT = 3.0
+BODY_WEIGHT = 1.0
+
+CJK_RANGE = '\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff'
+TOKEN_RE = re.compile(rf'[{CJK_RANGE}]+|[a-z0-9]+(?:[.+#][a-z0-9+#]*)*')
+CJK_RE = re.compile(rf'^[{CJK_RANGE}]+$')
+
+
+def tokenize(text):
+    """分词：中文二元切分，英文/数字按单词"""
+    tokens = []
+    for match in TOKEN_RE.finditer((text or '').lower()):
+        word = match.group()
+        if CJK_RE.match(word):
+            if len(word) == 1:
+                tokens.append(word)
+            else:
+                tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+        else:
+            tokens.append(word)
+    return tokens
+
+
+# 支持的筛选条件：名称 -> (列名, 比较运算符)；与列表页的薪资筛选语义一致
+FILTER_COLUMNS = {
+    'company_user_id': ('company_user_id', '='),
+    'salary_min': ('salary_min', '>='),
+    'salary_max': ('salary_max', '<='),
+}
+
+
+def _filter_sql(filters, table='jobs'):
+    """把筛选条件转换为 SQL 条件列表和参数"""
+    clauses, params = [], []
+    for name, value in filters.items():
+        column, operator = FILTER_COLUMNS[name]
+        clauses.append(f'{table}.{column} {operator} %s')
+        params.append(value)
+    return clauses, params
+
+
+def _matches_filters(meta, filters):
+    """进程内索引：判断职位的筛选字段是否满足条件（值为空时不满足范围条件，与 SQL 一致）"""
+    for name, value in filters.items():
+        actual = meta.get(FILTER_COLUMNS[name][0])
+        if actual is None:
+            return False
+        if name == 'company_user_id' and actual != value:
+            return False
+        if name == 'salary_min' and actual < value:
+            return False
+        if name == 'salary_max' and actual > value:
+            return False
+    return True
+
+
+def _body(job_fields):
+    return f"{job_fields['requirement']}\n{job_fields['duty']}"
+
+
+def _fields(job):
+    return {'title': job.title, 'requirement': job.requirement, 'duty': job.duty}
+
+
+class MySQLFullTextBackend:
+    """MySQL FULLTEXT（ngram）索引：数据库自动维护，无需增量更新"""
+
+    def index_job(self, job):
+        pass
+
+    def index_jobs(self, jobs):
+        pass
+
+    def remove_job(self, job_id):
+        pass
+
+    def remove_jobs(self, job_ids):
+        pass
+
+    def search(self, query, limit, filters):
+        if not tokenize(query):
+            return []
+        clauses, params = _filter_sql(filters)
+        where = ' AND '.join(['MATCH(title, requirement, duty) AGAINST (%s IN NATURAL LANGUAGE MODE)', *clauses])
+        sql = (
+            f'SELECT id FROM jobs WHERE {where} '
+            'ORDER BY MATCH(title, requirement, duty) AGAINST (%s IN NATURAL LANGUAGE MODE) DESC, id DESC '
+            'LIMIT %s'
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [query, *params, query, limit])
+            return [row[0] for row in cursor.fetchall()]
+
+
+class SQLiteFTSBackend:
+    """SQLite FTS5 虚拟表（存放分词后的文本）"""
+
+    TABLE = 'jobs_fts'
+
+    def index_job(self, job):
+        self.index_jobs([job])
+
+    def index_jobs(self, jobs):
+        rows = []
+        for job in jobs:
+            fields = _fields(job)
+            rows.append([job.pk, ' '.join(tokenize(fields['title'])), ' '.join(tokenize(_body(fields)))])
+        with connection.cursor() as cursor:
+            cursor.executemany(f'DELETE FROM {self.TABLE} WHERE rowid = %s', [[row[0]] for row in rows])
+            cursor.executemany(f'INSERT INTO {self.TABLE} (rowid, title, body) VALUES (%s, %s, %s)', rows)
+
+    def remove_job(self, job_id):
+        self.remove_jobs([job_id])
+
+    def remove_jobs(self, job_ids):
+        with connection.cursor() as cursor:
+            cursor.executemany(f'DELETE FROM {self.TABLE} WHERE rowid = %s', [[job_id] for job_id in job_ids])
+
+    def search(self, query, limit, filters):
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        # 每个词加引号作为短语，多个词之间为 AND
+        match = ' '.join('"%s"' % token.replace('"', '""') for token in dict.fromkeys(tokens))
+        join = ''
+        clauses, params = _filter_sql(filters)
+        if clauses:
+            # 筛选条件关联职位表（主键）在同一条查询中完成
+            join = f' JOIN jobs ON jobs.id = {self.TABLE}.rowid'
+        where = ' AND '.join([f'{self.TABLE} MATCH %s', *clauses])
+        sql = (
+            f'SELECT {self.TABLE}.rowid FROM {self.TABLE}{join} WHERE {where} '
+            f'ORDER BY bm25({self.TABLE}, {TITLE_WEIGHT}, {BODY_WEIGHT}), {self.TABLE}.rowid DESC LIMIT %s'
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [match, *params, limit])
+            return [row[0] for row in cursor.fetchall()]
+
+
+class InMemoryIndexBackend:
+    """进程内倒排索引（BM25 打分）
+
+    本进程的写入通过 index_job / remove_job 增量更新。其他进程的写入在搜索时按差量补上：
+    公开列表版本号（见 jobs.cache，多进程共享）变化时，只读取上次同步之后更新过的职位（updated_at）
+    和删除记录（DeletedJob），不重建整个索引。只在首次搜索或距上次同步超过删除记录保留时间时全量构建。
+    """
+
+    K1 = 1.2
+    B = 0.75
+
+    # 差量同步的时间窗口向前多取的秒数：覆盖各进程之间的时钟偏差和写入事务提交前的延迟（重复读取是幂等的）
+    SYNC_OVERLAP = timedelta(seconds=60)
+
+    # 删除记录保留时间；超过这个时间没有同步的进程改为全量构建
+    DELETION_RETENTION = timedelta(days=1)
+
+    # 构建索引读取的字段
+    FIELDS = ('id', 'title', 'requirement', 'duty', *(column for column, _ in FILTER_COLUMNS.values()))
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._version = None
+        self._synced_at = None
+        self.postings = defaultdict(dict)   # token -> {job_id: 加权词频}
+        self.doc_tokens = {}                # job_id -> 该职位包含的 token 集合
+        self.doc_lengths = {}               # job_id -> 加权文档长度
+        self.doc_meta = {}                  # job_id -> 筛选字段
+
+    def _weighted_terms(self, fields):
+        terms = Counter()
+        for token in tokenize(fields['title']):
+            terms[token] += TITLE_WEIGHT
+        for token in tokenize(_body(fields)):
+            terms[token] += BODY_WEIGHT
+        return terms
+
+    def _add(self, row):
+        job_id = row['id']
+        self._remove(job_id)
+        terms = self._weighted_terms(row)
+        for token, weight in terms.items():
+            self.postings[token][job_id] = weight
+        self.doc_tokens[job_id] = set(terms)
+        self.doc_lengths[job_id] = sum(terms.values())
+        self.doc_meta[job_id] = {column: row[column] for column, _ in FILTER_COLUMNS.values()}
+
+    def _remove(self, job_id):
+        for token in self.doc_tokens.pop(job_id, ()):
+            docs = self.postings[token]
+            docs.pop(job_id, None)
+            if not docs:
+                del self.postings[token]
+        self.doc_lengths.pop(job_id, None)
+        self.doc_meta.pop(job_id, None)
+
+    def _ensure_current(self):
+        """版本号变化时补上其他进程的写入（尚未构建或同步间隔过长时全量构建）"""
+        version = get_version(GLOBAL_SCOPE)
+        if self._version == version:
+            return
+        with self._lock:
+            if self._version == version:
+                return
+            # 先记下时间再读取，读取期间提交的写入留给下一次同步
+            now = timezone.now()
+            if self._synced_at is None or now - self._synced_at > self.DELETION_RETENTION:
+                self.reset()
+                for row in Job.objects.values(*self.FIELDS).iterator(chunk_size=2000):
+                    self._add(row)
+            else:
+                since = self._synced_at - self.SYNC_OVERLAP
+                for row in Job.objects.filter(updated_at__gte=since).values(*self.FIELDS).iterator(chunk_size=2000):
+                    self._add(row)
+                for job_id in DeletedJob.objects.filter(deleted_at__gte=since).values_list('job_id', flat=True):
+                    self._remove(job_id)
+            self._version = version
+            self._synced_at = now
+
+    def index_job(self, job):
+        self.index_jobs([job])
+
+    def index_jobs(self, jobs):
+        with self._lock:
+            for job in jobs:
+                row = {column: getattr(job, column) for column, _ in FILTER_COLUMNS.values()}
+                self._add({'id': job.pk, **_fields(job), **row})
+
+    def remove_job(self, job_id):
+        self.remove_jobs([job_id])
+
+    def remove_jobs(self, job_ids):
+        with self._lock:
+            for job_id in job_ids:
+                self._remove(job_id)
+        # 记录删除，其他进程同步时据此移除；顺带清理过期记录
+        DeletedJob.objects.bulk_create([DeletedJob(job_id=job_id) for job_id in job_ids])
+        DeletedJob.objects.filter(deleted_at__lt=timezone.now() - self.DELETION_RETENTION).delete()
+
+    def reset(self):
+        """丢弃索引，下次搜索时重新构建"""
+        with self._lock:
+            self._version = None
+            self._synced_at = None
+            self.postings.clear()
+            self.doc_tokens.clear()
+            self.doc_lengths.clear()
+            self.doc_meta.clear()
+
+    def search(self, query, limit, filters):
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return []
+        self._ensure_current()
+        with self._lock:
+            doc_count = len(self.doc_lengths)
+            if not doc_count:
+                return []
+            avg_length = sum(self.doc_lengths.values()) / doc_count
+            # 所有词都命中的职位（AND），从最短的倒排表开始求交集
+            postings = sorted((self.postings.get(token, {}) for token in tokens), key=len)
+            candidates = set(postings[0])
+            for docs in postings[1:]:
+                candidates &= docs.keys()
+                if not candidates:
+                    return []
+            if filters:
+                candidates = {job_id for job_id in candidates if _matches_filters(self.doc_meta[job_id], filters)}
+            scores = {}
+            for docs in postings:
+                idf = math.log(1 + (doc_count - len(docs) + 0.5) / (len(docs) + 0.5))
+                for job_id in candidates:
+                    tf = docs[job_id]
+                    norm = self.K1 * (1 - self.B + self.B * self.doc_lengths[job_id] / avg_length)
+                    scores[job_id] = scores.get(job_id, 0.0) + idf * tf * (self.K1 + 1) / (tf + norm)
+        ranked = sorted(scores, key=lambda job_id: (-scores[job_id], -job_id))
+        return ranked[:limit]
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def _sqlite_fts_available():
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [SQLiteFTSBackend.TABLE])
+        return cursor.fetchone() is not None
+
+
+def get_search_backend():
+    """按数据库类型选择搜索后端（settings.JOB_SEARCH_BACKEND = 'memory' 时强制使用进程内索引）"""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                mode = getattr(settings, 'JOB_SEARCH_BACKEND', 'auto')
+                if mode != 'memory' and connection.vendor == 'mysql':
+                    _backend = MySQLFullTextBackend()
+                elif mode != 'memory' and connection.vendor == 'sqlite' and _sqlite_fts_available():
+                    _backend = SQLiteFTSBackend()
+                else:
+                    _backend = InMemoryIndexBackend()
+    return _backend
+
+
+def search_job_ids(query, limit=SEARCH_RESULT_LIMIT, **filters):
+    """返回按相关度排序的职位 ID 列表
+
+    filters 可包含 company_user_id、salary_min（最低月薪不低于）、salary_max（最高月薪不高于），值为 None 时忽略。
+    """
+    filters = {name: value for name, value in filters.items() if value is not None}
+    unknown = set(filters) - set(FILTER_COLUMNS)
+    if unknown:
+        raise ValueError(f'不支持的搜索筛选条件：{", ".join(sorted(unknown))}')
+    return get_search_backend().search(query, limit, filters)
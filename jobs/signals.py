@@ -0,0 +1,63 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import Signal, receiver
+from .models import Job
+from .cache import bump_job_versions
+from .search import get_search_backend
+
+
+# 不经过 Model.save()/delete() 的写入（bulk_create、QuerySet.update()、集合 DELETE）不触发
+# post_save/post_delete，由写入方（jobs.bulk、职位编辑/删除视图）发送以下信号
+# jobs_written: company_user_id, jobs（批量插入时主键可能为空，取决于数据库是否返回）
+# jobs_deleted: company_user_id, job_ids
+# jobs_deleting: company_user_id, jobs（即将被集合删除的该公司职位查询集，在 DELETE 之前发送，供其他 app 维护依赖职位的数据）
+jobs_written = Signal()
+jobs_deleted = Signal()
+jobs_deleting = Signal()
+
+
+@receiver(post_save, sender=Job)
+@receiver(post_delete, sender=Job)
+def invalidate_job_lists(sender, instance, **kwargs):
+    """职位保存或删除后，使公开列表、所属公司列表和该职位详情片段的缓存失效（一条 UPDATE）"""
+    bump_job_versions(instance.company_user_id, [instance.pk])
+
+
+@receiver(post_save, sender=Job)
+def index_job(sender, instance, **kwargs):
+    """职位保存后增量更新搜索索引"""
+    get_search_backend().index_job(instance)
+
+
+@receiver(post_delete, sender=Job)
+def unindex_job(sender, instance, **kwargs):
+    """职位删除后从搜索索引中移除"""
+    get_search_backend().remove_job(instance.pk)
+
+
+@receiver(jobs_written)
+def invalidate_job_lists_bulk(sender, company_user_id, jobs, **kwargs):
+    """批量写入后使列表和这些职位的详情片段缓存失效（每批一条 UPDATE）"""
+    bump_job_versions(company_user_id, [job.pk for job in jobs if job.pk is not None])
+
+
+@receiver(jobs_deleted)
+def invalidate_deleted_jobs(sender, company_user_id, job_ids, **kwargs):
+    """批量删除后使列表和这些职位的详情片段缓存失效"""
+    bump_job_versions(company_user_id, job_ids)
+
+
+@receiver(jobs_written)
+def index_jobs_bulk(sender, jobs, **kwargs):
+    """批量写入后更新搜索索引"""
+    backend = get_search_backend()
+    if all(job.pk is not None for job in jobs):
+        backend.index_jobs(jobs)
+    elif hasattr(backend, 'reset'):
+        # 数据库未返回主键，无法逐条索引，丢弃进程内索引等下次搜索时重建
+        backend.reset()
+
+
+@receiver(jobs_deleted)
+def unindex_jobs_bulk(sender, job_ids, **kwargs):
+    """批量删除后从搜索索引中移除"""
+    get_search_backend().remove_jobs(job_ids)
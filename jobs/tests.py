@@ -1,3 +1,490 @@
-from django.test import TestCase
+import base64
+import datetime
+from unittest import mock
 
-# Create your tests here.
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection, models
+from django.db.models import F
+from django.test import Client, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from applications.models import Application
+from users.models import User
+from .bulk import delete_jobs
+from .cache import (
+    GLOBAL_SCOPE, bump_version, company_scope, get_or_set_detail, get_version, get_versions,
+    invalidate_job_details, job_scope, list_cache_key,
+)
+from .counters import BufferedViewCounter
+from .models import CacheVersion, DeletedJob, Job
+from .pagination import CursorPaginator, KnownCountPaginator
+from .salary import parse_salary
+from .search import InMemoryIndexBackend, SQLiteFTSBackend, _sqlite_fts_available, search_job_ids
+from .signals import jobs_deleted
+
+
+class ParseSalaryTests(SimpleTestCase):
+
+    def assertParsed(self, cases):
+        for text, expected in cases:
+            with self.subTest(text=text):
+                self.assertEqual(parse_salary(text), expected)
+
+    def test_monthly(self):
+        self.assertParsed([
+            ('10k-20k', (10000, 20000)),
+            ('10-20k', (10000, 20000)),
+            ('1.5万-2万', (15000, 20000)),
+            ('10-20', (10000, 20000)),
+            ('15k以上', (15000, None)),
+            ('8k以下', (None, 8000)),
+            ('12k', (12000, 12000)),
+            ('20-30k·14薪', (20000, 30000)),
+        ])
+
+    def test_yearly(self):
+        self.assertParsed([
+            ('年薪30万', (25000, 25000)),
+            ('年薪24-36万', (20000, 30000)),
+            ('30万/年', (25000, 25000)),
+            ('24万-36万 / 年', (20000, 30000)),
+            ('每年36万', (30000, 30000)),
+        ])
+
+    def test_year_end_bonus_is_not_yearly(self):
+        self.assertParsed([
+            ('10k-15k 年终奖', (10000, 15000)),
+            ('10-15k，13薪，年底双薪', (10000, 15000)),
+            ('15k/年终奖另计', (15000, 15000)),
+            ('20k，一年两次调薪', (20000, 20000)),
+        ])
+
+    def test_unparseable(self):
+        self.assertParsed([
+            ('面议', (None, None)),
+            ('', (None, None)),
+            (None, (None, None)),
+            ('300/天', (None, None)),
+        ])
+
+
+class JobCacheTests(TestCase):
+
+    def setUp(self):
+        self.company = User.objects.create(
+            login_id='acme', password='!', nickname='Acme', email='hr@acme.test', type='company',
+        )
+
+    def create_job(self, title='后端开发'):
+        return Job.objects.create(
+            company_user=self.company, title=title, requirement='Python', duty='写代码', salary='10-15k',
+        )
+
+    def test_versions_live_in_table(self):
+        self.assertEqual(get_version(GLOBAL_SCOPE), 0)
+        self.create_job()
+        version = get_version(GLOBAL_SCOPE)
+        self.assertGreater(version, 0)
+        key = list_cache_key(GLOBAL_SCOPE, version, 'page', 1)
+        # 其他进程写入职位：只更新版本号表
+        CacheVersion.objects.filter(scope=GLOBAL_SCOPE).update(version=F('version') + 1)
+        self.assertEqual(get_version(GLOBAL_SCOPE), version + 1)
+        self.assertNotEqual(list_cache_key(GLOBAL_SCOPE, get_version(GLOBAL_SCOPE), 'page', 1), key)
+
+    def test_write_bumps_versions_in_one_statement(self):
+        job = self.create_job()
+        versions = get_versions([GLOBAL_SCOPE, company_scope(self.company.id), job_scope(job.id)])
+        job.title = '高级后端开发'
+        with CaptureQueriesContext(connection) as queries:
+            job.save()
+        statements = [query['sql'] for query in queries if 'job_cache_versions' in query['sql']]
+        self.assertEqual(len(statements), 1, statements)
+        self.assertTrue(statements[0].startswith('UPDATE'))
+        new_versions = get_versions(list(versions))
+        self.assertTrue(all(new_versions[scope] == versions[scope] + 1 for scope in versions))
+
+    def test_concurrently_created_version_row_still_bumped(self):
+        # 另一个写入者在本次 UPDATE 之后、建行之前建好了行
+        original = CacheVersion.objects.bulk_create
+
+        def bulk_create(objs, **kwargs):
+            original([CacheVersion(scope=obj.scope, version=1) for obj in objs], **kwargs)
+            return original(objs, **kwargs)
+
+        with mock.patch.object(CacheVersion.objects, 'bulk_create', side_effect=bulk_create):
+            bump_version(company_scope(self.company.id))
+        self.assertEqual(get_version(company_scope(self.company.id)), 2)
+
+    def test_cached_list_hit_queries(self):
+        self.create_job()
+        self.assertEqual(self.client.get('/jobs/')['X-Cache'], 'MISS')
+        with self.assertNumQueries(1):
+            response = self.client.get('/jobs/')
+        self.assertEqual(response['X-Cache'], 'HIT')
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get('/jobs/', HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+    def test_list_etag_changes_after_write(self):
+        response = self.client.get('/jobs/')
+        etag = response['ETag']
+        self.assertEqual(self.client.get('/jobs/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.create_job()
+        response = self.client.get('/jobs/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, '后端开发')
+
+    def test_detail_invalidated_through_shared_version(self):
+        job = self.create_job()
+        get_or_set_detail(job.id, lambda: 'old')
+        self.assertEqual(get_or_set_detail(job.id, lambda: 'new'), ('old', True))
+        invalidate_job_details([job.id])
+        self.assertEqual(get_or_set_detail(job.id, lambda: 'new'), ('new', False))
+
+    def test_flushed_views_invalidate_company_list(self):
+        job = self.create_job()
+        client = Client()
+        session = client.session
+        session['user_id'] = self.company.id
+        session.save()
+        etag = client.get('/jobs/')['ETag']
+        public_version = get_version(GLOBAL_SCOPE)
+        counter = BufferedViewCounter(flush_interval=3600, flush_threshold=1000)
+        for _ in range(3):
+            counter.incr(job.id)
+        counter.flush()
+        response = client.get('/jobs/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertContains(response, '<td>3</td>', html=True)
+        # 公开列表不显示浏览数，不失效
+        self.assertEqual(get_version(GLOBAL_SCOPE), public_version)
+
+    def test_known_count_paginator(self):
+        for index in range(3):
+            self.create_job(f'职位{index}')
+        paginator = KnownCountPaginator(Job.objects.all(), 2, 25)
+        with self.assertNumQueries(0):
+            self.assertEqual((paginator.count, paginator.num_pages), (25, 13))
+
+
+class CursorPaginationTests(TestCase):
+
+    def setUp(self):
+        self.company = User.objects.create(
+            login_id='acme', password='!', nickname='Acme', email='hr@acme.test', type='company',
+        )
+        jobs = [
+            Job.objects.create(company_user=self.company, title=f'职位{index}', requirement='Python', duty='写代码', salary='10k')
+            for index in range(7)
+        ]
+        # 三条和四条职位分别共享同一个创建时间，翻页只能靠 id 区分
+        now = timezone.now()
+        Job.objects.filter(id__in=[job.id for job in jobs[:3]]).update(created_at=now - datetime.timedelta(hours=1))
+        Job.objects.filter(id__in=[job.id for job in jobs[3:]]).update(created_at=now)
+        self.expected = list(Job.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+        self.paginator = CursorPaginator(Job.objects.all(), 2)
+
+    def ids(self, page):
+        return [job.id for job in page]
+
+    def test_forward_and_backward_with_ties(self):
+        pages = [self.paginator.get_page()]
+        while pages[-1].has_next():
+            pages.append(self.paginator.get_page(pages[-1].next_cursor))
+        self.assertEqual([job_id for page in pages for job_id in self.ids(page)], self.expected)
+        self.assertEqual(len(pages), 4)
+        self.assertFalse(pages[0].has_previous())
+        # 从最后一页一直向前翻，回到与向后翻时相同的每一页
+        page = pages[-1]
+        for expected in reversed(pages[:-1]):
+            page = self.paginator.get_page(page.previous_cursor)
+            self.assertEqual(self.ids(page), self.ids(expected))
+        self.assertFalse(page.has_previous())
+
+    def test_next_previous_round_trip(self):
+        second = self.paginator.get_page(self.paginator.get_page().next_cursor)
+        third = self.paginator.get_page(second.next_cursor)
+        self.assertEqual(self.ids(self.paginator.get_page(third.previous_cursor)), self.ids(second))
+        self.assertEqual(self.ids(self.paginator.get_page(second.next_cursor)), self.ids(third))
+
+    def test_invalid_cursor_returns_first_page(self):
+        def encode(payload):
+            return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+        first = self.ids(self.paginator.get_page())
+        for token in (
+            'garbage', '!!!', encode('not json'), encode('[]'), encode('{"t":"2024-01-01T00:00:00","i":1}'),
+            encode('{"t":"yesterday","i":1,"d":"n"}'), encode('{"t":"2024-01-01T00:00:00","i":"x","d":"n"}'),
+            encode('{"t":"2024-01-01T00:00:00","i":1,"d":"x"}'),
+        ):
+            with self.subTest(token=token):
+                self.assertEqual(self.ids(self.paginator.get_page(token)), first)
+
+    @mock.patch('jobs.views.JOB_LIST_PAGE_SIZE', 2)
+    def test_list_view_cursor(self):
+        response = self.client.get('/jobs/')
+        self.assertEqual(response.context['pagination_mode'], 'cursor')
+        page = response.context['page_obj']
+        self.assertEqual(self.ids(page), self.expected[:2])
+        response = self.client.get('/jobs/', {'cursor': page.next_cursor})
+        self.assertEqual(self.ids(response.context['page_obj']), self.expected[2:4])
+        # 被篡改的游标按第一页处理
+        response = self.client.get('/jobs/', {'cursor': page.next_cursor[:-3] + '@@@'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.ids(response.context['page_obj']), self.expected[:2])
+
+    @override_settings(JOB_LIST_PAGINATION='page')
+    @mock.patch('jobs.views.JOB_LIST_PAGE_SIZE', 2)
+    def test_list_view_numbered_pages(self):
+        response = self.client.get('/jobs/', {'page': 2})
+        self.assertEqual(response.context['pagination_mode'], 'page')
+        page = response.context['page_obj']
+        self.assertEqual((page.number, page.paginator.count, page.paginator.num_pages), (2, 7, 4))
+        self.assertEqual(self.ids(page), self.expected[2:4])
+        self.assertContains(response, '?page=3')
+        # 超出范围的页码回到最后一页
+        self.assertEqual(self.ids(self.client.get('/jobs/', {'page': 99}).context['page_obj']), self.expected[6:])
+
+
+class SearchFilterTests(TestCase):
+
+    def setUp(self):
+        self.acme = User.objects.create(
+            login_id='acme', password='!', nickname='Acme', email='hr@acme.test', type='company',
+        )
+        self.other = User.objects.create(
+            login_id='other', password='!', nickname='Other', email='hr@other.test', type='company',
+        )
+        # 其他公司的职位标题命中，排名高于 acme 只在正文命中的职位
+        for index in range(3):
+            Job.objects.create(
+                company_user=self.other, title=f'Python 开发 {index}', requirement='Python', duty='Python',
+                salary='30-40k',
+            )
+        self.acme_job = Job.objects.create(
+            company_user=self.acme, title='后端工程师', requirement='熟悉 Python', duty='写代码', salary='10-15k',
+        )
+
+    def backends(self):
+        backends = [InMemoryIndexBackend()]
+        if _sqlite_fts_available():
+            backends.append(SQLiteFTSBackend())
+        return backends
+
+    def test_company_scope_applied_before_limit(self):
+        for backend in self.backends():
+            with self.subTest(backend=type(backend).__name__):
+                self.assertNotIn(self.acme_job.id, backend.search('python', 2, {}))
+                self.assertEqual(backend.search('python', 2, {'company_user_id': self.acme.id}), [self.acme_job.id])
+
+    def test_salary_filters_applied_before_limit(self):
+        for backend in self.backends():
+            with self.subTest(backend=type(backend).__name__):
+                self.assertEqual(backend.search('python', 2, {'salary_max': 20000}), [self.acme_job.id])
+                self.assertNotIn(self.acme_job.id, backend.search('python', 10, {'salary_min': 20000}))
+
+    def test_unknown_filter(self):
+        with self.assertRaises(ValueError):
+            search_job_ids('python', title='x')
+
+    def test_memory_index_sees_writes_from_other_processes(self):
+        backend = InMemoryIndexBackend()
+        self.assertEqual(len(backend.search('golang', 10, {})), 0)
+        # 其他进程写入：本进程没有收到信号，只有版本号表变化
+        job = Job(company_user=self.acme, title='Golang 开发', requirement='Go', duty='Go', salary='20k')
+        Job.objects.bulk_create([job])
+        bump_version(GLOBAL_SCOPE)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(len(backend.search('golang', 10, {})), 1)
+        # 只读取版本号、上次同步后更新的职位和删除记录，不重建索引
+        self.assertEqual(len(queries), 3)
+        self.assertIn('updated_at', queries[1]['sql'])
+        # 其他进程删除：留下删除记录
+        Job.objects.filter(id=job.id).delete()
+        DeletedJob.objects.create(job_id=job.id)
+        bump_version(GLOBAL_SCOPE)
+        self.assertEqual(backend.search('golang', 10, {}), [])
+
+    def test_memory_index_updates_incrementally(self):
+        backend = InMemoryIndexBackend()
+        self.assertEqual(backend.search('后端', 10, {}), [self.acme_job.id])
+        self.acme_job.title = '前端工程师'
+        backend.index_job(self.acme_job)
+        # 版本号未变：每次搜索只查询版本号
+        with self.assertNumQueries(2):
+            self.assertEqual(backend.search('后端', 10, {}), [])
+            self.assertEqual(backend.search('前端', 10, {}), [self.acme_job.id])
+        backend.remove_job(self.acme_job.id)
+        self.assertEqual(backend.search('前端', 10, {}), [])
+        self.assertNotIn('前端', backend.postings)
+        self.assertTrue(DeletedJob.objects.filter(job_id=self.acme_job.id).exists())
+
+
+class JobWriteTests(TestCase):
+
+    def setUp(self):
+        self.company = User.objects.create(
+            login_id='acme', password='!', nickname='Acme', email='hr@acme.test', type='company',
+        )
+        self.other = User.objects.create(
+            login_id='globex', password='!', nickname='Globex', email='hr@globex.test', type='company',
+        )
+        self.job = Job.objects.create(
+            company_user=self.company, title='后端开发', requirement='Python', duty='写代码', salary='10-15k',
+        )
+        self.client = self.login(self.company)
+
+    def login(self, user):
+        client = Client()
+        session = client.session
+        session['user_id'] = user.id
+        session.save()
+        return client
+
+    def update(self, client=None, **data):
+        fields = {'title': '高级后端开发', 'requirement': 'Python', 'duty': '写代码', 'salary': '20-30k'}
+        fields.update(data)
+        return (client or self.client).post(f'/jobs/{self.job.id}/update/', fields)
+
+    def test_update(self):
+        response = self.update(version=str(self.job.version))
+        self.assertEqual(response.status_code, 200)
+        self.job.refresh_from_db()
+        self.assertEqual((self.job.title, self.job.version), ('高级后端开发', 2))
+
+    def test_update_requires_version(self):
+        for version in (None, '', 'abc', '-1'):
+            with self.subTest(version=version):
+                response = self.update(**({} if version is None else {'version': version}))
+                self.assertEqual(response.status_code, 400)
+        self.job.refresh_from_db()
+        self.assertEqual((self.job.title, self.job.version), ('后端开发', 1))
+
+    def test_stale_version_conflicts(self):
+        self.update(version='1')
+        response = self.update(version='1', title='覆盖')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['version'], 2)
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.title, '高级后端开发')
+
+    def test_update_other_company(self):
+        response = self.update(self.login(self.other), version='1')
+        self.assertEqual(response.status_code, 403)
+
+    def test_delete_is_scoped_without_pre_read(self):
+        applicant = User.objects.create(
+            login_id='bob', password='!', nickname='Bob', email='bob@example.test', type='individual',
+        )
+        Application.objects.create(job=self.job, applicant=applicant, message='你好', cv_file='applications/cvs/a.pdf')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(f'/jobs/{self.job.id}/delete/')
+        self.assertEqual(response.json(), {'success': True, 'message': '职位已删除！'})
+        self.assertFalse(Job.objects.exists())
+        self.assertFalse(Application.objects.exists())
+        self.company.refresh_from_db()
+        self.assertEqual((self.company.application_count, self.company.unread_application_count), (0, 0))
+        statements = [query['sql'] for query in queries if not query['sql'].startswith(('SAVEPOINT', 'RELEASE'))]
+        # 计数扣减、删除申请、删除职位都直接按范围执行，没有读取职位的 SELECT
+        self.assertFalse([sql for sql in statements if sql.startswith('SELECT') and 'FROM "jobs"' in sql])
+        self.assertEqual(sum(sql.startswith('DELETE') for sql in statements), 2)
+
+    def test_delete_other_company(self):
+        Application.objects.create(job=self.job, applicant=self.other, message='你好', cv_file='applications/cvs/a.pdf')
+        response = self.login(self.other).post(f'/jobs/{self.job.id}/delete/')
+        self.assertEqual(response.status_code, 403)
+        self.assertTrue(Job.objects.exists())
+        self.assertTrue(Application.objects.exists())
+        self.company.refresh_from_db()
+        self.assertEqual((self.company.application_count, self.company.unread_application_count), (1, 1))
+        response = self.client.post('/jobs/999999/delete/')
+        self.assertEqual(response.status_code, 404)
+
+
+class BulkDeleteTests(TestCase):
+
+    def setUp(self):
+        self.company = User.objects.create(
+            login_id='acme', password='!', nickname='Acme', email='hr@acme.test', type='company',
+        )
+        self.other = User.objects.create(
+            login_id='globex', password='!', nickname='Globex', email='hr@globex.test', type='company',
+        )
+        self.applicant = User.objects.create(
+            login_id='bob', password='!', nickname='Bob', email='bob@example.test', type='individual',
+        )
+        self.jobs = [
+            Job.objects.create(company_user=owner, title=title, requirement='Python', duty='写代码', salary='10-15k')
+            for owner, title in ((self.company, '后端'), (self.company, '前端'), (self.other, '测试'))
+        ]
+        for job in self.jobs:
+            # post_save 信号维护职位和公司的申请计数
+            Application.objects.create(job=job, applicant=self.applicant, message='你好', cv_file='applications/cvs/a.pdf')
+
+    def test_deletes_applications_and_keeps_counters(self):
+        keep = Job.objects.create(company_user=self.company, title='运维', requirement='Linux', duty='运维', salary='10k')
+        Application.objects.create(job=keep, applicant=self.applicant, message='你好', cv_file='applications/cvs/b.pdf')
+        ids = [job.id for job in self.jobs]
+        deleted = []
+        jobs_deleted.connect(lambda sender, job_ids, **kwargs: deleted.extend(job_ids), weak=False, dispatch_uid='test')
+        self.addCleanup(jobs_deleted.disconnect, dispatch_uid='test')
+        self.assertEqual(sorted(delete_jobs(self.company, ids)), sorted(ids[:2]))
+        self.assertEqual(sorted(deleted), sorted(ids[:2]))
+        self.assertEqual(list(Job.objects.filter(company_user=self.company)), [keep])
+        self.assertEqual(Application.objects.filter(job__company_user=self.company).count(), 1)
+        self.company.refresh_from_db()
+        self.other.refresh_from_db()
+        self.assertEqual((self.company.application_count, self.company.unread_application_count), (1, 1))
+        self.assertEqual(self.other.application_count, 1)
+
+    def test_nothing_to_delete(self):
+        self.assertEqual(delete_jobs(self.other, [self.jobs[0].id]), [])
+        self.assertEqual(Job.objects.count(), 3)
+
+    def test_unsupported_relation_refuses_set_delete(self):
+        relation = mock.Mock(on_delete=models.SET_NULL, related_model=Application)
+        with mock.patch.object(Job._meta, 'related_objects', [relation]):
+            with self.assertRaises(ImproperlyConfigured):
+                delete_jobs(self.company, [self.jobs[0].id])
+        self.assertEqual(Job.objects.count(), 3)
+
+
+class JobSaveTests(TestCase):
+
+    def setUp(self):
+        self.company = User.objects.create(
+            login_id='acme', password='!', nickname='Acme', email='hr@acme.test', type='company',
+        )
+        self.job = Job.objects.create(
+            company_user=self.company, title='后端开发', requirement='Python', duty='写代码', salary='10-15k',
+        )
+
+    def test_full_save_keeps_counters(self):
+        stale = Job.objects.get(id=self.job.id)
+        Job.objects.filter(id=self.job.id).update(views=F('views') + 5, application_count=2)
+        stale.title = '高级后端开发'
+        stale.salary = '20-30k'
+        stale.save()
+        job = Job.objects.get(id=self.job.id)
+        self.assertEqual((job.title, job.salary_min, job.version), ('高级后端开发', 20000, 2))
+        self.assertEqual((job.views, job.application_count), (5, 2))
+
+    def test_deferred_save_keeps_counters(self):
+        stale = Job.objects.only('id', 'title', 'views').get(id=self.job.id)
+        Job.objects.filter(id=self.job.id).update(views=F('views') + 5)
+        stale.title = '高级后端开发'
+        stale.save()
+        job = Job.objects.get(id=self.job.id)
+        self.assertEqual((job.title, job.views), ('高级后端开发', 5))
+
+    def test_explicit_update_fields_write_counters(self):
+        self.job.views = 7
+        self.job.save(update_fields=['views'])
+        self.assertEqual(Job.objects.get(id=self.job.id).views, 7)
+
+    def test_full_save_of_deleted_row_inserts(self):
+        Job.objects.filter(id=self.job.id).delete()
+        self.job.title = '重新发布'
+        self.job.save()
+        self.assertEqual(Job.objects.get(id=self.job.id).title, '重新发布')
@@ -6,6 +6,9 @@ app_name = 'jobs'
 urlpatterns = [
     path('', views.job_list_view, name='list'),
     path('create/', views.job_create_view, name='create'),
+    path('<int:job_id>/', views.job_detail_view, name='detail'),
     path('<int:job_id>/update/', views.job_update_view, name='update'),
     path('<int:job_id>/delete/', views.job_delete_view, name='delete'),
+    path('bulk/import/', views.job_bulk_import_view, name='bulk_import'),
+    path('bulk/delete/', views.job_bulk_delete_view, name='bulk_delete'),
 ]
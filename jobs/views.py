@@ -1,31 +1,191 @@
+import hashlib
+
 from django.shortcuts import render, get_object_or_404
-from django.http import JsonResponse
-from django.views.decorators.http import require_http_methods, require_POST
-from django.core.paginator import Paginator
+from django.template.loader import render_to_string
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import condition, require_http_methods, require_POST
+from django.contrib.messages import get_messages
+from django.core.paginator import Paginator, Page
+from django.conf import settings
+from django.utils.http import urlencode
+from django.utils.cache import patch_cache_control
+from django.utils import timezone
+from django.db.models import F
 from .models import Job
 from .forms import JobForm
+from .pagination import CursorPaginator, KnownCountPaginator
+from .cache import GLOBAL_SCOPE, company_scope, get_or_set_list_page, get_version, get_or_set_detail
+from .counters import get_view_counter
+from .search import search_job_ids
+from .bulk import EXPORT_FIELDS, delete_company_job, import_jobs, delete_jobs, iter_export_chunks
+from .signals import jobs_deleted, jobs_written
+from web.importing import FORMATS, guess_format
+from web.exporting import CONTENT_TYPES, iter_export
+
+
+# 职位列表每页条数
+JOB_LIST_PAGE_SIZE = 10
+
+
+def _ranked_search_results(jobs, query, **filters):
+    """按相关度排序的搜索结果
+
+    公司范围和薪资筛选（filters）在搜索查询内完成，结果上限作用于筛选之后；jobs 只用来取列表字段。
+    """
+    job_ids = search_job_ids(query, **filters)
+    rank = {job_id: index for index, job_id in enumerate(job_ids)}
+    return sorted(jobs.filter(id__in=job_ids), key=lambda job: rank[job.id])
+
+
+def _salary_filters(request):
+    """解析薪资筛选参数（元/月），非法值忽略"""
+    filters = {}
+    for name in ('salary_min', 'salary_max'):
+        value = request.GET.get(name, '').strip()
+        if value.isdigit():
+            filters[name] = int(value)
+    return filters
+
+
+def _row_fragment(request, job, count_delta):
+    """请求 ?fragment=row 时返回渲染好的表格行和分页变化，前端据此局部更新"""
+    if request.GET.get('fragment') != 'row':
+        return {}
+    return {
+        'row_html': render_to_string('jobs/row.html', {'job': job, 'is_company': True}, request=request),
+        'pagination': {'count_delta': count_delta},
+    }
+
 
+def _list_scope(current_user):
+    """公司用户看自己的职位（公司范围），其他人看全部职位（全局范围）"""
+    if current_user and current_user.is_company():
+        return company_scope(current_user.id)
+    return GLOBAL_SCOPE
+
+
+def _list_version(request, scope):
+    """列表范围的版本号（一次主键查询），同一请求内 ETag 和列表缓存共用"""
+    if not hasattr(request, '_job_list_version'):
+        request._job_list_version = get_version(scope)
+    return request._job_list_version
 
+
+def _job_list_etag(request):
+    """职位列表的 ETag：列表版本号 + 查询参数 + 当前用户（导航栏）+ CSRF cookie
+
+    版本号在职位写入时递增（见 jobs.signals），计算时不查询职位表。
+    有待显示的消息时返回 None，不做条件请求，保证消息能显示出来。
+    """
+    if len(get_messages(request)):
+        return None
+    current_user = getattr(request, 'user_obj', None)
+    user_part = ''
+    if current_user:
+        user_part = repr((current_user.pk, current_user.nickname, current_user.type,
+                          current_user.profile_image.name, current_user.profile_image_variants,
+                          current_user.unread_application_count))
+    parts = (
+        _list_version(request, _list_scope(current_user)),
+        sorted(request.GET.lists()),
+        user_part,
+        request.COOKIES.get(settings.CSRF_COOKIE_NAME, ''),
+    )
+    return hashlib.md5(repr(parts).encode(), usedforsecurity=False).hexdigest()
+
+
+@condition(etag_func=_job_list_etag)
 def job_list_view(request):
-    """职位列表视图"""
+    """职位列表视图（支持 If-None-Match，内容未变化时直接返回 304）"""
     # 从中间件获取用户（如果已登录）
     current_user = getattr(request, 'user_obj', None)
     
     # 如果是公司用户，只显示自己发布的职位；否则显示所有职位
-    if current_user and current_user.is_company():
-        jobs = Job.objects.filter(company_user=current_user)
-    else:
+    scope = _list_scope(current_user)
+    if scope == GLOBAL_SCOPE:
         jobs = Job.objects.all()
+    else:
+        jobs = Job.objects.filter(company_user=current_user)
+    # 只取列表展示的列（摘要代替全文）
+    jobs = jobs.only(*Job.LIST_FIELDS)
+    
+    # 薪资筛选：salary_min 表示最低月薪不低于该值，salary_max 表示最高月薪不高于该值（走 salary 索引）
+    salary_filters = _salary_filters(request)
+    if 'salary_min' in salary_filters:
+        jobs = jobs.filter(salary_min__gte=salary_filters['salary_min'])
+    if 'salary_max' in salary_filters:
+        jobs = jobs.filter(salary_max__lte=salary_filters['salary_max'])
+    filter_parts = tuple(salary_filters.get(name) for name in ('salary_min', 'salary_max'))
     
-    # 分页
-    paginator = Paginator(jobs, 10)  # 每页10条
-    page_number = request.GET.get('page', 1)
-    page_obj = paginator.get_page(page_number)
+    # 关键词搜索（按相关度排序，结果有上限，使用页码分页）
+    query = request.GET.get('q', '').strip()
     
-    return render(request, 'jobs/list.html', {
+    # 分页：默认游标分页（无 COUNT/OFFSET），可通过 JOB_LIST_PAGINATION 切回页码分页
+    # 查询结果按版本号缓存，职位变化时由信号使对应范围失效
+    pagination_mode = 'page' if query else getattr(settings, 'JOB_LIST_PAGINATION', 'cursor')
+    if pagination_mode == 'cursor':
+        cursor = request.GET.get('cursor')
+        page_obj, cache_hit = get_or_set_list_page(
+            scope, _list_version(request, scope), ('cursor', cursor, *filter_parts),
+            lambda: CursorPaginator(jobs, JOB_LIST_PAGE_SIZE).get_page(cursor),
+        )
+    else:
+        page_number = request.GET.get('page', 1)
+        
+        def load_page():
+            if query:
+                company_user_id = None if scope == GLOBAL_SCOPE else current_user.id
+                source = _ranked_search_results(jobs, query, company_user_id=company_user_id, **salary_filters)
+            else:
+                source = jobs
+            source_paginator = Paginator(source, JOB_LIST_PAGE_SIZE)
+            page = source_paginator.get_page(page_number)
+            return list(page.object_list), page.number, source_paginator.count
+        
+        (rows, number, count), cache_hit = get_or_set_list_page(
+            scope, _list_version(request, scope), ('page', query, page_number, *filter_parts), load_page
+        )
+        # 用缓存的总数重建分页对象，避免再次 COUNT
+        page_obj = Page(rows, number, KnownCountPaginator(jobs, JOB_LIST_PAGE_SIZE, count))
+    
+    extra_params = {'q': query, **salary_filters} if query else salary_filters
+    response = render(request, 'jobs/list.html', {
         'page_obj': page_obj,
+        'pagination_mode': pagination_mode,
+        'query': query,
+        'page_size': JOB_LIST_PAGE_SIZE,
+        'salary_filters': salary_filters,
+        'extra_query': '&' + urlencode(extra_params) if extra_params else '',
         'is_company': current_user.is_company() if current_user else False
     })
+    response['X-Cache'] = 'HIT' if cache_hit else 'MISS'
+    # 每次使用前都向服务器验证 ETag
+    patch_cache_control(response, no_cache=True)
+    return response
+
+
+@require_http_methods(["GET", "HEAD"])
+def job_detail_view(request, job_id):
+    """职位详情视图（所有人可访问）"""
+    current_user = getattr(request, 'user_obj', None)
+    
+    # 职位信息部分按职位缓存渲染结果（职位保存/删除时失效），命中时不查询数据库
+    def render_job():
+        job = get_object_or_404(Job.objects.select_related('company_user'), id=job_id)
+        return render_to_string('jobs/detail_body.html', {'job': job})
+    
+    job_html, cache_hit = get_or_set_detail(job_id, render_job)
+    
+    # 浏览计数只在内存累加，定期批量写回
+    get_view_counter().incr(job_id)
+    
+    response = render(request, 'jobs/detail.html', {
+        'job_id': job_id,
+        'job_html': job_html,
+        'can_apply': bool(current_user) and not current_user.is_company(),
+    })
+    response['X-Cache'] = 'HIT' if cache_hit else 'MISS'
+    return response
 
 
 @require_http_methods(["GET", "POST"])
@@ -50,7 +210,8 @@ def job_create_view(request):
                     'duty': job.duty,
                     'salary': job.salary,
                     'created_at': job.created_at.strftime('%Y-%m-%d %H:%M:%S'),
-                }
+                },
+                **_row_fragment(request, job, 1),
             })
         else:
             return JsonResponse({
@@ -63,52 +224,91 @@ def job_create_view(request):
     return render(request, 'jobs/form_modal.html', {'form': form, 'form_title': '创建职位'})
 
 
+def _ownership_miss_response(job_id, current_user, action):
+    """按职位 ID + 公司限定的写入未命中时，区分 404（不存在）/ 403（不是自己的）/ 409（已被修改）"""
+    row = Job.objects.filter(id=job_id).values_list('company_user_id', 'version').first()
+    if row is None:
+        return JsonResponse({'success': False, 'error': '职位不存在'}, status=404)
+    company_user_id, version = row
+    if company_user_id != current_user.id:
+        return JsonResponse({'success': False, 'error': f'无权{action}此职位'}, status=403)
+    return JsonResponse({
+        'success': False,
+        'error': '职位已被修改，请刷新后重试',
+        'version': version,
+    }, status=409)
+
+
 @require_http_methods(["GET", "POST"])
 def job_update_view(request, job_id):
     """更新职位视图（AJAX）"""
     # 从中间件获取用户（中间件已检查权限）
     current_user = getattr(request, 'user_obj', None)
-    job = get_object_or_404(Job, id=job_id)
-    
-    # 检查是否是职位所属公司用户（中间件已检查公司用户，这里只检查所有权）
-    if job.company_user != current_user:
-        if request.method == 'POST':
-            return JsonResponse({'success': False, 'error': '无权修改此职位'}, status=403)
-        else:
-            return render(request, 'jobs/form_modal.html', {
-                'form': JobForm(),
-                'form_title': '编辑职位',
-                'error': '无权修改此职位'
-            })
     
     if request.method == 'POST':
-        form = JobForm(request.POST, instance=job)
-        if form.is_valid():
-            form.save()
-            return JsonResponse({
-                'success': True,
-                'message': '职位更新成功！',
-                'job': {
-                    'id': job.id,
-                    'title': job.title,
-                    'requirement': job.requirement,
-                    'duty': job.duty,
-                    'salary': job.salary,
-                    'updated_at': job.updated_at.strftime('%Y-%m-%d %H:%M:%S'),
-                }
-            })
-        else:
+        form = JobForm(request.POST)
+        if not form.is_valid():
             return JsonResponse({
                 'success': False,
                 'errors': form.errors
             }, status=400)
+        
+        # 乐观锁版本号必填：缺失或无效时无法判断是否覆盖了他人的修改
+        expected_version = request.POST.get('version', '')
+        if not expected_version.isdigit():
+            return JsonResponse({
+                'success': False,
+                'error': '缺少版本号，请刷新后重试'
+            }, status=400)
+        
+        # 一条 UPDATE 完成所有权检查 + 乐观锁 + 更新：WHERE id AND company_user_id AND version
+        job = form.save(commit=False)
+        job.fill_derived_fields()
+        values = {name: getattr(job, name) for name in [*JobForm.Meta.fields, *Job.derived_field_names()]}
+        jobs = Job.objects.filter(id=job_id, company_user_id=current_user.id, version=int(expected_version))
+        now = timezone.now()
+        if not jobs.update(**values, updated_at=now, version=F('version') + 1):
+            return _ownership_miss_response(job_id, current_user, '修改')
+        
+        # QuerySet.update() 不触发 post_save，手动通知缓存和搜索索引
+        job.id = job_id
+        job.company_user_id = current_user.id
+        jobs_written.send(sender=Job, company_user_id=current_user.id, jobs=[job])
+        
+        fragment = {}
+        if request.GET.get('fragment') == 'row':
+            fragment = _row_fragment(request, Job.objects.only(*Job.LIST_FIELDS).get(id=job_id), 0)
+        return JsonResponse({
+            'success': True,
+            'message': '职位更新成功！',
+            'job': {
+                'id': job_id,
+                'title': job.title,
+                'requirement': job.requirement,
+                'duty': job.duty,
+                'salary': job.salary,
+                'updated_at': timezone.localtime(now).strftime('%Y-%m-%d %H:%M:%S'),
+            },
+            **fragment,
+        })
     
-    # GET 请求返回表单 HTML
+    job = get_object_or_404(Job, id=job_id)
+    
+    # 检查是否是职位所属公司用户（中间件已检查公司用户，这里只检查所有权）
+    if job.company_user_id != current_user.id:
+        return render(request, 'jobs/form_modal.html', {
+            'form': JobForm(),
+            'form_title': '编辑职位',
+            'error': '无权修改此职位'
+        })
+    
+    # GET 请求返回表单 HTML（带上当前版本号，提交时用于乐观锁）
     form = JobForm(instance=job)
     return render(request, 'jobs/form_modal.html', {
         'form': form,
         'form_title': '编辑职位',
-        'job_id': job_id
+        'job_id': job_id,
+        'version': job.version,
     })
 
 
@@ -117,16 +317,75 @@ def job_delete_view(request, job_id):
     """删除职位视图（AJAX）"""
     # 从中间件获取用户（中间件已检查权限）
     current_user = getattr(request, 'user_obj', None)
-    job = get_object_or_404(Job, id=job_id)
     
-    # 检查是否是职位所属公司用户（中间件已检查公司用户，这里只检查所有权）
-    if job.company_user != current_user:
-        return JsonResponse({'success': False, 'error': '无权删除此职位'}, status=403)
+    # 按公司范围直接删除（先删除申请），不预先读取；未删除任何行时再区分 404/403
+    if not delete_company_job(current_user.id, job_id):
+        return _ownership_miss_response(job_id, current_user, '删除')
+    
+    # 没有经过 Model.delete()，手动通知缓存和搜索索引
+    jobs_deleted.send(sender=Job, company_user_id=current_user.id, job_ids=[job_id])
     
-    job_title = job.title
-    job.delete()
+    return JsonResponse({
+        'success': True,
+        'message': '职位已删除！'
+    })
+
+
+# 批量导入时响应中最多返回的错误行数
+BULK_IMPORT_MAX_ERRORS = 100
+
+
+@require_POST
+def job_bulk_import_view(request):
+    """批量导入职位（AJAX，上传 CSV/JSONL 文件）"""
+    current_user = getattr(request, 'user_obj', None)
+    upload = request.FILES.get('file')
+    if upload is None:
+        return JsonResponse({'success': False, 'error': '请选择要导入的文件'}, status=400)
+    
+    fmt = request.POST.get('format') or guess_format(upload.name)
+    if fmt not in FORMATS:
+        return JsonResponse({'success': False, 'error': f'不支持的格式：{fmt}'}, status=400)
+    
+    created, errors = import_jobs(upload, fmt, current_user)
+    return JsonResponse({
+        'success': True,
+        'message': f'导入完成：成功 {created} 个，失败 {len(errors)} 个',
+        'created': created,
+        'error_count': len(errors),
+        'errors': [{'line': line_num, 'errors': row_errors} for line_num, row_errors in errors[:BULK_IMPORT_MAX_ERRORS]],
+    })
+
+
+@require_POST
+def job_bulk_delete_view(request):
+    """批量删除职位（AJAX，参数 ids 可重复），只删除当前公司自己的职位"""
+    current_user = getattr(request, 'user_obj', None)
+    try:
+        job_ids = [int(job_id) for job_id in request.POST.getlist('ids')]
+    except ValueError:
+        return JsonResponse({'success': False, 'error': '职位ID无效'}, status=400)
     
+    deleted_ids = delete_jobs(current_user, job_ids)
     return JsonResponse({
         'success': True,
-        'message': f'职位"{job_title}"已删除！'
+        'message': f'已删除 {len(deleted_ids)} 个职位！',
+        'deleted': deleted_ids,
     })
+
+
+@require_http_methods(["GET"])
+def job_export_view(request):
+    """导出当前公司的职位（?format=csv|jsonl，流式输出）"""
+    current_user = getattr(request, 'user_obj', None)
+    fmt = request.GET.get('format', 'csv')
+    if fmt not in FORMATS:
+        return JsonResponse({'success': False, 'error': f'不支持的格式：{fmt}'}, status=400)
+    
+    response = StreamingHttpResponse(
+        iter_export(fmt, EXPORT_FIELDS, iter_export_chunks(current_user)),
+        content_type=CONTENT_TYPES[fmt],
+    )
+    filename = f'jobs-{timezone.localdate():%Y%m%d}.{fmt}'
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
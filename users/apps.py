@@ -4,3 +4,14 @@ from django.apps import AppConfig
 class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'users'
+
+    def ready(self):
+        # 注册信号处理器（用户缓存失效）
+        from . import signals  # noqa: F401
+        # 注册启动检查（登录限流计数必须多进程共享）
+        from . import checks  # noqa: F401
+        
+        # 头像缩略图记录在 JSON 字段中，需要单独告知存储垃圾回收
+        from web.storage import register_reference_provider
+        from .images import variant_references
+        register_reference_provider(variant_references)
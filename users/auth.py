@@ -0,0 +1,53 @@
+from django.conf import settings
+from django.core.cache import cache
+from .models import User
+
+
+# 跨请求用户缓存的 key 模板
+USER_CACHE_KEY = 'users:user:{}'
+
+
+def _user_cache_timeout():
+    """跨请求用户缓存的有效期（秒），0 表示不使用缓存"""
+    return getattr(settings, 'USER_CACHE_TIMEOUT', 0)
+
+
+def load_user(user_id):
+    """按 ID 加载用户，优先读取短期缓存，未命中时查询数据库"""
+    timeout = _user_cache_timeout()
+    key = USER_CACHE_KEY.format(user_id)
+    if timeout:
+        user = cache.get(key)
+        if user is not None:
+            return user
+
+    try:
+        user = User.objects.get(id=user_id)
+    except (User.DoesNotExist, ValueError, TypeError):
+        return None
+
+    if timeout:
+        cache.set(key, user, timeout)
+    return user
+
+
+def invalidate_user_cache(user_id):
+    """用户被修改或删除时清除其缓存"""
+    cache.delete(USER_CACHE_KEY.format(user_id))
+
+
+def get_current_user(request):
+    """获取当前请求的登录用户
+
+    同一个请求内只解析一次，中间件、上下文处理器和视图共享同一个结果，
+    因此一次请求最多查询一次用户表（缓存命中时不查询）。
+    """
+    if not hasattr(request, '_cached_user_obj'):
+        user_id = request.session.get('user_id')
+        request._cached_user_obj = load_user(user_id) if user_id else None
+    return request._cached_user_obj
+
+
+def set_current_user(request, user):
+    """登录/登出后更新当前请求缓存的用户"""
+    request._cached_user_obj = user
@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.core.checks import Warning, register
+
+from web.checks import DATABASE_BACKEND, check_shared_cache
+from .throttling import DEFAULT_SETTINGS
+
+
+@register()
+def check_login_throttle_store(app_configs, **kwargs):
+    """共享计数和统计计数要在所有进程间共享，否则额度按进程放行、统计命令也看不到计数"""
+    config = {**DEFAULT_SETTINGS, **getattr(settings, 'LOGIN_THROTTLE', {})}
+    errors = check_shared_cache(config['STATS_CACHE_ALIAS'], '登录限流统计', 'users')
+    if config['STORE'] == 'cache':
+        errors += check_shared_cache(config['CACHE_ALIAS'], '登录限流计数', 'users')
+        backend = settings.CACHES.get(config['CACHE_ALIAS'], {}).get('BACKEND')
+        if backend == DATABASE_BACKEND:
+            errors.append(Warning(
+                f"LOGIN_THROTTLE 的计数使用数据库缓存（别名 {config['CACHE_ALIAS']!r}），每次登录尝试都要执行多条 SQL。",
+                hint="把 CACHE_ALIAS 配置为 Redis/Memcached，或改回 'local'。",
+                id='users.W002',
+            ))
+    return errors
+
+
+# 读取时经过缓存的 session 引擎
+CACHED_SESSION_ENGINES = (
+    'django.contrib.sessions.backends.cache',
+    'django.contrib.sessions.backends.cached_db',
+)
+
+
+@register()
+def check_session_cache(app_configs, **kwargs):
+    """session 读缓存要在所有进程间共享，否则退出登录/flush 只清掉当前进程的缓存，其他进程在过期前仍接受该 session"""
+    if settings.SESSION_ENGINE not in CACHED_SESSION_ENGINES:
+        return []
+    return check_shared_cache(settings.SESSION_CACHE_ALIAS, 'Session 缓存', 'users', first=10)
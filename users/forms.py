@@ -1,4 +1,5 @@
 from django import forms
+from django.db.models import Q
 from .models import User
 
 
@@ -32,7 +33,17 @@ class LoginForm(forms.Form):
 
 
 class RegisterForm(forms.Form):
-    """注册表单"""
+    """注册表单
+
+    插入前用 add_taken_errors 做一次廉价的预检查，避免重复注册时白白计算密码哈希、写入头像；
+    唯一性最终由数据库唯一索引保证（并发注册也不会重复），冲突时用 add_unique_errors 映射回字段错误。
+    """
+    
+    # 唯一索引冲突时的字段错误信息
+    UNIQUE_FIELD_ERRORS = {
+        'login_id': '该登录ID已被使用，请选择其他ID。',
+        'email': '该邮箱已被注册，请使用其他邮箱。',
+    }
     
     login_id = forms.CharField(
         max_length=150,
@@ -100,19 +111,22 @@ class RegisterForm(forms.Form):
         help_text='可选，上传您的头像图片'
     )
     
-    def clean_login_id(self):
-        """验证 login_id 是否已存在"""
-        login_id = self.cleaned_data.get('login_id')
-        if User.objects.filter(login_id=login_id).exists():
-            raise forms.ValidationError('该登录ID已被使用，请选择其他ID。')
-        return login_id
+    # 头像大小上限（与前端校验一致）
+    MAX_PROFILE_IMAGE_SIZE = 5 * 1024 * 1024
+    # 头像像素上限，防止解压炸弹拖慢后台缩略图生成
+    MAX_PROFILE_IMAGE_PIXELS = 40_000_000
     
-    def clean_email(self):
-        """验证 email 是否已存在"""
-        email = self.cleaned_data.get('email')
-        if User.objects.filter(email=email).exists():
-            raise forms.ValidationError('该邮箱已被注册，请使用其他邮箱。')
-        return email
+    def clean_profile_image(self):
+        """验证头像大小和尺寸（ImageField 已校验图片格式）"""
+        image = self.cleaned_data.get('profile_image')
+        if not image:
+            return image
+        if image.size > self.MAX_PROFILE_IMAGE_SIZE:
+            raise forms.ValidationError('图片大小不能超过5MB！')
+        width, height = image.image.size
+        if width * height > self.MAX_PROFILE_IMAGE_PIXELS:
+            raise forms.ValidationError('图片尺寸过大，请压缩后再上传。')
+        return image
     
     def clean(self):
         """验证两次密码是否一致"""
@@ -127,3 +141,38 @@ class RegisterForm(forms.Form):
                 })
         
         return cleaned_data
+    
+    def add_taken_errors(self):
+        """插入前预检查 login_id/email 是否已被占用，占用时把错误加到表单上并返回 True"""
+        login_id = self.cleaned_data['login_id']
+        email = self.cleaned_data['email']
+        taken = User.objects.filter(Q(login_id=login_id) | Q(email=email)).values_list('login_id', 'email')
+        # 按不区分大小写比较，与 MySQL 默认排序规则下唯一索引的判定一致
+        fields = set()
+        for taken_login_id, taken_email in taken:
+            if taken_login_id.casefold() == login_id.casefold():
+                fields.add('login_id')
+            if taken_email.casefold() == email.casefold():
+                fields.add('email')
+        for field in sorted(fields, key=list(self.UNIQUE_FIELD_ERRORS).index):
+            self.add_error(field, self.UNIQUE_FIELD_ERRORS[field])
+        return bool(fields)
+    
+    def add_unique_errors(self, exc):
+        """把插入用户时的 IntegrityError 映射为对应字段的错误"""
+        message = str(exc)
+        table = User._meta.db_table
+        fields = [
+            field for field in self.UNIQUE_FIELD_ERRORS
+            # MySQL: Duplicate entry '...' for key 'users.login_id'；SQLite: UNIQUE constraint failed: users.login_id
+            if f'{table}.{field}' in message or f"key '{field}'" in message
+        ]
+        if not fields:
+            # 无法从错误信息判断时再查询一次（只在冲突时发生）
+            fields = [
+                field for field in self.UNIQUE_FIELD_ERRORS
+                if User.objects.filter(**{field: self.cleaned_data.get(field)}).exists()
+            ]
+        for field in fields:
+            self.add_error(field, self.UNIQUE_FIELD_ERRORS[field])
+        return bool(fields)
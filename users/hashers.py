@@ -0,0 +1,15 @@
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+
+class ConfigurablePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """迭代次数可配置的 PBKDF2 哈希器
+
+    算法名与 Django 默认 PBKDF2 相同，已有密码可直接校验；
+    settings.PASSWORD_HASH_ITERATIONS 调整后，旧哈希在下次登录成功时自动升级。
+    迭代次数可用 ``python manage.py tune_password_hasher`` 按目标耗时测算。
+    """
+
+    @property
+    def iterations(self):
+        return getattr(settings, 'PASSWORD_HASH_ITERATIONS', PBKDF2PasswordHasher.iterations)
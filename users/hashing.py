@@ -0,0 +1,67 @@
+"""密码哈希卸载
+
+PBKDF2 是纯 CPU 计算，在请求线程/事件循环中同步执行会阻塞其他请求。
+这里把哈希计算放到有上限的进程池中执行，异步视图 await 结果即可。
+PASSWORD_HASHING_WORKERS 设为 0 时退化为线程池执行（开发/测试环境）。
+"""
+import asyncio
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password, check_password, identify_hasher, get_hasher
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _init_worker():
+    """进程池子进程初始化：加载 Django 配置（哈希器参数来自 settings）"""
+    import django
+    django.setup()
+
+
+def get_executor():
+    """获取（并复用）密码哈希进程池；未启用进程池时返回 None"""
+    global _executor
+    workers = getattr(settings, 'PASSWORD_HASHING_WORKERS', os.cpu_count())
+    if not workers:
+        return None
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+    return _executor
+
+
+def verify_password(raw_password, encoded):
+    """校验密码，返回 (是否正确, 哈希是否需要升级)
+
+    在子进程中执行，因此不能像 check_password 那样传入 setter，改为返回是否需要升级。
+    """
+    if not check_password(raw_password, encoded):
+        return False, False
+    try:
+        hasher = identify_hasher(encoded)
+    except ValueError:
+        return True, False
+    preferred = get_hasher('default')
+    must_update = hasher.algorithm != preferred.algorithm or preferred.must_update(encoded)
+    return True, must_update
+
+
+async def _run(func, *args):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), func, *args)
+
+
+async def amake_password(raw_password):
+    """异步计算密码哈希"""
+    return await _run(make_password, raw_password)
+
+
+async def averify_password(raw_password, encoded):
+    """异步校验密码，返回 (是否正确, 哈希是否需要升级)"""
+    return await _run(verify_password, raw_password, encoded)
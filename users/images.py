@@ -0,0 +1,120 @@
+"""头像处理：上传后在后台生成固定尺寸的缩略图
+
+原图只解码一次，先裁剪为最大尺寸的正方形，再逐级缩小生成其余尺寸，
+每个尺寸分别编码为 WebP 和 JPEG，结果记录在 User.profile_image_variants 中：
+``{"32": {"webp": "<name>", "jpeg": "<name>"}, "64": {...}, "256": {...}}``
+"""
+import io
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from PIL import Image, ImageOps
+
+from .auth import invalidate_user_cache
+from .models import User
+
+
+logger = logging.getLogger(__name__)
+
+# 生成的缩略图尺寸（像素，正方形）
+AVATAR_SIZES = (256, 64, 32)
+
+# (格式名, Pillow 编码器, 编码参数)
+AVATAR_FORMATS = (
+    ('webp', 'WEBP', {'quality': 80, 'method': 4}),
+    ('jpeg', 'JPEG', {'quality': 85, 'optimize': True, 'progressive': True}),
+)
+
+VARIANT_DIR = 'profile_images/variants'
+
+
+def _encode(image, encoder, options):
+    buffer = io.BytesIO()
+    if encoder == 'JPEG' and image.mode != 'RGB':
+        # JPEG 不支持透明通道，铺白底
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A') if 'A' in image.getbands() else None)
+        image = background
+    image.save(buffer, encoder, **options)
+    return buffer.getvalue()
+
+
+def generate_variants(image_file, storage, prefix):
+    """解码一次原图并生成全部缩略图，返回 variants 字典"""
+    with image_file.open('rb') as f:
+        image = Image.open(f)
+        image = ImageOps.exif_transpose(image)
+        image.load()
+
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'A' in image.getbands() or image.mode == 'P' else 'RGB')
+
+    variants = {}
+    current = ImageOps.fit(image, (AVATAR_SIZES[0], AVATAR_SIZES[0]), Image.LANCZOS)
+    for size in AVATAR_SIZES:
+        if current.size[0] != size:
+            # 从上一级缩略图缩小，避免每个尺寸都从原图重采样
+            current = current.resize((size, size), Image.LANCZOS)
+        variants[str(size)] = {}
+        for fmt, encoder, options in AVATAR_FORMATS:
+            # 内容寻址存储按内容命名，重复生成不会产生新文件
+            name = f'{prefix}/{size}.{fmt}'
+            variants[str(size)][fmt] = storage.save(name, ContentFile(_encode(current, encoder, options)))
+    return variants
+
+
+def process_avatar(user_id):
+    """为用户生成头像缩略图并记录到数据库"""
+    user = User.objects.filter(pk=user_id).only('id', 'profile_image').first()
+    if user is None or not user.profile_image:
+        return None
+
+    field = user.profile_image
+    variants = generate_variants(field, field.storage, VARIANT_DIR)
+    # 只更新缩略图字段，不触发 post_save，因此手动清除用户缓存
+    User.objects.filter(pk=user_id).update(profile_image_variants=variants)
+    invalidate_user_cache(user_id)
+    return variants
+
+
+def variant_references():
+    """缩略图文件的引用（供内容寻址存储的垃圾回收统计引用计数）"""
+    for variants in User.objects.exclude(profile_image_variants={}).values_list(
+            'profile_image_variants', flat=True).iterator(chunk_size=2000):
+        for formats in (variants or {}).values():
+            yield from formats.values()
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                workers = getattr(settings, 'AVATAR_PROCESSING_WORKERS', 1)
+                _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='avatar')
+    return _executor
+
+
+def _process_in_worker(user_id):
+    try:
+        process_avatar(user_id)
+    except Exception:
+        logger.exception('生成头像缩略图失败：user_id=%s', user_id)
+    finally:
+        close_old_connections()
+
+
+def schedule_avatar_processing(user_id):
+    """事务提交后在后台线程生成缩略图（AVATAR_PROCESSING_WORKERS 为 0 时同步执行）"""
+    if not getattr(settings, 'AVATAR_PROCESSING_WORKERS', 1):
+        transaction.on_commit(lambda: process_avatar(user_id))
+        return
+    transaction.on_commit(lambda: _get_executor().submit(_process_in_worker, user_id))
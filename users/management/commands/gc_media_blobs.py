@@ -0,0 +1,141 @@
+import os
+import time
+from collections import Counter
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import models
+
+from web.storage import (
+    ContentAddressedStorage, REFERENCE_PROVIDERS, TMP_DIR, get_media_storage, is_blob_name,
+)
+
+
+def content_addressed_fields():
+    """所有使用内容寻址存储的文件字段，产出 (模型, 字段)"""
+    for model in apps.get_models():
+        for field in model._meta.concrete_fields:
+            if isinstance(field, models.FileField) and isinstance(field.storage, ContentAddressedStorage):
+                yield model, field
+
+
+def collect_references(chunk_size=2000):
+    """统计每个内容寻址文件的引用次数"""
+    counts = Counter()
+    for model, field in content_addressed_fields():
+        names = (
+            model._default_manager
+            .exclude(**{f'{field.name}__isnull': True})
+            .exclude(**{field.name: ''})
+            .values_list(field.name, flat=True)
+            .iterator(chunk_size=chunk_size)
+        )
+        counts.update(name for name in names if is_blob_name(name))
+    for provider in REFERENCE_PROVIDERS:
+        counts.update(name for name in provider() if is_blob_name(name))
+    return counts
+
+
+class Command(BaseCommand):
+    help = '统计内容寻址文件的引用计数，删除没有任何记录引用的文件'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='只输出将被删除的文件')
+        parser.add_argument('--min-age', type=float, default=24,
+                            help='只删除修改时间早于该小时数的文件（避免删除刚上传、记录尚未提交的文件）')
+        parser.add_argument('--adopt-legacy', action='store_true',
+                            help='先把旧的非内容寻址文件导入存储并更新记录（旧文件本身保留，需人工清理）')
+        parser.add_argument('--stats', action='store_true', help='输出被多次引用的文件')
+
+    def adopt_legacy(self, dry_run):
+        """把字段中仍指向旧文件名的记录迁移到内容寻址文件"""
+        adopted = 0
+        for model, field in content_addressed_fields():
+            rows = (
+                model._default_manager
+                .exclude(**{f'{field.name}__isnull': True})
+                .exclude(**{field.name: ''})
+                .values_list('pk', field.name)
+                .iterator(chunk_size=2000)
+            )
+            for pk, name in rows:
+                if is_blob_name(name) or not field.storage.exists(name):
+                    continue
+                if dry_run:
+                    self.stdout.write(f'adopt {model._meta.label}#{pk}: {name}')
+                    continue
+                with field.storage.open(name, 'rb') as f:
+                    new_name = field.storage.save(name, f)
+                model._default_manager.filter(pk=pk).update(**{field.name: new_name})
+                adopted += 1
+        return adopted
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        storage = get_media_storage()
+
+        if options['adopt_legacy']:
+            adopted = self.adopt_legacy(dry_run)
+            self.stdout.write(f'已迁移 {adopted} 条旧文件记录')
+
+        counts = collect_references()
+        cutoff = time.time() - options['min_age'] * 3600
+
+        total = deleted = freed = 0
+        for name, full_path in storage.iter_blobs():
+            total += 1
+            if counts.get(name):
+                continue
+            try:
+                stat = os.stat(full_path)
+            except FileNotFoundError:
+                continue
+            if stat.st_mtime > cutoff:
+                continue
+            if dry_run:
+                self.stdout.write(f'delete {name}')
+            else:
+                if not self._unlink_if_stale(full_path, cutoff):
+                    continue
+                self._remove_empty_dirs(os.path.dirname(full_path), storage.location)
+            deleted += 1
+            freed += stat.st_size
+
+        # 清理中断上传留下的临时文件
+        tmp_dir = storage.path(TMP_DIR)
+        if os.path.isdir(tmp_dir) and not dry_run:
+            for filename in os.listdir(tmp_dir):
+                path = os.path.join(tmp_dir, filename)
+                if os.path.getmtime(path) < cutoff:
+                    os.unlink(path)
+
+        if options['stats']:
+            for name, refs in counts.most_common():
+                if refs < 2:
+                    break
+                self.stdout.write(f'{refs:>6}  {name}')
+
+        action = '将删除' if dry_run else '已删除'
+        self.stdout.write(self.style.SUCCESS(
+            f'文件 {total} 个，引用 {sum(counts.values())} 次，{action} {deleted} 个（{freed / 1024:.1f} KB）'
+        ))
+
+    def _unlink_if_stale(self, full_path, cutoff):
+        """删除前再检查一次修改时间：引用统计之后有上传去重命中该文件时（会刷新修改时间）保留"""
+        try:
+            if os.stat(full_path).st_mtime > cutoff:
+                return False
+            os.unlink(full_path)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def _remove_empty_dirs(self, directory, root):
+        root = os.path.abspath(root)
+        directory = os.path.abspath(directory)
+        while directory != root and directory.startswith(root):
+            try:
+                os.rmdir(directory)
+            except OSError:
+                break
+            directory = os.path.dirname(directory)
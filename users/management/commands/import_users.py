@@ -0,0 +1,115 @@
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+
+from users.hashing import get_executor
+from users.models import User
+from web.importing import FORMATS, guess_format, iter_records, batched
+
+
+USER_TYPES = {choice for choice, _ in User.USER_TYPE_CHOICES}
+
+
+class Command(BaseCommand):
+    help = '从 CSV/JSONL 批量导入用户（分批 bulk_create），用于企业账号批量开通'
+
+    def add_arguments(self, parser):
+        parser.add_argument('file', help='CSV 或 JSONL 文件路径；字段：login_id, nickname, email, type, password 或 password_hash')
+        parser.add_argument('--format', choices=FORMATS, help='文件格式（默认按扩展名判断）')
+        parser.add_argument('--batch-size', type=int, default=1000, help='每批插入的用户数')
+        parser.add_argument('--default-type', choices=sorted(USER_TYPES), help='记录未指定 type 时使用的用户类型')
+
+    def _build_user(self, record, default_type):
+        """校验一条记录，返回 (User, 原始密码, 错误)"""
+        login_id = (record.get('login_id') or '').strip()
+        email = (record.get('email') or '').strip()
+        nickname = (record.get('nickname') or '').strip() or login_id
+        user_type = (record.get('type') or default_type or '').strip()
+        password = record.get('password') or ''
+        password_hash = record.get('password_hash') or ''
+
+        if not login_id or not email:
+            return None, None, '缺少 login_id 或 email'
+        if user_type not in USER_TYPES:
+            return None, None, f'无效的用户类型：{user_type!r}'
+        if not password and not password_hash:
+            return None, None, '缺少 password 或 password_hash'
+
+        user = User(login_id=login_id, email=email, nickname=nickname, type=user_type, password=password_hash)
+        return user, (None if password_hash else password), None
+
+    def _insert_batch(self, batch):
+        """插入一批用户，返回 (插入数, 冲突列表)"""
+        # 一次查询找出已存在的 login_id/email，报告后跳过
+        login_ids = [user.login_id for _, user, _ in batch]
+        emails = [user.email for _, user, _ in batch]
+        taken = User.objects.filter(Q(login_id__in=login_ids) | Q(email__in=emails)).values_list('login_id', 'email')
+        taken_ids = {login_id for login_id, _ in taken}
+        taken_emails = {email for _, email in taken}
+
+        conflicts = []
+        pending = []
+        seen_ids, seen_emails = set(), set()
+        for line_num, user, raw in batch:
+            if user.login_id in taken_ids or user.login_id in seen_ids:
+                conflicts.append((line_num, f'登录ID已存在：{user.login_id}'))
+            elif user.email in taken_emails or user.email in seen_emails:
+                conflicts.append((line_num, f'邮箱已存在：{user.email}'))
+            else:
+                seen_ids.add(user.login_id)
+                seen_emails.add(user.email)
+                pending.append((line_num, user, raw))
+
+        # 原始密码在进程池中并行哈希
+        raw_items = [(user, raw) for _, user, raw in pending if raw is not None]
+        if raw_items:
+            executor = get_executor()
+            raw_passwords = [raw for _, raw in raw_items]
+            hashes = executor.map(make_password, raw_passwords) if executor else map(make_password, raw_passwords)
+            for (user, _), encoded in zip(raw_items, hashes):
+                user.password = encoded
+
+        # ignore_conflicts 兜底并发导入时的唯一索引冲突；被跳过的行不会报错，
+        # 插入后按 login_id 回查，密码哈希（加盐）一致的才是本批写入的行
+        User.objects.bulk_create([user for _, user, _ in pending], ignore_conflicts=True)
+        stored = dict(
+            User.objects.filter(login_id__in=[user.login_id for _, user, _ in pending]).values_list('login_id', 'password')
+        )
+        inserted = 0
+        for line_num, user, _ in pending:
+            if stored.get(user.login_id) == user.password:
+                inserted += 1
+            else:
+                conflicts.append((line_num, f'登录ID或邮箱已被并发写入：{user.login_id}'))
+        return inserted, conflicts
+
+    def handle(self, *args, **options):
+        path = options['file']
+        fmt = options['format'] or guess_format(path)
+        created = 0
+        errors = []
+
+        def valid_records(stream):
+            for line_num, record, error in iter_records(stream, fmt):
+                if error is None:
+                    user, raw, error = self._build_user(record, options['default_type'])
+                if error:
+                    errors.append((line_num, error))
+                    continue
+                yield line_num, user, raw
+
+        try:
+            stream = open(path, 'rb')
+        except OSError as exc:
+            raise CommandError(f'无法打开文件：{exc}')
+
+        with stream:
+            for batch in batched(valid_records(stream), options['batch_size']):
+                inserted, conflicts = self._insert_batch(batch)
+                created += inserted
+                errors.extend(conflicts)
+                self.stdout.write(f'已导入 {created} 个用户')
+
+        for line_num, error in sorted(errors):
+            self.stderr.write(f'第 {line_num} 行：{error}')
+        self.stdout.write(self.style.SUCCESS(f'导入完成：成功 {created} 个，失败 {len(errors)} 个'))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from users.throttling import get_login_throttle
+
+
+class Command(BaseCommand):
+    help = '查看登录限流统计（rejected 即被拦截、未执行密码哈希的尝试次数）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='输出后清零计数器')
+
+    def handle(self, *args, **options):
+        # 各 Web 进程定期把统计计数合并写入共享缓存（LOGIN_THROTTLE['STATS_CACHE_ALIAS']），最多滞后 STATS_FLUSH_INTERVAL 秒
+        throttle = get_login_throttle()
+        stats = throttle.stats()
+        for name, value in stats.items():
+            self.stdout.write(f'{name}: {value}')
+        if stats['checked']:
+            ratio = stats['rejected'] / stats['checked'] * 100
+            self.stdout.write(f'hashing avoided: {ratio:.1f}%')
+        if options['reset']:
+            throttle.reset_stats()
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from users.images import process_avatar
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = '为已上传头像但尚未生成缩略图的用户补生成缩略图'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='重新生成所有用户的缩略图')
+        parser.add_argument('--chunk-size', type=int, default=500, help='每批读取的用户数')
+
+    def handle(self, *args, **options):
+        users = User.objects.exclude(profile_image='').exclude(profile_image__isnull=True)
+        if not options['all']:
+            users = users.filter(profile_image_variants={})
+
+        processed = 0
+        for user_id in users.values_list('id', flat=True).iterator(chunk_size=options['chunk_size']):
+            try:
+                process_avatar(user_id)
+                processed += 1
+            except Exception as exc:
+                self.stderr.write(f'用户 {user_id} 处理失败：{exc}')
+        self.stdout.write(self.style.SUCCESS(f'已处理 {processed} 个用户'))
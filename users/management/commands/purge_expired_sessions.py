@@ -0,0 +1,42 @@
+import time
+
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = '分批删除已过期的 session（按 expire_date 索引分块，避免一次大 DELETE 长时间锁表）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000, help='每批删除的 session 数量')
+        parser.add_argument('--sleep', type=float, default=0.0, help='每批之间暂停的秒数，降低对线上库的压力')
+        parser.add_argument('--max-chunks', type=int, default=0, help='最多执行的批次数（0 表示不限制）')
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        now = timezone.now()
+        total = 0
+        chunks = 0
+
+        while True:
+            # 走 expire_date 索引取出一批已过期的主键，再按主键删除
+            keys = list(
+                Session.objects
+                .filter(expire_date__lt=now)
+                .order_by('expire_date')
+                .values_list('session_key', flat=True)[:chunk_size]
+            )
+            if not keys:
+                break
+
+            deleted, _ = Session.objects.filter(session_key__in=keys).delete()
+            total += deleted
+            chunks += 1
+
+            if options['max_chunks'] and chunks >= options['max_chunks']:
+                break
+            if options['sleep']:
+                time.sleep(options['sleep'])
+
+        self.stdout.write(self.style.SUCCESS(f'已删除 {total} 个过期 session（{chunks} 批）'))
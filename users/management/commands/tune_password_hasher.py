@@ -0,0 +1,46 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import get_hasher
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = '测量本机 PBKDF2 速度，按目标耗时推荐 PASSWORD_HASH_ITERATIONS'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target-ms', type=float, default=100.0, help='单次哈希的目标耗时（毫秒）')
+        parser.add_argument('--sample-iterations', type=int, default=100000, help='测速使用的迭代次数')
+        parser.add_argument('--rounds', type=int, default=3, help='测速轮数（取最快一轮）')
+
+    def _measure(self, hasher, iterations, rounds):
+        salt = hasher.salt()
+        best = None
+        for _ in range(rounds):
+            start = time.perf_counter()
+            hasher.encode('benchmark-password', salt, iterations)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+
+    def handle(self, *args, **options):
+        hasher = get_hasher('default')
+        if not hasattr(hasher, 'iterations'):
+            self.stderr.write(f'当前默认哈希器 {hasher.algorithm} 不支持迭代次数配置')
+            return
+
+        sample = options['sample_iterations']
+        per_iteration = self._measure(hasher, sample, options['rounds']) / sample
+        recommended = int(options['target_ms'] / 1000 / per_iteration)
+        # 取整到千，便于配置
+        recommended = max(1000, recommended // 1000 * 1000)
+
+        verify = self._measure(hasher, recommended, 1) * 1000
+        current = hasher.iterations
+        current_ms = per_iteration * current * 1000
+
+        self.stdout.write(f'algorithm: {hasher.algorithm}')
+        self.stdout.write(f'current PASSWORD_HASH_ITERATIONS: {current} (~{current_ms:.1f} ms)')
+        self.stdout.write(f'recommended for {options["target_ms"]:.0f} ms: {recommended} (measured {verify:.1f} ms)')
+        self.stdout.write(f'workers: {getattr(settings, "PASSWORD_HASHING_WORKERS", None)}')
+        self.stdout.write(self.style.SUCCESS(f'PASSWORD_HASH_ITERATIONS = {recommended}'))
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.3 on 2026-10-18 10:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='profile_image_variants',
+            field=models.JSONField(blank=True, default=dict, help_text='后台生成的各尺寸缩略图，格式：{尺寸: {格式: 文件名}}', verbose_name='头像缩略图'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.0.3 on 2026-10-18 10:12
+
+import web.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_user_profile_image_variants'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='profile_image',
+            field=models.ImageField(blank=True, null=True, storage=web.storage.get_media_storage, upload_to='profile_images/', verbose_name='头像'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.3 on 2026-10-18 10:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_user_profile_image_storage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='application_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='收到的申请数'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='unread_application_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='未读申请数'),
+        ),
+    ]
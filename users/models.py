@@ -1,5 +1,7 @@
 from django.db import models
 from django.contrib.auth.hashers import make_password, check_password
+from web.storage import get_media_storage
+from . import hashing
 
 
 class User(models.Model):
@@ -40,11 +42,32 @@ class User(models.Model):
     
     profile_image = models.ImageField(
         upload_to='profile_images/',
+        storage=get_media_storage,
         null=True,
         blank=True,
         verbose_name='头像'
     )
     
+    profile_image_variants = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name='头像缩略图',
+        help_text='后台生成的各尺寸缩略图，格式：{尺寸: {格式: 文件名}}'
+    )
+    
+    # 公司用户收到的申请总数/未读数（由 applications.counters 用 F() 增量维护）
+    application_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='收到的申请数'
+    )
+    
+    unread_application_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='未读申请数'
+    )
+    
     created_at = models.DateTimeField(
         auto_now_add=True,
         verbose_name='创建时间'
@@ -67,8 +90,35 @@ class User(models.Model):
         self.password = make_password(raw_password)
     
     def check_password(self, raw_password):
-        """验证密码"""
-        return check_password(raw_password, self.password)
+        """验证密码（哈希参数过期时自动升级）"""
+        def setter(raw_password):
+            self.set_password(raw_password)
+            self.save(update_fields=['password'])
+        return check_password(raw_password, self.password, setter)
+    
+    async def aset_password(self, raw_password):
+        """异步设置密码（在进程池中计算哈希，不阻塞事件循环）"""
+        self.password = await hashing.amake_password(raw_password)
+    
+    async def acheck_password(self, raw_password):
+        """异步验证密码（哈希参数过期时自动升级）"""
+        valid, must_update = await hashing.averify_password(raw_password, self.password)
+        if valid and must_update:
+            await self.aset_password(raw_password)
+            await self.asave(update_fields=['password'])
+        return valid
+    
+    def avatar_name(self, size, fmt='jpeg'):
+        """返回不小于 size 的最小缩略图文件名；缩略图尚未生成时返回原图"""
+        variants = self.profile_image_variants or {}
+        for candidate in sorted(variants, key=int):
+            if int(candidate) >= size and fmt in variants[candidate]:
+                return variants[candidate][fmt]
+        if variants:
+            largest = max(variants, key=int)
+            if fmt in variants[largest]:
+                return variants[largest][fmt]
+        return self.profile_image.name if self.profile_image else None
     
     def is_company(self):
         """判断是否为公司用户"""
@@ -0,0 +1,64 @@
+"""路由访问策略表
+
+按解析后的 URL 名称（如 ``jobs:create``）或命名空间（如 ``company:*``）决定访问权限。
+策略表在启动时构建一次，请求时只需一次字典查找，不再逐条做路径前缀/子串匹配。
+"""
+
+# 策略级别
+PUBLIC = 'public'                 # 不做任何检查（首页、登录/注册/登出、媒体文件、admin）
+OPTIONAL = 'optional'             # 可匿名访问，已登录时附加用户对象（如职位列表）
+LOGIN_REQUIRED = 'login'          # 需要登录（默认策略：未列入策略表的路由不对匿名用户开放）
+COMPANY_REQUIRED = 'company'      # 需要公司用户
+INDIVIDUAL_REQUIRED = 'individual'  # 需要个人用户（如申请职位）
+
+DEFAULT_POLICY = LOGIN_REQUIRED
+
+# 路由策略配置：key 为 URL 名称，``namespace:*`` 表示整个命名空间
+ROUTE_POLICIES = {
+    'home': PUBLIC,
+    'users:login': PUBLIC,
+    'users:register': PUBLIC,
+    'users:logout': PUBLIC,
+    'admin:*': PUBLIC,
+    'media': PUBLIC,  # 媒体文件（授权在视图中按目录判断）
+    'jobs:list': OPTIONAL,
+    'jobs:detail': OPTIONAL,
+    'jobs:create': COMPANY_REQUIRED,
+    'jobs:update': COMPANY_REQUIRED,
+    'jobs:delete': COMPANY_REQUIRED,
+    'jobs:bulk_import': COMPANY_REQUIRED,
+    'jobs:bulk_delete': COMPANY_REQUIRED,
+    'company:*': COMPANY_REQUIRED,
+    'applications:create': INDIVIDUAL_REQUIRED,
+}
+
+
+class PolicyTable:
+    """预编译的路由策略表"""
+
+    def __init__(self, policies, default=DEFAULT_POLICY):
+        self.default = default
+        self.by_name = {}
+        self.by_namespace = {}
+        for key, policy in policies.items():
+            if key.endswith(':*'):
+                self.by_namespace[key[:-2]] = policy
+            else:
+                self.by_name[key] = policy
+
+    def lookup(self, resolver_match):
+        """根据 resolver_match 返回策略（精确名称优先，其次命名空间）"""
+        if resolver_match is None:
+            return self.default
+        policy = self.by_name.get(resolver_match.view_name)
+        if policy is not None:
+            return policy
+        return self.by_namespace.get(resolver_match.namespace, self.default)
+
+
+route_policies = PolicyTable(ROUTE_POLICIES)
+
+
+def get_route_policy(request):
+    """返回当前请求的访问策略（需在 URL 解析之后调用，如 process_view）"""
+    return route_policies.lookup(getattr(request, 'resolver_match', None))
@@ -0,0 +1,11 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import User
+from .auth import invalidate_user_cache
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def clear_user_cache(sender, instance, **kwargs):
+    """用户保存或删除后使缓存失效"""
+    invalidate_user_cache(instance.pk)
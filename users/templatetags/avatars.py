@@ -0,0 +1,28 @@
+from django import template
+
+
+register = template.Library()
+
+
+@register.simple_tag
+def avatar_url(user, size=64, fmt='jpeg'):
+    """返回适合 size 像素显示的最小头像 URL（无头像时返回空字符串）"""
+    if not user or not user.profile_image:
+        return ''
+    name = user.avatar_name(size, fmt)
+    return user.profile_image.storage.url(name) if name else ''
+
+
+@register.inclusion_tag('users/avatar.html')
+def avatar(user, size=32, css_class='rounded-circle'):
+    """渲染头像 <picture>：优先 WebP，JPEG 兜底"""
+    has_image = bool(user and user.profile_image)
+    has_variants = has_image and bool(user.profile_image_variants)
+    return {
+        'has_image': has_image,
+        'webp_url': avatar_url(user, size, 'webp') if has_variants else '',
+        'jpeg_url': avatar_url(user, size, 'jpeg') if has_image else '',
+        'size': size,
+        'css_class': css_class,
+        'alt': user.nickname if has_image else '',
+    }
@@ -1,3 +1,424 @@
-from django.test import TestCase
+import datetime
+import io
+import os
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.contrib.messages import get_messages
+from django.contrib.sessions.models import Session
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection
+from django.http import HttpResponse
+from django.test import Client, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.urls import path
+from django.utils.dateparse import parse_datetime
+
+from jobs.models import Job
+from web import urls as web_urls
+from . import throttling
+from .checks import check_login_throttle_store, check_session_cache
+from .forms import RegisterForm
+from .hashers import ConfigurablePBKDF2PasswordHasher
+from .models import User
+from .policies import (
+    COMPANY_REQUIRED, DEFAULT_POLICY, INDIVIDUAL_REQUIRED, LOGIN_REQUIRED, OPTIONAL, PUBLIC, PolicyTable,
+    ROUTE_POLICIES,
+)
+from .throttling import BufferedStats, CacheThrottleStore, LocalThrottleStore, LoginThrottle
+
+
+def _as_datetime(value):
+    """SQLite 的原生查询返回字符串"""
+    value = parse_datetime(value) if isinstance(value, str) else value
+    return value.replace(tzinfo=None)
+
+
+def _unlisted_view(request):
+    return HttpResponse('ok')
+
+
+# RoutePolicyTests 使用的 URLconf：站点路由加一个未列入策略表的路由
+urlpatterns = [
+    *web_urls.urlpatterns,
+    path('unlisted/', _unlisted_view, name='unlisted'),
+]
+
+
+class LoginThrottleTests(TestCase):
+
+    def make_throttle(self, store=None):
+        return LoginThrottle(store or CacheThrottleStore('shared'), 300, {'login_id': 3, 'ip': 5})
+
+    def test_limit(self):
+        for store in (CacheThrottleStore('shared'), LocalThrottleStore()):
+            with self.subTest(store=type(store).__name__):
+                throttle = self.make_throttle(store)
+                attempts = [throttle.reserve('bob', '10.0.0.1') for _ in range(5)]
+                self.assertEqual([attempt is not None for attempt in attempts], [True, True, True, False, False])
+
+    def test_concurrent_attempts_caught_after_reservation(self):
+        # 并发的一批尝试读到的都是同一个（未超限的）计数，预占后按 incr 的返回值拦下超出的部分
+        store = LocalThrottleStore()
+        throttle = self.make_throttle(store)
+        with mock.patch.object(store, 'get_many', return_value={}):
+            attempts = [throttle.reserve('bob', '10.0.0.1') for _ in range(5)]
+        self.assertEqual([attempt is not None for attempt in attempts], [True, True, True, False, False])
+
+    def test_rejection_reads_without_writing(self):
+        store = LocalThrottleStore()
+        throttle = LoginThrottle(store, 300, {'login_id': 3, 'ip': 5}, BufferedStats(LocalThrottleStore()))
+        for _ in range(3):
+            throttle.reserve('bob', '10.0.0.1')
+        with mock.patch.object(store, 'incr', side_effect=AssertionError('write')), \
+                mock.patch.object(store, 'decr', side_effect=AssertionError('write')):
+            self.assertIsNone(throttle.reserve('bob', '10.0.0.1'))
+
+    def test_success_refunds_reservation(self):
+        throttle = self.make_throttle()
+        for _ in range(2):
+            throttle.record_failure(throttle.reserve('bob', '10.0.0.1'))
+        throttle.record_success(throttle.reserve('bob', '10.0.0.1'))
+        # login_id 计数清零，IP 计数只剩两次失败
+        for _ in range(3):
+            self.assertIsNotNone(throttle.reserve('bob', '10.0.0.1'))
+        self.assertIsNone(throttle.reserve('bob', '10.0.0.1'))
+        self.assertIsNone(throttle.reserve('alice', '10.0.0.1'))
+
+    def test_ip_limit(self):
+        throttle = self.make_throttle()
+        for index in range(5):
+            self.assertIsNotNone(throttle.reserve(f'user{index}', '10.0.0.2'))
+        self.assertIsNone(throttle.reserve('other', '10.0.0.2'))
+        self.assertIsNotNone(throttle.reserve('other', '10.0.0.3'))
+
+    def test_cache_incr_keeps_timeout(self):
+        # 数据库缓存的 incr 按默认 TIMEOUT（300 秒）重新写入，需要保留 add 时设置的过期时间
+        store = CacheThrottleStore('shared')
+        store.incr('window', timeout=3600)
+        store.incr('window', timeout=3600)
+        store.incr('stat', delta=5)
+        self.assertEqual(store.get_many(['window', 'stat']), {'window': 2, 'stat': 5})
+        cache = caches['shared']
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT cache_key, expires FROM shared_cache WHERE cache_key IN (%s, %s)',
+                [cache.make_key('window'), cache.make_key('stat')],
+            )
+            expires = {key: value for key, value in cursor.fetchall()}
+        now = timezone.now().replace(tzinfo=None)
+        self.assertGreater(_as_datetime(expires[cache.make_key('window')]), now + datetime.timedelta(seconds=3000))
+        self.assertGreater(_as_datetime(expires[cache.make_key('stat')]), now + datetime.timedelta(days=365))
+
+    def test_stats_buffered_until_flush(self):
+        shared = CacheThrottleStore('shared')
+        web = LoginThrottle(LocalThrottleStore(), 300, {'login_id': 3}, BufferedStats(shared, flush_interval=3600))
+        web.record_failure(web.reserve('bob', '10.0.0.1'))
+        # 管理命令在另一个进程中，只能看到已写入共享缓存的计数
+        command = BufferedStats(shared)
+        self.assertEqual(command.values()['failures'], 0)
+        web.stats_buffer.flush()
+        self.assertEqual(command.values(), {'checked': 1, 'rejected': 0, 'failures': 1, 'successes': 0})
+
+
+class LoginThrottleCheckTests(SimpleTestCase):
+
+    def check_ids(self, **config):
+        with override_settings(LOGIN_THROTTLE=config):
+            return [message.id for message in check_login_throttle_store(None)]
+
+    def test_default_is_clean(self):
+        self.assertEqual(self.check_ids(), [])
+
+    def test_database_cache_counters_warn(self):
+        self.assertEqual(self.check_ids(STORE='cache', CACHE_ALIAS='shared'), ['users.W002'])
+
+    def test_process_local_stats_warn(self):
+        self.assertEqual(self.check_ids(STATS_CACHE_ALIAS='default'), ['users.W001'])
+
+
+class SessionCacheCheckTests(SimpleTestCase):
+
+    def test_default_sessions_cache_is_shared(self):
+        self.assertEqual(check_session_cache(None), [])
+
+    def test_process_local_sessions_cache_warns(self):
+        caches_config = {**settings.CACHES, 'sessions': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+        with override_settings(CACHES=caches_config):
+            self.assertEqual([message.id for message in check_session_cache(None)], ['users.W010'])
+        with override_settings(CACHES=caches_config, SESSION_ENGINE='django.contrib.sessions.backends.db'):
+            self.assertEqual(check_session_cache(None), [])
+
+
+class PurgeExpiredSessionsTests(TestCase):
+
+    def setUp(self):
+        now = timezone.now()
+        for index in range(5):
+            Session.objects.create(session_key=f'expired{index}', session_data='', expire_date=now - datetime.timedelta(days=index + 1))
+        for index in range(2):
+            Session.objects.create(session_key=f'live{index}', session_data='', expire_date=now + datetime.timedelta(days=1))
+
+    def purge(self, *args):
+        output = io.StringIO()
+        call_command('purge_expired_sessions', *args, stdout=output)
+        return output.getvalue()
+
+    def test_purge_in_chunks(self):
+        self.assertIn('已删除 5 个过期 session（3 批）', self.purge('--chunk-size', '2'))
+        self.assertEqual(sorted(Session.objects.values_list('session_key', flat=True)), ['live0', 'live1'])
+
+    def test_max_chunks_deletes_oldest_first(self):
+        self.assertIn('已删除 2 个过期 session（1 批）', self.purge('--chunk-size', '2', '--max-chunks', '1'))
+        self.assertFalse(Session.objects.filter(session_key__in=['expired3', 'expired4']).exists())
+        self.assertEqual(Session.objects.count(), 5)
+
+
+@override_settings(PASSWORD_HASH_ITERATIONS=1000, PASSWORD_HASHING_WORKERS=0)
+class PasswordUpgradeTests(TestCase):
+
+    def setUp(self):
+        throttling._login_throttle = None
+        self.addCleanup(setattr, throttling, '_login_throttle', None)
+
+    def create_user(self, encoded):
+        return User.objects.create(
+            login_id='bob', password=encoded, nickname='Bob', email='bob@example.test', type='individual',
+        )
+
+    def login(self, password):
+        return self.client.post('/users/login/', {'login_id': 'bob', 'password': password})
+
+    def stored_password(self):
+        return User.objects.values_list('password', flat=True).get(login_id='bob')
+
+    def test_old_iterations_upgraded_on_login(self):
+        self.create_user(ConfigurablePBKDF2PasswordHasher().encode('secret1', 'salt', iterations=500))
+        self.assertRedirects(self.login('secret1'), '/home/', fetch_redirect_response=False)
+        algorithm, iterations, _, _ = self.stored_password().split('$')
+        self.assertEqual((algorithm, iterations), ('pbkdf2_sha256', '1000'))
+        self.assertTrue(hashers.check_password('secret1', self.stored_password()))
+
+    def test_old_algorithm_upgraded_on_login(self):
+        self.create_user(hashers.PBKDF2SHA1PasswordHasher().encode('secret1', 'salt', iterations=500))
+        self.login('secret1')
+        self.assertTrue(self.stored_password().startswith('pbkdf2_sha256$1000$'))
+
+    def test_failed_login_not_upgraded(self):
+        encoded = ConfigurablePBKDF2PasswordHasher().encode('secret1', 'salt', iterations=500)
+        self.create_user(encoded)
+        response = self.login('wrong-password')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('user_id', self.client.session)
+        self.assertEqual(self.stored_password(), encoded)
+
+    def test_current_hash_not_rewritten(self):
+        encoded = hashers.make_password('secret1')
+        self.assertTrue(encoded.startswith('pbkdf2_sha256$1000$'))
+        self.create_user(encoded)
+        with mock.patch.object(User, 'asave', side_effect=AssertionError('saved')):
+            self.assertRedirects(self.login('secret1'), '/home/', fetch_redirect_response=False)
+        self.assertEqual(self.stored_password(), encoded)
+
+    def test_sync_check_password(self):
+        user = self.create_user(ConfigurablePBKDF2PasswordHasher().encode('secret1', 'salt', iterations=500))
+        self.assertFalse(user.check_password('wrong-password'))
+        self.assertIn('$500$', self.stored_password())
+        self.assertTrue(user.check_password('secret1'))
+        self.assertIn('$1000$', self.stored_password())
+
+
+@override_settings(LOGIN_THROTTLE={'LOGIN_ID_LIMIT': 2, 'IP_LIMIT': 0, 'STATS_FLUSH_INTERVAL': 3600})
+class LoginViewThrottleTests(TestCase):
+
+    def setUp(self):
+        throttling._login_throttle = None
+        self.addCleanup(setattr, throttling, '_login_throttle', None)
+
+    def test_blocked_before_any_query(self):
+        for _ in range(2):
+            response = self.client.post('/users/login/', {'login_id': 'nobody', 'password': 'secret1'})
+            self.assertEqual(response.status_code, 200)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/users/login/', {'login_id': 'nobody', 'password': 'secret1'})
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(len(queries), 0, [query['sql'] for query in queries])
+        output = io.StringIO()
+        call_command('login_throttle_stats', stdout=output)
+        self.assertIn('rejected: 1', output.getvalue())
+        self.assertIn('failures: 2', output.getvalue())
+
+
+@override_settings(PASSWORD_HASHING_WORKERS=0)
+class RegisterTests(TransactionTestCase):
+    # 注册视图依赖自动提交模式处理唯一索引冲突，不能包在 TestCase 的事务里
+
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        self.media_root = media_root.name
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        User.objects.create(login_id='bob', password='!', nickname='Bob', email='bob@example.test', type='individual')
+
+    def register(self, **data):
+        fields = {
+            'login_id': 'alice', 'password': 'secret123', 'password_confirm': 'secret123',
+            'nickname': 'Alice', 'email': 'alice@example.test', 'type': 'individual',
+        }
+        fields.update(data)
+        return self.client.post('/users/register/', fields)
+
+    def test_register(self):
+        response = self.register()
+        self.assertRedirects(response, '/users/login/', fetch_redirect_response=False)
+        self.assertTrue(User.objects.get(login_id='alice').password.startswith('pbkdf2_'))
+
+    def test_duplicate_rejected_before_hashing(self):
+        with mock.patch.object(User, 'aset_password', side_effect=AssertionError('hashed')):
+            response = self.register(login_id='bob', email='bob@example.test')
+        self.assertEqual(response.status_code, 200)
+        errors = response.context['form'].errors
+        self.assertEqual(errors['login_id'], ['该登录ID已被使用，请选择其他ID。'])
+        self.assertEqual(errors['email'], ['该邮箱已被注册，请使用其他邮箱。'])
+        self.assertEqual(os.listdir(self.media_root), [])
+
+    def test_concurrent_duplicate_hits_unique_constraint(self):
+        # 另一个请求在预检查之后注册了同一个 login_id
+        with mock.patch.object(RegisterForm, 'add_taken_errors', return_value=False):
+            response = self.register(login_id='bob')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['form'].errors['login_id'], ['该登录ID已被使用，请选择其他ID。'])
+        self.assertEqual(User.objects.filter(login_id='bob').count(), 1)
+
+
+@override_settings(PASSWORD_HASHING_WORKERS=0)
+class ImportUsersTests(TestCase):
+
+    def setUp(self):
+        User.objects.create(login_id='bob', password='!', nickname='Bob', email='bob@example.test', type='individual')
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'users.csv')
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write('login_id,email,type,password\n')
+            f.write('alice,alice@example.test,individual,secret123\n')
+            f.write('bob,bob2@example.test,individual,secret123\n')
+            f.write('carol,carol@example.test,individual,secret123\n')
+
+    def import_users(self):
+        stdout, stderr = io.StringIO(), io.StringIO()
+        call_command('import_users', self.path, stdout=stdout, stderr=stderr)
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_import(self):
+        stdout, stderr = self.import_users()
+        self.assertIn('导入完成：成功 2 个，失败 1 个', stdout)
+        self.assertIn('第 3 行：登录ID已存在：bob', stderr)
+
+    def test_rows_skipped_by_unique_index_not_counted(self):
+        # 另一个导入进程在预检查之后、插入之前写入了 carol
+        def make_password(raw):
+            if not User.objects.filter(login_id='carol').exists():
+                User.objects.create(login_id='carol', password='!', nickname='C', email='c@example.test', type='individual')
+            return hashers.make_password(raw)
+
+        with mock.patch('users.management.commands.import_users.make_password', side_effect=make_password):
+            stdout, stderr = self.import_users()
+        self.assertIn('导入完成：成功 1 个，失败 2 个', stdout)
+        self.assertIn('第 4 行：登录ID或邮箱已被并发写入：carol', stderr)
+        self.assertEqual(User.objects.get(login_id='carol').email, 'c@example.test')
+
+
+@override_settings(ROOT_URLCONF='users.tests')
+class RoutePolicyTests(TestCase):
+
+    def setUp(self):
+        self.company = User.objects.create(
+            login_id='acme', password='!', nickname='Acme', email='hr@acme.test', type='company',
+        )
+        self.individual = User.objects.create(
+            login_id='bob', password='!', nickname='Bob', email='bob@example.test', type='individual',
+        )
+
+    def login(self, user, expiry=None):
+        client = Client()
+        session = client.session
+        session['user_id'] = user.id
+        if expiry is not None:
+            session.set_expiry(expiry)
+        session.save()
+        return client
+
+    def assertRedirectsTo(self, response, url, message=None):
+        self.assertRedirects(response, url, fetch_redirect_response=False)
+        if message is not None:
+            self.assertIn(message, [str(item) for item in get_messages(response.wsgi_request)])
+
+    def test_table(self):
+        table = PolicyTable(ROUTE_POLICIES)
+        cases = {
+            ('home', ''): PUBLIC,
+            ('users:login', 'users'): PUBLIC,
+            ('admin:index', 'admin'): PUBLIC,
+            ('jobs:list', 'jobs'): OPTIONAL,
+            ('jobs:create', 'jobs'): COMPANY_REQUIRED,
+            ('company:application_list', 'company'): COMPANY_REQUIRED,
+            ('applications:create', 'applications'): INDIVIDUAL_REQUIRED,
+            # 未列入的名称和命名空间使用默认策略
+            ('jobs:unknown', 'jobs'): LOGIN_REQUIRED,
+            ('unlisted', ''): LOGIN_REQUIRED,
+        }
+        for (view_name, namespace), policy in cases.items():
+            with self.subTest(view_name=view_name):
+                self.assertEqual(table.lookup(mock.Mock(view_name=view_name, namespace=namespace)), policy)
+        self.assertEqual(table.lookup(None), DEFAULT_POLICY)
+
+    def test_public(self):
+        for url in ('/', '/users/login/', '/users/register/'):
+            with self.subTest(url=url):
+                self.assertEqual(Client().get(url).status_code, 200)
+
+    def test_optional(self):
+        self.assertEqual(Client().get('/jobs/').status_code, 200)
+        self.assertEqual(self.login(self.individual).get('/jobs/').status_code, 200)
+
+    def test_unknown_route_requires_login(self):
+        self.assertRedirectsTo(Client().get('/unlisted/'), '/users/login/', '请先登录。')
+        self.assertEqual(self.login(self.individual).get('/unlisted/').status_code, 200)
+
+    def test_company_only(self):
+        for url in ('/jobs/create/', '/company/applications/'):
+            with self.subTest(url=url):
+                self.assertRedirectsTo(Client().get(url), '/users/login/', '请先登录。')
+                self.assertRedirectsTo(self.login(self.individual).get(url), '/jobs/', '只有公司用户可以访问此功能。')
+        self.assertEqual(self.login(self.company).get('/company/applications/').status_code, 200)
+
+    def test_individual_only(self):
+        job = Job.objects.create(company_user=self.company, title='后端', requirement='Python', duty='写代码', salary='10k')
+        url = f'/applications/create/?job={job.id}'
+        self.assertRedirectsTo(Client().get(url), '/users/login/', '请先登录。')
+        self.assertRedirectsTo(self.login(self.company).get(url), '/jobs/', '只有个人用户可以访问此功能。')
+        self.assertEqual(self.login(self.individual).get(url).status_code, 200)
+
+    def test_deleted_user_logged_out(self):
+        client = self.login(self.company)
+        self.company.delete()
+        self.assertRedirectsTo(client.get('/company/applications/'), '/users/login/', '用户不存在，请重新登录。')
+        self.assertNotIn('user_id', client.session)
+
+    def test_expired_session(self):
+        client = self.login(self.company, expiry=timezone.now() + datetime.timedelta(hours=1))
+        later = timezone.now() + datetime.timedelta(hours=2)
+        with mock.patch('users.middleware.timezone', now=mock.Mock(return_value=later)):
+            # 公开路由不检查过期
+            self.assertEqual(client.get('/').status_code, 200)
+            self.assertEqual(client.session['user_id'], self.company.id)
+            response = client.get('/company/applications/')
+        self.assertRedirectsTo(response, '/users/login/', '您的登录已过期，请重新登录。')
+        self.assertNotIn('user_id', client.session)
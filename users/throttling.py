@@ -0,0 +1,273 @@
+"""登录限流
+
+在查询用户和计算 PBKDF2 之前拒绝超限的登录尝试，按 login_id 和客户端 IP 分别计数。
+使用滑动窗口计数（当前窗口计数 + 上一窗口计数按剩余比例加权），每个 key 只需两个计数器。
+每次尝试先一次读取判断是否超限，超限直接拒绝、不做任何写入；未超限时预占计数（incr 后按返回值再判断一次），
+并发的一批尝试不会在第一次失败被记录之前全部放行；登录成功时退还预占（清除 login_id 计数，IP 计数减一）。
+计数存储可插拔：进程内存储（默认，拒绝路径没有任何 I/O，额度按进程计算）或 Django 缓存
+（多进程共享额度，需要原子 incr 的 Redis/Memcached；数据库缓存每次尝试都要多次查询，不适合）。
+统计计数在进程内累加，定期合并写入共享缓存（STATS_CACHE_ALIAS），统计命令能看到所有进程的计数。
+"""
+import atexit
+import hashlib
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+DEFAULT_SETTINGS = {
+    'STORE': 'local',         # 'local' 进程内存储；'cache' 使用 CACHE_ALIAS 指定的缓存
+    'CACHE_ALIAS': 'default',
+    'WINDOW': 300,            # 滑动窗口长度（秒）
+    'LOGIN_ID_LIMIT': 5,      # 每个 login_id 在窗口内允许的未成功尝试次数
+    'IP_LIMIT': 20,           # 每个 IP 在窗口内允许的未成功尝试次数
+    'STATS_CACHE_ALIAS': 'shared',  # 统计计数合并写入的共享缓存
+    'STATS_FLUSH_INTERVAL': 30,     # 统计计数写入间隔（秒）
+}
+
+# 统计计数器名称
+STAT_CHECKED = 'checked'      # 经过限流检查的登录尝试
+STAT_REJECTED = 'rejected'    # 被拒绝的尝试（即省下的用户查询和密码哈希次数）
+STAT_FAILURES = 'failures'    # 密码错误或用户不存在
+STAT_SUCCESSES = 'successes'  # 登录成功
+STAT_NAMES = [STAT_CHECKED, STAT_REJECTED, STAT_FAILURES, STAT_SUCCESSES]
+
+
+class LocalThrottleStore:
+    """进程内计数存储"""
+
+    # 超过该数量时清理过期 key
+    PRUNE_THRESHOLD = 10000
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get_many(self, keys):
+        now = time.monotonic()
+        result = {}
+        with self._lock:
+            for key in keys:
+                item = self._data.get(key)
+                if item and (item[1] is None or item[1] > now):
+                    result[key] = item[0]
+        return result
+
+    def incr(self, key, timeout=None, delta=1):
+        now = time.monotonic()
+        with self._lock:
+            value, expires_at = self._data.get(key, (0, None))
+            if expires_at is not None and expires_at <= now:
+                value = 0
+            if value == 0:
+                expires_at = now + timeout if timeout else None
+            self._data[key] = (value + delta, expires_at)
+            if len(self._data) > self.PRUNE_THRESHOLD:
+                self._prune(now)
+            return value + delta
+
+    def decr(self, key):
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item and item[0] > 0 and (item[1] is None or item[1] > now):
+                self._data[key] = (item[0] - 1, item[1])
+
+    def delete_many(self, keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def _prune(self, now):
+        expired = [k for k, (_, exp) in self._data.items() if exp is not None and exp <= now]
+        for key in expired:
+            del self._data[key]
+
+
+class CacheThrottleStore:
+    """基于 Django 缓存的计数存储（配置为 Redis/Memcached 时多进程共享）"""
+
+    def __init__(self, alias='default'):
+        self.cache = caches[alias]
+
+    def get_many(self, keys):
+        return self.cache.get_many(keys)
+
+    def incr(self, key, timeout=None, delta=1):
+        self.cache.add(key, 0, timeout)
+        try:
+            value = self.cache.incr(key, delta)
+        except ValueError:
+            # key 恰好在 add 和 incr 之间过期
+            self.cache.set(key, delta, timeout)
+            return delta
+        # 数据库/文件缓存的 incr 是先读后按默认 TIMEOUT 重新 set，会丢掉 add 时设置的过期时间
+        self.cache.touch(key, timeout)
+        return value
+
+    def decr(self, key):
+        try:
+            self.cache.decr(key)
+        except ValueError:
+            # 已过期，无需退还
+            pass
+
+    def delete_many(self, keys):
+        self.cache.delete_many(keys)
+
+
+class BufferedStats:
+    """统计计数缓冲：进程内累加，距上次写入超过 flush_interval 秒时合并写入 store（0 表示每次直接写入）"""
+
+    KEY_PREFIX = 'login_throttle:stats'
+
+    def __init__(self, store, flush_interval=0):
+        self.store = store
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._pending = Counter()
+        self._last_flush = time.monotonic()
+
+    def _key(self, name):
+        return f'{self.KEY_PREFIX}:{name}'
+
+    def incr(self, name):
+        with self._lock:
+            self._pending[name] += 1
+            due = time.monotonic() - self._last_flush >= self.flush_interval
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+            self._last_flush = time.monotonic()
+        for name, count in pending.items():
+            self.store.incr(self._key(name), delta=count)
+
+    def values(self):
+        """所有进程已写入的计数（含本进程未写入的部分）"""
+        self.flush()
+        values = self.store.get_many([self._key(name) for name in STAT_NAMES])
+        return {name: values.get(self._key(name), 0) for name in STAT_NAMES}
+
+    def reset(self):
+        with self._lock:
+            self._pending.clear()
+        self.store.delete_many([self._key(name) for name in STAT_NAMES])
+
+
+class LoginAttempt:
+    """一次已预占计数的登录尝试"""
+
+    def __init__(self, login_id, bucket, keys):
+        self.login_id = login_id
+        self.bucket = bucket
+        self.keys = keys  # {scope: 当前窗口计数 key}
+
+
+class LoginThrottle:
+    """登录尝试限流器"""
+
+    KEY_PREFIX = 'login_throttle'
+
+    def __init__(self, store, window, limits, stats=None):
+        self.store = store
+        self.window = window
+        self.limits = limits  # {scope: limit}
+        self.stats_buffer = stats or BufferedStats(store)
+
+    def _key(self, scope, ident, bucket):
+        digest = hashlib.md5(str(ident).encode('utf-8')).hexdigest()
+        return f'{self.KEY_PREFIX}:{scope}:{digest}:{bucket}'
+
+    def _idents(self, login_id, client_ip):
+        idents = {'login_id': login_id.strip().lower() if login_id else None, 'ip': client_ip}
+        return [(scope, idents[scope]) for scope in self.limits if idents.get(scope)]
+
+    def reserve(self, login_id, client_ip):
+        """预占一次登录尝试（在查询用户和校验密码之前调用）
+
+        一次读取当前和上一窗口的计数，已超限时直接返回 None（不写入）；否则递增当前窗口计数，
+        按递增后的值再判断一次（拦住并发读到同一计数的尝试，这些尝试的计数不退还），放行时返回 LoginAttempt。
+        """
+        now = time.time()
+        bucket = int(now // self.window)
+        # 当前窗口已过去的比例，上一窗口计数按剩余比例计入
+        weight = 1 - (now % self.window) / self.window
+
+        idents = self._idents(login_id, client_ip)
+        keys = {scope: (self._key(scope, ident, bucket), self._key(scope, ident, bucket - 1)) for scope, ident in idents}
+        counts = self.store.get_many([key for pair in keys.values() for key in pair])
+        carried = {scope: counts.get(previous, 0) * weight for scope, (_, previous) in keys.items()}
+
+        self.stats_buffer.incr(STAT_CHECKED)
+        if any(counts.get(current, 0) + 1 + carried[scope] > self.limits[scope] for scope, (current, _) in keys.items()):
+            self.stats_buffer.incr(STAT_REJECTED)
+            return None
+
+        attempt = LoginAttempt(login_id, bucket, {})
+        blocked = False
+        for scope, (current, _) in keys.items():
+            # 计数需要保留到下一个窗口结束
+            if self.store.incr(current, timeout=self.window * 2) + carried[scope] > self.limits[scope]:
+                blocked = True
+            attempt.keys[scope] = current
+        if blocked:
+            self.stats_buffer.incr(STAT_REJECTED)
+            return None
+        return attempt
+
+    def record_failure(self, attempt):
+        """登录失败：预占的计数保留"""
+        self.stats_buffer.incr(STAT_FAILURES)
+
+    def record_success(self, attempt):
+        """登录成功：清除该 login_id 的计数，IP 计数退还本次预占"""
+        if 'login_id' in attempt.keys:
+            ident = attempt.login_id.strip().lower()
+            self.store.delete_many([
+                self._key('login_id', ident, attempt.bucket),
+                self._key('login_id', ident, attempt.bucket - 1),
+            ])
+        if 'ip' in attempt.keys:
+            self.store.decr(attempt.keys['ip'])
+        self.stats_buffer.incr(STAT_SUCCESSES)
+
+    def stats(self):
+        """返回统计计数器（rejected 即省下的密码哈希次数）"""
+        return self.stats_buffer.values()
+
+    def reset_stats(self):
+        self.stats_buffer.reset()
+
+
+_login_throttle = None
+
+
+def get_login_throttle():
+    """按 settings.LOGIN_THROTTLE 创建（并复用）限流器"""
+    global _login_throttle
+    if _login_throttle is None:
+        config = {**DEFAULT_SETTINGS, **getattr(settings, 'LOGIN_THROTTLE', {})}
+        if config['STORE'] == 'cache':
+            store = CacheThrottleStore(config['CACHE_ALIAS'])
+        else:
+            store = LocalThrottleStore()
+        limits = {}
+        if config['LOGIN_ID_LIMIT']:
+            limits['login_id'] = config['LOGIN_ID_LIMIT']
+        if config['IP_LIMIT']:
+            limits['ip'] = config['IP_LIMIT']
+        stats = BufferedStats(CacheThrottleStore(config['STATS_CACHE_ALIAS']), config['STATS_FLUSH_INTERVAL'])
+        atexit.register(stats.flush)
+        _login_throttle = LoginThrottle(store, config['WINDOW'], limits, stats)
+    return _login_throttle
+
+
+def get_client_ip(request):
+    """获取客户端 IP（部署在反向代理之后时，应由代理设置 REMOTE_ADDR）"""
+    return request.META.get('REMOTE_ADDR', '')
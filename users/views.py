@@ -1,33 +1,37 @@
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect
 from django.contrib import messages
 from django.views.decorators.http import require_http_methods
 from django.core.exceptions import ObjectDoesNotExist
+from django.db import IntegrityError
+from .auth import get_current_user, set_current_user
 from .forms import LoginForm, RegisterForm
+from .images import schedule_avatar_processing
 from .models import User
+from .throttling import get_login_throttle, get_client_ip
 
 
-def get_current_user(request):
-    """从 session 中获取当前登录的用户"""
-    user_id = request.session.get('user_id')
-    if user_id:
-        try:
-            return User.objects.get(id=user_id)
-        except ObjectDoesNotExist:
-            return None
-    return None
+def _start_session(request, user, remember_me):
+    """登录成功后写入 session"""
+    # 将用户 ID 存入 session
+    request.session['user_id'] = user.id
+    set_current_user(request, user)
+    
+    # 根据 remember_me 设置 session 过期时间
+    if remember_me:
+        # 设置 30 天过期（逻辑过期）
+        request.session.set_expiry(30 * 24 * 3600)  # 30天
+    else:
+        # 未勾选记住我时，设置为 2 小时过期
+        request.session.set_expiry(2 * 3600)  # 2小时
 
 
 @require_http_methods(["GET", "POST"])
-def login_view(request):
-    """登录视图"""
+async def login_view(request):
+    """登录视图（异步：密码校验在进程池中执行，不阻塞事件循环）"""
     # 如果已登录，重定向到首页（中间件已处理过期检查）
-    user_id = request.session.get('user_id')
-    if user_id:
-        try:
-            User.objects.get(id=user_id)
-            return redirect('home')
-        except (User.DoesNotExist, ValueError):
-            pass
+    if await sync_to_async(get_current_user)(request):
+        return redirect('home')
     
     if request.method == 'POST':
         form = LoginForm(request.POST)
@@ -36,33 +40,34 @@ def login_view(request):
             password = form.cleaned_data['password']
             remember_me = form.cleaned_data.get('remember_me', False)
             
+            # 限流检查（预占一次尝试）在查询用户和校验密码之前完成，超限请求不产生任何哈希开销
+            throttle = get_login_throttle()
+            client_ip = get_client_ip(request)
+            attempt = await sync_to_async(throttle.reserve)(login_id, client_ip)
+            if attempt is None:
+                messages.error(request, '登录失败次数过多，请稍后再试。')
+                return await sync_to_async(render)(request, 'users/login.html', {'form': form}, status=429)
+            
             try:
                 # 查找用户
-                user = User.objects.get(login_id=login_id)
+                user = await User.objects.aget(login_id=login_id)
                 
-                # 验证密码
-                if user.check_password(password):
-                    # 将用户 ID 存入 session
-                    request.session['user_id'] = user.id
-                    
-                    # 根据 remember_me 设置 session 过期时间
-                    if remember_me:
-                        # 设置 30 天过期（逻辑过期）
-                        request.session.set_expiry(30 * 24 * 3600)  # 30天
-                    else:
-                        # 未勾选记住我时，设置为 2 小时过期
-                        request.session.set_expiry(2 * 3600)  # 2小时
-                    
+                # 验证密码（哈希参数过期时自动升级）
+                if await user.acheck_password(password):
+                    await sync_to_async(throttle.record_success)(attempt)
+                    await sync_to_async(_start_session)(request, user, remember_me)
                     messages.success(request, f'欢迎回来，{user.nickname}！')
                     return redirect('home')
                 else:
+                    await sync_to_async(throttle.record_failure)(attempt)
                     messages.error(request, '登录ID或密码错误，请重试。')
             except ObjectDoesNotExist:
+                await sync_to_async(throttle.record_failure)(attempt)
                 messages.error(request, '登录ID或密码错误，请重试。')
     else:
         form = LoginForm()
     
-    return render(request, 'users/login.html', {'form': form})
+    return await sync_to_async(render)(request, 'users/login.html', {'form': form})
 
 
 @require_http_methods(["POST"])
@@ -73,29 +78,41 @@ def logout_view(request):
         del request.session['user_id']
     # 清除所有 session 数据
     request.session.flush()
+    set_current_user(request, None)
     messages.success(request, '您已成功登出。')
     return redirect('users:login')
 
 
+def _insert_user(form, user):
+    """插入新用户，login_id/email 冲突时把错误加到表单上并返回 False"""
+    # 自动提交模式下单条 INSERT 失败不影响连接，无需额外的事务/保存点往返
+    try:
+        user.save()
+    except IntegrityError as exc:
+        if not form.add_unique_errors(exc):
+            raise
+        return False
+    # 头像缩略图在后台生成，不占用请求时间
+    if user.profile_image:
+        schedule_avatar_processing(user.pk)
+    return True
+
+
 @require_http_methods(["GET", "POST"])
-def register_view(request):
-    """注册视图"""
+async def register_view(request):
+    """注册视图（异步：密码哈希在进程池中计算）"""
     # 如果已登录，重定向到首页
-    user_id = request.session.get('user_id')
-    if user_id:
-        try:
-            User.objects.get(id=user_id)
-            return redirect('home')
-        except (User.DoesNotExist, ValueError):
-            pass
+    if await sync_to_async(get_current_user)(request):
+        return redirect('home')
     
     if request.method == 'POST':
         form = RegisterForm(request.POST, request.FILES)
-        if form.is_valid():
+        # 重复的 login_id/email 在哈希密码、写入头像之前就拒绝；并发冲突仍由唯一索引兜底
+        if form.is_valid() and not await sync_to_async(form.add_taken_errors)():
             # 创建新用户
             user = User()
             user.login_id = form.cleaned_data['login_id']
-            user.set_password(form.cleaned_data['password'])  # 使用 PBKDF2 哈希（加盐）存储
+            await user.aset_password(form.cleaned_data['password'])  # 使用 PBKDF2 哈希（加盐）存储
             user.nickname = form.cleaned_data['nickname']
             user.email = form.cleaned_data['email']
             user.type = form.cleaned_data['type']
@@ -104,14 +121,14 @@ def register_view(request):
             if 'profile_image' in request.FILES:
                 user.profile_image = request.FILES['profile_image']
             
-            user.save()
-            
-            messages.success(request, f'注册成功！欢迎加入，{user.nickname}！请登录。')
-            return redirect('users:login')
+            # 直接插入，唯一性由数据库索引保证（一次往返）
+            if await sync_to_async(_insert_user)(form, user):
+                messages.success(request, f'注册成功！欢迎加入，{user.nickname}！请登录。')
+                return redirect('users:login')
     else:
         form = RegisterForm()
     
-    return render(request, 'users/register.html', {'form': form})
+    return await sync_to_async(render)(request, 'users/register.html', {'form': form})
 
 
 def home_view(request):
@@ -0,0 +1,33 @@
+"""启动检查的公共部分：需要跨进程共享状态的功能，检查其缓存别名是否为共享缓存"""
+from django.conf import settings
+from django.core.checks import Error, Warning
+
+
+# 只在当前进程内有效的缓存后端
+PROCESS_LOCAL_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+)
+
+DUMMY_BACKEND = 'django.core.cache.backends.dummy.DummyCache'
+
+DATABASE_BACKEND = 'django.core.cache.backends.db.DatabaseCache'
+
+
+def check_shared_cache(alias, feature, check_id, first=1):
+    """alias 不存在或为 DummyCache 时报错，为进程内缓存时警告（多进程部署下各进程状态互不可见）
+
+    同一个 app 检查多个功能时用 first 区分编号：E{first}、E{first + 1}、W{first}。
+    """
+    config = settings.CACHES.get(alias)
+    if config is None:
+        return [Error(f'{feature}使用的缓存别名 {alias!r} 未在 CACHES 中配置。', id=f'{check_id}.E{first:03d}')]
+    backend = config.get('BACKEND', '')
+    if backend == DUMMY_BACKEND:
+        return [Error(f'{feature}不能使用 DummyCache（缓存别名 {alias!r}）。', id=f'{check_id}.E{first + 1:03d}')]
+    if backend in PROCESS_LOCAL_BACKENDS:
+        return [Warning(
+            f'{feature}使用的缓存别名 {alias!r} 是进程内缓存，多进程/多机部署时各进程互不可见。',
+            hint='把该别名配置为 Redis、Memcached、文件或数据库缓存；确认只有单进程运行时可忽略。',
+            id=f'{check_id}.W{first:03d}',
+        )]
+    return []
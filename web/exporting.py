@@ -0,0 +1,61 @@
+"""批量导出的通用工具：把分批读取的记录编码为 CSV/JSONL 文本块，供 StreamingHttpResponse 逐块发送"""
+import csv
+import datetime
+import io
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+}
+
+# Excel 需要 BOM 才能按 UTF-8 识别 CSV 中的中文
+CSV_BOM = '\ufeff'
+
+# 以这些字符开头的单元格会被表格软件当作公式执行（CSV 注入），导出时前面加单引号按文本处理
+CSV_FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def _csv_value(value):
+    """时间按本地时区输出，便于表格软件识别；用户输入的文本转义公式前缀"""
+    if isinstance(value, datetime.datetime):
+        if timezone.is_aware(value):
+            value = timezone.localtime(value)
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    if isinstance(value, str) and value.startswith(CSV_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def iter_csv(fields, chunks):
+    """产出 CSV 文本块：先是 BOM + 表头，之后每批记录（dict 列表）一块"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fields, extrasaction='ignore')
+    buffer.write(CSV_BOM)
+    writer.writeheader()
+    for chunk in chunks:
+        writer.writerows({field: _csv_value(record[field]) for field in fields} for record in chunk)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def iter_jsonl(fields, chunks):
+    """产出 JSONL 文本块：每批记录一块，每条记录一行 JSON 对象"""
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for chunk in chunks:
+        yield ''.join(encoder.encode({field: record[field] for field in fields}) + '\n' for record in chunk)
+
+
+def iter_export(fmt, fields, chunks):
+    """按格式编码"""
+    if fmt == 'csv':
+        return iter_csv(fields, chunks)
+    if fmt == 'jsonl':
+        return iter_jsonl(fields, chunks)
+    raise ValueError(f'不支持的格式：{fmt}')
@@ -0,0 +1,60 @@
+"""批量导入的通用工具：流式读取 CSV/JSONL 记录并分批"""
+import csv
+import io
+import json
+from itertools import islice
+
+
+FORMATS = ('csv', 'jsonl')
+
+
+def guess_format(filename, default='csv'):
+    """根据文件扩展名判断格式"""
+    name = (filename or '').lower()
+    if name.endswith('.jsonl') or name.endswith('.ndjson'):
+        return 'jsonl'
+    if name.endswith('.csv'):
+        return 'csv'
+    return default
+
+
+def iter_records(stream, fmt):
+    """逐行读取记录，产出 (行号, dict 或 None, 解析错误)
+
+    stream 可以是文本流或二进制流（二进制流按 UTF-8 解码，兼容 BOM），不会整体读入内存。
+    """
+    if isinstance(stream, io.TextIOBase):
+        text = stream
+    else:
+        text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+
+    if fmt == 'csv':
+        reader = csv.DictReader(text)
+        for row in reader:
+            yield reader.line_num, row, None
+    elif fmt == 'jsonl':
+        for line_num, line in enumerate(text, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as exc:
+                yield line_num, None, f'JSON 解析失败：{exc}'
+                continue
+            if not isinstance(record, dict):
+                yield line_num, None, '每行必须是一个 JSON 对象'
+                continue
+            yield line_num, record, None
+    else:
+        raise ValueError(f'不支持的格式：{fmt}')
+
+
+def batched(iterable, size):
+    """按 size 分批"""
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
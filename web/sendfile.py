@@ -0,0 +1,149 @@
+"""文件下载响应
+
+Python 中只做授权判断和条件请求处理，文件内容尽量不经过 Python：
+- SENDFILE_BACKEND = 'nginx'：返回 X-Accel-Redirect，由 Nginx 发送文件（Range 也由 Nginx 处理）
+- SENDFILE_BACKEND = 'apache'：返回 X-Sendfile（Apache mod_xsendfile / Lighttpd）
+- 未配置时由 Django 发送：整文件使用 FileResponse（WSGI 服务器支持时走 os.sendfile 零拷贝），
+  Range 请求按需分块读取，不会把文件整体读入内存
+Nginx 配置示例（SENDFILE_URL = '/protected-media/'）::
+
+    location /protected-media/ {
+        internal;
+        alias /path/to/media/;
+    }
+"""
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, content_disposition_header
+
+from .storage import blob_digest
+
+
+# 内容寻址文件永不改变，可以长期缓存
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+CHUNK_SIZE = 64 * 1024
+
+
+def file_etag(name, stat):
+    """强 ETag：内容寻址文件直接使用内容哈希，其余使用修改时间和大小"""
+    digest = blob_digest(name)
+    if digest:
+        return f'"{digest}"'
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+
+def parse_range(header, size):
+    """解析单个 Range（bytes=start-end），返回 (start, end)；无法满足时返回 None，不支持时返回 False"""
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        # 多段 Range 等不支持的格式，按整文件返回
+        return False
+    start, end = match.groups()
+    if start == '' and end == '':
+        return False
+    if start == '':
+        # bytes=-N：最后 N 个字节
+        length = int(end)
+        if length == 0:
+            return None
+        return max(size - length, 0), size - 1
+    start = int(start)
+    end = int(end) if end else size - 1
+    if start >= size or end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+def _range_iterator(path, start, length):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def _offload_response(name, full_path):
+    backend = getattr(settings, 'SENDFILE_BACKEND', None)
+    if backend == 'nginx':
+        response = HttpResponse()
+        prefix = getattr(settings, 'SENDFILE_URL', '/protected-media/')
+        response['X-Accel-Redirect'] = prefix.rstrip('/') + '/' + quote(name)
+        return response
+    if backend == 'apache':
+        response = HttpResponse()
+        response['X-Sendfile'] = full_path
+        return response
+    return None
+
+
+def serve_file(request, name, full_path, *, cache_control=None, download_name=None):
+    """返回文件响应（调用前应已完成授权判断）
+
+    name 为相对媒体根目录的文件名，full_path 为磁盘路径。
+    download_name 不为空时以附件形式下载。
+    """
+    try:
+        stat = os.stat(full_path)
+    except (FileNotFoundError, NotADirectoryError):
+        raise Http404('文件不存在')
+
+    etag = file_etag(name, stat)
+    last_modified = int(stat.st_mtime)
+    if cache_control is None:
+        cache_control = IMMUTABLE_CACHE_CONTROL if blob_digest(name) else 'private, max-age=0, must-revalidate'
+    content_type, _ = mimetypes.guess_type(download_name or full_path)
+    content_type = content_type or 'application/octet-stream'
+
+    def finish(response):
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        response['Cache-Control'] = cache_control
+        if download_name:
+            response['Content-Disposition'] = content_disposition_header(True, download_name)
+        return response
+
+    # 条件请求：If-None-Match / If-Modified-Since 命中时直接返回 304
+    conditional = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if conditional is not None:
+        return finish(conditional)
+
+    offloaded = _offload_response(name, full_path)
+    if offloaded is not None:
+        offloaded['Content-Type'] = content_type
+        return finish(offloaded)
+
+    size = stat.st_size
+    range_header = request.META.get('HTTP_RANGE')
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if range_header and (not if_range or if_range.strip() == etag):
+        byte_range = parse_range(range_header, size)
+        if byte_range is None:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return finish(response)
+        if byte_range:
+            start, end = byte_range
+            length = end - start + 1
+            response = StreamingHttpResponse(_range_iterator(full_path, start, length),
+                                             status=206, content_type=content_type)
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+            response['Content-Length'] = str(length)
+            response['Accept-Ranges'] = 'bytes'
+            return finish(response)
+
+    response = FileResponse(open(full_path, 'rb'), content_type=content_type)
+    response['Accept-Ranges'] = 'bytes'
+    return finish(response)
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 
+import tempfile
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -143,10 +144,116 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # 注意：不再使用 Django 的认证系统，所以不需要 AUTH_USER_MODEL
 # AUTH_USER_MODEL = 'users.User'
 
-# Session 配置 - 使用数据库存储 session
-SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+# 缓存配置
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'default',
+    },
+    # Session 读缓存：必须在所有 Web 进程间共享，否则退出登录只清掉当前进程的缓存，其他进程仍接受该 session
+    # （启动检查 users.W010 会对进程内缓存给出警告）。默认使用本机文件缓存（同一台机器上的进程共享）；
+    # 多机部署时替换为 Redis，例如
+    # 'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+    # 'LOCATION': 'redis://127.0.0.1:6379/1',
+    'sessions': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': Path(tempfile.gettempdir()) / 'web-session-cache',
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,  # 超过时随机淘汰三分之一，未命中的 session 回落到数据库读取
+        },
+    },
+    # 多进程共享的小数据（申请幂等键、登录限流统计）：必须是所有进程/机器都能访问的缓存。
+    # 默认使用数据库缓存，缓存表由 `python manage.py migrate` 创建（applications 0003 迁移执行 createcachetable）；
+    # 之后新增或改名的数据库缓存表需手动执行 `python manage.py createcachetable`。生产环境建议换成 Redis，例如
+    # 'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+    # 'LOCATION': 'redis://127.0.0.1:6379/2',
+    # 数据库缓存每次写入都会先 COUNT(*) 整表（Django 实现如此，与下面的参数无关），只用于低频写入；
+    # 职位缓存版本号这类每次写入都要更新的数据放在 jobs.models.CacheVersion 表中
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'shared_cache',
+        'OPTIONS': {
+            'MAX_ENTRIES': 100000,   # 幂等键按提交次数增长，超过时先删过期行
+            'CULL_FREQUENCY': 10,    # 仍超过时删除十分之一
+        },
+    },
+    # 职位列表查询结果缓存：LocMemCache 按最近使用顺序淘汰，
+    # CULL_FREQUENCY 等于 MAX_ENTRIES 时每次只淘汰最久未使用的一条（LRU）
+    'jobs': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'jobs',
+        'OPTIONS': {
+            'MAX_ENTRIES': 2000,
+            'CULL_FREQUENCY': 2000,
+        },
+    },
+}
+
+# Session 配置 - 数据库存储 session，读取时优先走缓存（写入时同时写数据库）
+# 如需直接读数据库，改回 'django.contrib.sessions.backends.db'
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+SESSION_CACHE_ALIAS = 'sessions'
 SESSION_COOKIE_AGE = 30 * 24 * 3600  # 30天（默认值，实际过期时间在视图中动态设置）
 
 # 媒体文件配置
 MEDIA_URL = '/media/'
-MEDIA_ROOT = BASE_DIR / 'media'
\ No newline at end of file
+MEDIA_ROOT = BASE_DIR / 'media'
+
+# 可直接通过 MEDIA_URL 访问的目录，其余文件（如 CV）只能通过授权下载视图获取
+PUBLIC_MEDIA_PREFIXES = ('profile_images/',)
+
+# 文件发送卸载：None 由 Django 发送；'nginx' 使用 X-Accel-Redirect；'apache' 使用 X-Sendfile
+SENDFILE_BACKEND = None
+SENDFILE_URL = '/protected-media/'  # Nginx internal location，指向 MEDIA_ROOT
+
+# 简历上传大小上限（字节），超出时在接收过程中拒绝，不写完整文件
+CV_UPLOAD_MAX_SIZE = 10 * 1024 * 1024
+
+# 用户对象跨请求缓存时间（秒），用户保存/删除时自动失效；设为 0 关闭缓存
+USER_CACHE_TIMEOUT = 60
+
+# 登录限流：在查询用户和计算密码哈希之前拒绝超限的登录尝试
+# 默认计数在进程内（拒绝路径没有任何数据库/网络访问，额度按进程计算）；多进程共享额度时把 STORE 改为 'cache'，
+# CACHE_ALIAS 指向 Redis/Memcached（数据库缓存每次尝试都要多条 SQL，不要用于计数）
+LOGIN_THROTTLE = {
+    'STORE': 'local',
+    'CACHE_ALIAS': 'default',
+    'WINDOW': 300,                  # 滑动窗口（秒）
+    'LOGIN_ID_LIMIT': 5,            # 每个登录ID窗口内允许的未成功尝试次数
+    'IP_LIMIT': 20,                 # 每个 IP 窗口内允许的未成功尝试次数
+    'STATS_CACHE_ALIAS': 'shared',  # 统计计数定期合并写入共享缓存，login_throttle_stats 命令能看到所有进程的计数
+    'STATS_FLUSH_INTERVAL': 30,     # 统计计数写入间隔（秒）
+}
+
+# 密码哈希：迭代次数可配置（用 `python manage.py tune_password_hasher` 按目标耗时测算），
+# 调整后旧哈希会在用户下次登录成功时自动升级
+PASSWORD_HASHERS = [
+    'users.hashers.ConfigurablePBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+]
+PASSWORD_HASH_ITERATIONS = 720000
+
+# 登录/注册视图中密码哈希使用的进程池大小（0 表示在线程池中执行）
+PASSWORD_HASHING_WORKERS = 2
+
+# 头像缩略图生成使用的后台线程数（0 表示在请求中同步生成）
+AVATAR_PROCESSING_WORKERS = 1
+
+# 职位列表分页方式：'cursor' 游标分页（无 COUNT/OFFSET，深页与首页代价相同）；'page' 页码分页
+JOB_LIST_PAGINATION = 'cursor'
+
+# 职位搜索后端：'auto' 按数据库选择（MySQL FULLTEXT / SQLite FTS5，否则进程内倒排索引）；'memory' 强制进程内索引
+JOB_SEARCH_BACKEND = 'auto'
+
+# 职位浏览计数：进程内累加，满足任一条件时批量写回数据库
+JOB_VIEW_COUNTER = {
+    'FLUSH_INTERVAL': 30,      # 距上次写回超过该秒数
+    'FLUSH_THRESHOLD': 1000,   # 或累计未写回的浏览次数达到该值
+}
+
+# 申请提交幂等键：重复/并发提交在读取请求体之前拦截，返回原请求的结果
+APPLICATION_IDEMPOTENCY = {
+    'CACHE_ALIAS': 'shared',   # 必须是多进程共享的缓存，进程内缓存会触发启动检查警告
+    'TTL': 24 * 3600,          # 已完成提交的结果保留时间（秒）
+    'PENDING_TTL': 300,        # 处理中占位的最长保留时间（秒），进程异常退出时到期自动释放
+}
@@ -0,0 +1,151 @@
+"""内容寻址的去重文件存储
+
+上传文件边写入临时文件边计算 SHA-256，最终文件名由内容哈希决定：
+``<upload_to 目录>/<哈希前两位>/<哈希3-4位>/<完整哈希><扩展名>``。
+相同内容只保存一份，文件一旦写入永不修改，因此可以使用 immutable 缓存头。
+多条记录可能引用同一个文件，删除记录或调用 ``delete()`` 时都不删除文件，
+由 ``python manage.py gc_media_blobs`` 统计引用计数并回收无引用的文件。
+"""
+import hashlib
+import os
+import re
+import tempfile
+
+from django.core.files.move import file_move_safe
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+
+# 内容寻址文件名：<目录>/<2位>/<2位>/<64位哈希><扩展名>
+BLOB_NAME_RE = re.compile(r'(?:^|/)([0-9a-f]{2})/([0-9a-f]{2})/(\1\2[0-9a-f]{60})(\.[a-z0-9]{1,10})?$')
+
+TMP_DIR = '.tmp'
+
+
+def is_blob_name(name):
+    """判断文件名是否为内容寻址文件名"""
+    return bool(name and BLOB_NAME_RE.search(name))
+
+
+def blob_digest(name):
+    """从内容寻址文件名中取出 SHA-256（不是内容寻址文件名时返回 None）"""
+    match = BLOB_NAME_RE.search(name or '')
+    return match.group(3) if match else None
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """内容寻址存储：文件名由内容 SHA-256 决定，相同内容只存一份"""
+
+    # 分块读取大小
+    CHUNK_SIZE = 64 * 1024
+
+    def blob_name(self, directory, digest, ext):
+        name = f'{digest[:2]}/{digest[2:4]}/{digest}{ext}'
+        return f'{directory}/{name}' if directory else name
+
+    def get_available_name(self, name, max_length=None):
+        # 同名即同内容，无需生成新文件名
+        return name
+
+    def _extension(self, name):
+        ext = os.path.splitext(name)[1].lower()
+        return ext if re.fullmatch(r'\.[a-z0-9]{1,10}', ext) else ''
+
+    def _spool(self, content):
+        """把内容流式写入临时文件并计算哈希，返回 (哈希, 临时文件路径)"""
+        tmp_dir = self.path(TMP_DIR)
+        os.makedirs(tmp_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=tmp_dir)
+        digest = hashlib.sha256()
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                for chunk in content.chunks(self.CHUNK_SIZE):
+                    if isinstance(chunk, str):
+                        chunk = chunk.encode('utf-8')
+                    digest.update(chunk)
+                    out.write(chunk)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return digest.hexdigest(), tmp_path
+
+    def _save(self, name, content):
+        directory = os.path.dirname(name).replace('\\', '/')
+        ext = self._extension(name)
+
+        # 上传处理器已在接收时计算过哈希（如 CV 上传），可直接使用
+        digest = getattr(content, 'content_sha256', None)
+        source_path = None
+        is_spooled = False
+        if digest and hasattr(content, 'temporary_file_path'):
+            source_path = content.temporary_file_path()
+        else:
+            digest, source_path = self._spool(content)
+            is_spooled = True
+
+        final_name = self.blob_name(directory, digest, ext)
+        full_path = self.path(final_name)
+        try:
+            # 已有相同内容：刷新修改时间，避免正在运行的垃圾回收按旧时间把它当作无引用文件删除
+            os.utime(full_path)
+        except FileNotFoundError:
+            pass
+        else:
+            # 丢弃本次写入
+            if is_spooled:
+                os.unlink(source_path)
+            return final_name
+
+        for attempt in range(2):
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            try:
+                if is_spooled:
+                    # 同一文件系统内原子替换，并发写入相同内容也安全
+                    os.replace(source_path, full_path)
+                else:
+                    file_move_safe(source_path, full_path, allow_overwrite=True)
+                break
+            except FileNotFoundError:
+                # 分片目录恰好被垃圾回收删除，重建后重试一次
+                if attempt:
+                    raise
+        if self.file_permissions_mode is not None:
+            os.chmod(full_path, self.file_permissions_mode)
+        return final_name
+
+    def delete(self, name):
+        """不删除：同一文件可能被多条记录共享，无引用的文件由 gc_media_blobs 回收"""
+        return None
+
+    def iter_blobs(self):
+        """遍历存储中所有内容寻址文件，产出 (文件名, 完整路径)"""
+        root = self.location
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = [d for d in dirnames if d != TMP_DIR]
+            for filename in filenames:
+                full_path = os.path.join(dirpath, filename)
+                name = os.path.relpath(full_path, root).replace('\\', '/')
+                if is_blob_name(name):
+                    yield name, full_path
+
+
+_media_storage = None
+
+
+def get_media_storage():
+    """上传文件字段使用的存储（模型字段通过 callable 引用，迁移中不固化配置）"""
+    global _media_storage
+    if _media_storage is None:
+        _media_storage = ContentAddressedStorage()
+    return _media_storage
+
+
+# 额外的引用来源（如 JSON 字段中记录的缩略图文件名），由各 app 在 ready() 中注册；
+# 每个函数返回可迭代的文件名
+REFERENCE_PROVIDERS = []
+
+
+def register_reference_provider(func):
+    REFERENCE_PROVIDERS.append(func)
+    return func
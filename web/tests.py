@@ -0,0 +1,128 @@
+import csv
+import io
+import os
+import tempfile
+import time
+
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from .exporting import iter_csv
+from .storage import get_media_storage
+
+
+class MediaViewTests(TestCase):
+    """公开媒体目录的访问控制"""
+
+    def setUp(self):
+        self.media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.media_root.cleanup)
+        root = self.media_root.name
+        os.makedirs(os.path.join(root, 'profile_images'))
+        os.makedirs(os.path.join(root, 'applications', 'cvs'))
+        with open(os.path.join(root, 'profile_images', 'a.png'), 'wb') as f:
+            f.write(b'avatar')
+        with open(os.path.join(root, 'applications', 'cvs', 'cv.pdf'), 'wb') as f:
+            f.write(b'%PDF-private')
+        settings_override = override_settings(
+            MEDIA_ROOT=root, PUBLIC_MEDIA_PREFIXES=('profile_images/',), SENDFILE_BACKEND=None,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_public_file(self):
+        response = self.client.get('/media/profile_images/a.png')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), b'avatar')
+
+    def test_private_file(self):
+        response = self.client.get('/media/applications/cvs/cv.pdf')
+        self.assertEqual(response.status_code, 404)
+
+    def test_traversal_out_of_public_prefix(self):
+        for path in (
+            '/media/profile_images/../applications/cvs/cv.pdf',
+            '/media/profile_images/%2e%2e/applications/cvs/cv.pdf',
+            '/media/profile_images/./../applications/cvs/cv.pdf',
+            '/media/profile_images/..%5capplications/cvs/cv.pdf',
+            '/media/profile_images/../../etc/passwd',
+        ):
+            with self.subTest(path=path):
+                self.assertEqual(self.client.get(path).status_code, 404)
+
+    @override_settings(SENDFILE_BACKEND='nginx', SENDFILE_URL='/protected-media/')
+    def test_offload_uses_normalized_path(self):
+        response = self.client.get('/media/profile_images/./a.png')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Accel-Redirect'], '/protected-media/profile_images/a.png')
+
+
+class ContentAddressedStorageTests(TestCase):
+
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        settings_override = override_settings(MEDIA_ROOT=media_root.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.storage = get_media_storage()
+
+    def age(self, name, hours):
+        past = time.time() - hours * 3600
+        os.utime(self.storage.path(name), (past, past))
+
+    def gc(self):
+        call_command('gc_media_blobs', min_age=1, stdout=io.StringIO())
+
+    def test_same_content_same_name(self):
+        first = self.storage.save('applications/cvs/a.pdf', ContentFile(b'%PDF-same'))
+        second = self.storage.save('applications/cvs/b.pdf', ContentFile(b'%PDF-same'))
+        self.assertEqual(first, second)
+
+    def test_delete_keeps_shared_blob(self):
+        name = self.storage.save('applications/cvs/a.pdf', ContentFile(b'%PDF-shared'))
+        self.storage.delete(name)
+        self.assertTrue(self.storage.exists(name))
+
+    def test_gc_removes_old_orphans(self):
+        name = self.storage.save('applications/cvs/a.pdf', ContentFile(b'%PDF-orphan'))
+        self.age(name, 2)
+        self.gc()
+        self.assertFalse(self.storage.exists(name))
+
+    def test_gc_keeps_recent_orphans(self):
+        name = self.storage.save('applications/cvs/a.pdf', ContentFile(b'%PDF-new'))
+        self.gc()
+        self.assertTrue(self.storage.exists(name))
+
+    def test_dedupe_hit_refreshes_mtime(self):
+        # 旧的无引用文件被新上传去重命中后，垃圾回收不应再删除它
+        name = self.storage.save('applications/cvs/a.pdf', ContentFile(b'%PDF-reused'))
+        self.age(name, 2)
+        self.assertEqual(self.storage.save('applications/cvs/b.pdf', ContentFile(b'%PDF-reused')), name)
+        self.gc()
+        self.assertTrue(self.storage.exists(name))
+
+
+class CSVExportTests(SimpleTestCase):
+
+    def export(self, records):
+        return ''.join(iter_csv(['title', 'views'], [records]))
+
+    def test_bom_and_header(self):
+        self.assertTrue(self.export([]).startswith('\ufefftitle,views\r\n'))
+
+    def test_formula_cells_escaped(self):
+        rows = list(csv.reader(io.StringIO(self.export([
+            {'title': '=HYPERLINK("http://evil.test")', 'views': 1},
+            {'title': '+1', 'views': 2},
+            {'title': '-1+2', 'views': 3},
+            {'title': '@SUM(A1)', 'views': 4},
+            {'title': '后端开发', 'views': -5},
+        ]).lstrip('\ufeff'))))
+        self.assertEqual([row[0] for row in rows[1:]], [
+            '\'=HYPERLINK("http://evil.test")', "'+1", "'-1+2", "'@SUM(A1)", '后端开发',
+        ])
+        # 数值列不是用户输入，原样输出
+        self.assertEqual(rows[-1][1], '-5')
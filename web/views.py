@@ -0,0 +1,33 @@
+import posixpath
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import Http404
+from django.utils._os import safe_join
+from django.views.decorators.http import require_safe
+
+from .sendfile import serve_file
+from .storage import is_blob_name
+
+
+@require_safe
+def media_view(request, path):
+    """媒体文件访问（只做授权判断，文件发送见 web.sendfile）"""
+    # 先规范化再判断目录：profile_images/../applications/... 这类路径规范化后不在公开目录内
+    path = posixpath.normpath(path.replace('\\', '/')).lstrip('/')
+    if path == '..' or path.startswith('../') or '..' in path.split('/'):
+        raise Http404('文件不存在')
+
+    # 只有公开目录（如头像）可直接访问；CV 等私有文件必须通过各自的下载视图授权
+    public_prefixes = getattr(settings, 'PUBLIC_MEDIA_PREFIXES', ())
+    if not path.startswith(tuple(public_prefixes)):
+        raise Http404('文件不存在')
+
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404('文件不存在')
+
+    # 内容寻址文件使用 immutable 长缓存，旧文件名可能被覆盖，只短期缓存
+    cache_control = None if is_blob_name(path) else 'public, max-age=3600'
+    return serve_file(request, path, full_path, cache_control=cache_control)
@@ -0,0 +1,59 @@
+"""流式 ZIP：边生成边输出，不写临时文件，也不在内存中保留整个归档
+
+zipfile 写入不可 seek 的输出时，会在每个文件数据之后用数据描述符（data descriptor）记录 CRC 和大小，
+因此每次写入产生的字节可以立即交给 StreamingHttpResponse 发送。
+"""
+import zipfile
+
+
+# 读取源文件时每次读取的字节数（也是输出块大小的上限量级）
+READ_SIZE = 64 * 1024
+
+
+class _Sink:
+    """只追加的输出缓冲：不提供 seek/tell，zipfile 会按不可 seek 的流写入"""
+    
+    def __init__(self):
+        self._chunks = []
+    
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+    
+    def flush(self):
+        pass
+    
+    def drain(self):
+        """取出并清空已写入的字节"""
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def iter_file(fileobj, read_size=READ_SIZE):
+    """按固定大小分块读取文件，读完后关闭"""
+    with fileobj:
+        while chunk := fileobj.read(read_size):
+            yield chunk
+
+
+def iter_zip(entries):
+    """产出 ZIP 字节块
+
+    entries 为 (归档内路径, date_time 六元组, 字节块可迭代对象, 压缩方式) 的可迭代对象，按顺序逐个写入；
+    每写入一个字节块就把输出交出去，内存中只保留当前块。单个文件不超过 2 GiB（不预先声明大小时不启用 ZIP64）。
+    """
+    sink = _Sink()
+    with zipfile.ZipFile(sink, 'w') as archive:
+        for name, date_time, chunks, compress_type in entries:
+            info = zipfile.ZipInfo(name, date_time)
+            info.compress_type = compress_type
+            with archive.open(info, 'w') as dest:
+                for chunk in chunks:
+                    dest.write(chunk)
+                    if data := sink.drain():
+                        yield data
+            if data := sink.drain():
+                yield data
+    # 中央目录
+    yield sink.drain()